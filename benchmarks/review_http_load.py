@@ -0,0 +1,302 @@
+"""
+HTTP load benchmark for the review server.
+
+Starts review_server.py on its streamable HTTP transport on a free localhost
+port (or targets an already running server with --url), then drives a
+weighted mix of tools from N concurrent MCP clients for a fixed duration.
+Throughput, error counts and p50/p95/p99 latency per tool are printed as JSON.
+Tool arguments are drawn from a seeded random generator, so two runs with the
+same options send the same sequence of calls from each client.
+
+Usage:
+    python -m benchmarks.review_http_load --clients 16 --duration 30
+    python -m benchmarks.review_http_load --mix list_reviews=3,get_review=1 --backend sqlite
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+from fastmcp import Client
+
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS, WINES
+
+SERVER_SCRIPT = Path(__file__).resolve().parent.parent / "wine_cellar" / "mcp_servers" / "review_server.py"
+DEFAULT_MIX = {
+    "list_reviews": 30,
+    "get_review": 20,
+    "search_reviews": 15,
+    "get_average_rating": 15,
+    "create_review": 10,
+    "delete_review": 10,
+}
+KEYWORDS = ["cherry", "oak", "citrus", "elegant", "tannins", "finish", "fruit", "mineral"]
+PAGE_SIZE = 20
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse a mix such as "list_reviews=3,get_review=1" into tool weights."""
+    mix = {}
+    for part in text.split(","):
+        name, separator, weight = part.strip().partition("=")
+        if not separator:
+            raise ValueError(f"Invalid mix entry '{part}', expected tool=weight")
+        if name not in _Workload.builders:
+            raise ValueError(f"Unknown tool '{name}', expected one of {', '.join(sorted(_Workload.builders))}")
+        mix[name] = float(weight)
+        if mix[name] < 0:
+            raise ValueError(f"Weight for '{name}' must not be negative")
+    if not any(mix.values()):
+        raise ValueError("At least one tool needs a positive weight")
+    return mix
+
+
+class _Workload:
+    """Seeded tool arguments for one client; deletes only target the client's own reviews."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.known_ids = list(FAKE_REVIEWS)
+        self.own_ids: list[str] = []
+
+    def create_review(self) -> dict:
+        wine = self.rng.choice(WINES)
+        return {
+            "wine_name": wine["name"],
+            "vintage": wine["year"],
+            "rating": round(self.rng.uniform(1, 5), 1),
+            "tasting_notes": f"Load test note with {self.rng.choice(KEYWORDS)} and {self.rng.choice(KEYWORDS)}",
+            "reviewer_name": "Load Test",
+            "price": round(self.rng.uniform(10, 500), 2),
+        }
+
+    def get_review(self) -> dict:
+        return {"review_id": self.rng.choice(self.known_ids + self.own_ids)}
+
+    def list_reviews(self) -> dict:
+        variant = self.rng.randrange(3)
+        if variant == 0:
+            return {"limit": PAGE_SIZE}
+        if variant == 1:
+            return {"wine_name": self.rng.choice(WINES)["name"].split()[0], "limit": PAGE_SIZE}
+        return {"min_rating": 4.0, "order_by": "rating", "descending": True, "limit": PAGE_SIZE}
+
+    def search_reviews(self) -> dict:
+        return {"keyword": self.rng.choice(KEYWORDS), "limit": PAGE_SIZE}
+
+    def get_average_rating(self) -> dict:
+        return {"wine_name": self.rng.choice(WINES)["name"]}
+
+    def delete_review(self) -> dict:
+        if not self.own_ids:
+            # Nothing of our own to delete yet: measure the not-found path instead
+            return {"review_id": "missing-review"}
+        return {"review_id": self.own_ids.pop(self.rng.randrange(len(self.own_ids)))}
+
+    def top_rated_wines(self) -> dict:
+        return {"k": 5}
+
+    def review_analytics(self) -> dict:
+        return {"group_by": self.rng.choice(["vintage", "reviewer", "wine"])}
+
+    builders = {
+        name: function
+        for name, function in locals().items()
+        if callable(function) and not name.startswith("_")
+    }
+
+    def arguments(self, tool: str) -> dict:
+        return self.builders[tool](self)
+
+
+async def _client(url: str, number: int, seed: int, mix: dict[str, float], start: float, stop: float, samples: dict) -> None:
+    workload = _Workload(seed * 100_003 + number)
+    tools, weights = zip(*mix.items())
+    async with Client(url) as client:
+        while time.perf_counter() < stop:
+            tool = workload.rng.choices(tools, weights)[0]
+            arguments = workload.arguments(tool)
+            began = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments, raise_on_error=False)
+                outcome = "error" if result.is_error else json.loads(result.content[0].text)["status"]
+                if tool == "create_review" and outcome == "success":
+                    workload.own_ids.append(json.loads(result.content[0].text)["data"]["review_id"])
+            except Exception:
+                outcome = "failure"
+            if began >= start:
+                samples[tool].append((time.perf_counter() - began, outcome))
+
+
+def _latency(seconds: list[float]) -> dict:
+    if not seconds:
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    millis = np.array(seconds) * 1000
+    p50, p95, p99 = np.percentile(millis, [50, 95, 99])
+    return {
+        "mean": round(float(millis.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(millis.max()), 3),
+    }
+
+
+def _summary(samples: list[tuple[float, str]], seconds: float) -> dict:
+    outcomes = [outcome for _, outcome in samples]
+    return {
+        "calls": len(samples),
+        "calls_per_second": round(len(samples) / seconds, 1),
+        "error_responses": outcomes.count("error"),
+        "failures": outcomes.count("failure"),
+        "latency_ms": _latency([elapsed for elapsed, _ in samples]),
+    }
+
+
+async def drive(
+    url: str,
+    clients: int = 8,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+    mix: Optional[dict[str, float]] = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Run `clients` concurrent MCP clients against `url` and summarize their calls.
+
+    Calls that start during the first `warmup` seconds are not measured.
+    A response with "status": "error" counts as an error response; a call that
+    raises (transport error, timeout) counts as a failure.
+    """
+    mix = mix or DEFAULT_MIX
+    samples: dict[str, list[tuple[float, str]]] = defaultdict(list)
+    start = time.perf_counter() + warmup
+    stop = start + duration
+    await asyncio.gather(*(_client(url, n, seed, mix, start, stop, samples) for n in range(clients)))
+    measured = max(time.perf_counter() - start, 1e-9)
+
+    everything = [sample for tool_samples in samples.values() for sample in tool_samples]
+    return {
+        "url": url,
+        "clients": clients,
+        "duration_seconds": round(measured, 3),
+        "warmup_seconds": warmup,
+        "seed": seed,
+        "mix": mix,
+        "total": _summary(everything, measured),
+        "tools": {name: _summary(samples[name], measured) for name in sorted(mix) if mix[name]},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"review server exited with code {process.returncode} before accepting connections")
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except urllib.error.HTTPError:
+            # Any HTTP answer (the MCP endpoint rejects a bare GET) means the server is up
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"review server did not start within {timeout:g} seconds")
+
+
+@contextmanager
+def review_server_process(backend: str = "memory", log: Optional[Path] = None, timeout: float = 60.0) -> Iterator[str]:
+    """
+    Run review_server.py on a free localhost port and yield its MCP endpoint URL.
+
+    The journal and sqlite backends store their data in a temporary directory
+    that is removed when the server stops.
+    """
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {
+            **os.environ,
+            "REVIEW_SERVER_PORT": str(port),
+            "REVIEW_STORE": backend,
+            "REVIEW_DB_PATH": str(Path(scratch) / "reviews.db"),
+            "REVIEW_JOURNAL_DIR": str(Path(scratch) / "journal"),
+        }
+        output = open(log, "w") if log else subprocess.DEVNULL
+        process = subprocess.Popen([sys.executable, str(SERVER_SCRIPT)], env=env, stdout=output, stderr=subprocess.STDOUT)
+        try:
+            _wait_until_ready(url, process, timeout)
+            yield url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            if log:
+                output.close()
+
+
+def run_load(
+    clients: int = 8,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+    mix: Optional[dict[str, float]] = None,
+    seed: int = 0,
+    backend: str = "memory",
+    url: Optional[str] = None,
+    log: Optional[Path] = None,
+) -> dict:
+    """Start a local review server (unless `url` is given), drive it and return the JSON report."""
+    if url:
+        return asyncio.run(drive(url, clients, duration, warmup, mix, seed))
+    with review_server_process(backend, log) as local_url:
+        result = asyncio.run(drive(local_url, clients, duration, warmup, mix, seed))
+    result["backend"] = backend
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="number of concurrent MCP clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before the run")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="tool weights, e.g. list_reviews=3,get_review=1")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated tool arguments")
+    parser.add_argument("--backend", default="memory", help="memory, columnar, journal or sqlite")
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--server-log", type=Path, help="write the server's output to this file")
+    parser.add_argument("--output", type=Path, help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    result = run_load(args.clients, args.duration, args.warmup, args.mix, args.seed, args.backend, args.url, args.server_log)
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report + "\n")
+    return 1 if result["total"]["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
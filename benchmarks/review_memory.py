@@ -0,0 +1,84 @@
+"""
+Memory benchmark: dict-per-review layout vs the columnar review table.
+
+Builds the same synthetic reviews into both layouts and reports the bytes
+allocated (tracemalloc) per layout, for the bare tables and for complete
+stores including their indexes. Reviews are decoded from JSON, as they
+arrive through the MCP tools, so no strings are shared between them.
+The run fails when the columnar store is less than --min-ratio times
+smaller than the dict store.
+
+Usage:
+    python -m benchmarks.review_memory --reviews 100000 --min-ratio 2.5
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from itertools import islice
+from typing import Callable, Iterator
+
+from benchmarks.synthetic_data import REVIEWS_PER_WINE, iter_reviews, synthetic_wines
+from wine_cellar.mcp_servers.review_columns import ColumnarReviewStore, ReviewColumns
+from wine_cellar.mcp_servers.review_store import InMemoryReviewStore, ReviewTable
+
+BATCH_SIZE = 10_000
+
+
+def decoded_reviews(count: int, seed: int = 0) -> Iterator[dict]:
+    """Yield `count` synthetic reviews decoded from JSON in batches, a wine for every REVIEWS_PER_WINE reviews."""
+    wines = synthetic_wines(max(10, count // REVIEWS_PER_WINE), seed)
+    reviews = iter_reviews(count, wines, seed + 1)
+    while batch := list(islice(reviews, BATCH_SIZE)):
+        yield from json.loads(json.dumps(batch))
+
+
+def measure(build: Callable[[Iterator[dict]], object], count: int) -> int:
+    """Return the bytes still allocated after `build` has consumed `count` reviews."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        built = build(decoded_reviews(count))
+        gc.collect()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del built
+    return allocated
+
+
+def run(count: int) -> dict:
+    """Measure every layout for `count` reviews."""
+    layouts = {
+        "dict_table": lambda reviews: ReviewTable((r["id"], r) for r in reviews),
+        "columnar_table": lambda reviews: ReviewColumns(reviews),
+        "dict_store": InMemoryReviewStore,
+        "columnar_store": ColumnarReviewStore,
+    }
+    result = {"reviews": count}
+    for name, build in layouts.items():
+        allocated = measure(build, count)
+        result[name] = {"bytes": allocated, "bytes_per_review": round(allocated / count, 1)}
+    result["table_ratio"] = round(result["dict_table"]["bytes"] / result["columnar_table"]["bytes"], 2)
+    result["store_ratio"] = round(result["dict_store"]["bytes"] / result["columnar_store"]["bytes"], 2)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=100_000, help="number of synthetic reviews")
+    parser.add_argument("--min-ratio", type=float, default=2.5, help="fail if the store ratio is lower")
+    args = parser.parse_args()
+
+    result = run(args.reviews)
+    print(json.dumps(result, indent=2))
+    if result["store_ratio"] < args.min_ratio:
+        print(f"Columnar store is only {result['store_ratio']}x smaller (expected {args.min_ratio}x)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""
+Scaling benchmark for the review tools and the cellar tools.
+
+Builds seeded synthetic cellars (benchmarks.synthetic_data) at each size,
+times every review tool, retrieve_wines and cellar_summary against them, and checks two
+budgets per case:
+
+- time: the median call must stay under `budget_ms` at every size
+- complexity: the growth exponent between the two largest sizes,
+  log(t_large / t_small) / log(n_large / n_small), must stay under the
+  limit of the case's complexity class, so an O(1) lookup that turns O(n),
+  or an O(n) scan that turns O(n^2), fails even when it is still fast
+
+The report is printed as JSON and the exit status is non-zero when a budget
+is exceeded.
+
+Usage:
+    python -m benchmarks.review_scaling                       # 10, 10k and 1M rows
+    python -m benchmarks.review_scaling --sizes 10,10000 --backend sqlite
+"""
+
+import argparse
+import gc
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from wine_cellar.mcp_servers import review_server
+from wine_cellar.mcp_servers.review_store import create_store
+from wine_cellar.shared_library import tools
+from wine_cellar.shared_library.cellar import Cellar
+from benchmarks.synthetic_data import SIZES, synthetic_cellar
+
+# Largest allowed growth exponent per complexity class
+COMPLEXITY = {"sublinear": 0.5, "linear": 1.25}
+# Growth below this median is timer noise and never fails the complexity check
+NOISE_FLOOR_MS = 0.05
+PAGE_SIZE = 20
+KEYWORDS = ["cherry", "tobacco", "graphite", "vanilla", "mineral", "petrol"]
+
+
+def _tool(name: str):
+    if name in ("retrieve_wines", "recommend_for_meal", "cellar_summary"):
+        return getattr(tools, name)
+    tool = getattr(review_server, name)
+    return tool.fn if hasattr(tool, "fn") else tool
+
+
+class _Fixture:
+    """What the argument builders may draw from for one cellar."""
+
+    def __init__(self, reviews: dict[str, dict]):
+        self.review_ids = list(reviews)
+        self.wine_names = sorted({review["wine_name"] for review in reviews.values()})
+        self.created: list[str] = []
+        self.created_batches: list[list[str]] = []
+
+
+def _misspelt_name(rng: random.Random, fixture: _Fixture) -> dict:
+    # Drop one letter inside the name, so only the similar-name fallback finds it
+    name = rng.choice(fixture.wine_names)
+    position = rng.randrange(1, len(name) - 1)
+    return {"wine_name": name[:position] + name[position + 1:]}
+
+
+def _new_review(rng: random.Random, fixture: _Fixture) -> dict:
+    return {
+        "wine_name": rng.choice(fixture.wine_names),
+        "vintage": rng.randint(1990, 2023),
+        "rating": round(rng.uniform(1, 5), 1),
+        "tasting_notes": f"Benchmark note with {rng.choice(KEYWORDS)}",
+        "reviewer_name": "Benchmark",
+        "price": round(rng.uniform(10, 500), 2),
+    }
+
+
+@dataclass(frozen=True)
+class Case:
+    """
+    One timed tool call.
+
+    Args:
+        name: Case name in the report
+        tool: Review or cellar tool to call
+        arguments: Builds the call's keyword arguments from a seeded RNG and the fixture
+        complexity: "sublinear" or "linear" in the number of rows
+        budget_ms: Largest allowed median call time at any size
+        repeat: Timed calls per size
+    """
+
+    name: str
+    tool: str
+    arguments: Callable[[random.Random, _Fixture], dict]
+    complexity: str = "sublinear"
+    budget_ms: float = 5.0
+    repeat: int = 200
+
+
+# Delete cases consume the ids created by the create cases before them
+CASES = [
+    Case("get_review", "get_review", lambda rng, f: {"review_id": rng.choice(f.review_ids)}, budget_ms=1),
+    Case(
+        "get_reviews", "get_reviews",
+        lambda rng, f: {"review_ids": rng.sample(f.review_ids, min(PAGE_SIZE, len(f.review_ids)))},
+        budget_ms=2,
+    ),
+    Case("list_reviews_first_page", "list_reviews", lambda rng, f: {"limit": PAGE_SIZE}),
+    Case(
+        "list_reviews_by_wine", "list_reviews",
+        lambda rng, f: {"wine_name": rng.choice(f.wine_names), "wine_match": "exact", "limit": PAGE_SIZE},
+    ),
+    Case(
+        "list_reviews_by_wine_contains", "list_reviews",
+        lambda rng, f: {"wine_name": rng.choice(f.wine_names), "limit": PAGE_SIZE},
+    ),
+    Case(
+        "list_reviews_date_range", "list_reviews",
+        lambda rng, f: {"since": "2022-01-01", "until": "2022-07-01", "limit": PAGE_SIZE},
+    ),
+    Case(
+        "search_reviews", "search_reviews",
+        lambda rng, f: {"keyword": rng.choice(KEYWORDS), "limit": PAGE_SIZE},
+        complexity="linear", budget_ms=2000, repeat=10,
+    ),
+    Case(
+        "search_reviews_top_k", "search_reviews",
+        lambda rng, f: {"keyword": " ".join(rng.sample(KEYWORDS, 2)), "match": "any", "top_k": PAGE_SIZE},
+        complexity="linear", budget_ms=2000, repeat=10,
+    ),
+    Case(
+        "similar_reviews", "similar_reviews",
+        lambda rng, f: {"review_id": rng.choice(f.review_ids), "k": PAGE_SIZE},
+        complexity="linear", budget_ms=500, repeat=20,
+    ),
+    Case(
+        "get_average_rating_exact", "get_average_rating",
+        lambda rng, f: {"wine_name": rng.choice(f.wine_names), "wine_match": "exact"},
+        budget_ms=1,
+    ),
+    Case(
+        "get_average_rating_contains", "get_average_rating",
+        lambda rng, f: {"wine_name": rng.choice(f.wine_names).split()[0]},
+        complexity="linear", budget_ms=500, repeat=20,
+    ),
+    Case("get_average_rating_misspelt", "get_average_rating", _misspelt_name, budget_ms=5),
+    Case("top_rated_wines", "top_rated_wines", lambda rng, f: {"k": 5}, complexity="linear", budget_ms=500, repeat=20),
+    Case("review_analytics", "review_analytics", lambda rng, f: {}, complexity="linear", budget_ms=5000, repeat=3),
+    Case("create_review", "create_review", _new_review, budget_ms=5),
+    Case("delete_review", "delete_review", lambda rng, f: {"review_id": f.created.pop()}, budget_ms=5),
+    Case(
+        "create_reviews", "create_reviews",
+        lambda rng, f: {"reviews": [_new_review(rng, f) for _ in range(10)]},
+        budget_ms=20, repeat=50,
+    ),
+    Case(
+        "delete_reviews", "delete_reviews",
+        lambda rng, f: {"review_ids": f.created_batches.pop()},
+        budget_ms=20, repeat=50,
+    ),
+    # Reads back the last changes made by the write cases before it
+    Case(
+        "changes_since", "changes_since",
+        lambda rng, f: {"version": review_server.REVIEWS.version - rng.randint(1, 500), "limit": PAGE_SIZE},
+        budget_ms=1,
+    ),
+    Case("retrieve_wines", "retrieve_wines", lambda rng, f: {}, budget_ms=1),
+    Case(
+        "retrieve_wines_filtered", "retrieve_wines",
+        lambda rng, f: {"colour": "white", "meal": rng.choice(["seafood", "fish", "cheese"]), "limit": PAGE_SIZE},
+        complexity="linear", budget_ms=500, repeat=20,
+    ),
+    Case(
+        "recommend_for_meal", "recommend_for_meal",
+        lambda rng, f: {"meal": rng.choice(["grilled steak", "goat cheese", "smoked salmon", "roast chicken"]), "k": 5},
+        complexity="linear", budget_ms=500, repeat=20,
+    ),
+    Case("cellar_summary", "cellar_summary", lambda rng, f: {}, budget_ms=1),
+]
+
+
+def _remember_created(case: Case, result: dict, fixture: _Fixture) -> None:
+    if case.tool == "create_review":
+        fixture.created.append(result["data"]["review_id"])
+    elif case.tool == "create_reviews":
+        fixture.created_batches.append([item["review_id"] for item in result["data"]["results"]])
+
+
+def time_case(case: Case, fixture: _Fixture, seed: int) -> list[float]:
+    """Call the case's tool `repeat` times (after one warm-up call) and return the timings in ms."""
+    rng = random.Random(seed)
+    tool = _tool(case.tool)
+    timings = []
+    for n in range(case.repeat + 1):
+        arguments = case.arguments(rng, fixture)
+        start = time.perf_counter()
+        result = tool(**arguments)
+        elapsed = time.perf_counter() - start
+        if isinstance(result, str):
+            result = json.loads(result)
+        if result["status"] != "success":
+            raise RuntimeError(f"{case.name} failed with {arguments}: {result}")
+        _remember_created(case, result, fixture)
+        if n:
+            timings.append(elapsed * 1000)
+    return timings
+
+
+def _measure_size(rows: int, backend: str, seed: int, cases: list[Case]) -> tuple[dict, float]:
+    wines, reviews = synthetic_cellar(rows, seed)
+    original_reviews, original_cellar = review_server.REVIEWS, tools.CELLAR
+    with tempfile.TemporaryDirectory() as scratch:
+        started = time.perf_counter()
+        review_server.REVIEWS = create_store(backend, Path(scratch) / "reviews", reviews.values())
+        tools.CELLAR = Cellar(wines)
+        setup = time.perf_counter() - started
+        fixture = _Fixture(reviews)
+        del reviews
+        try:
+            return {case.name: time_case(case, fixture, seed) for case in cases}, setup
+        finally:
+            review_server.REVIEWS.close()
+            review_server.REVIEWS, tools.CELLAR = original_reviews, original_cellar
+            gc.collect()
+
+
+def growth_exponent(sizes: list[int], medians: list[float]) -> Optional[float]:
+    """Return log(t2 / t1) / log(n2 / n1) for the two largest sizes, or None for a single size."""
+    if len(sizes) < 2:
+        return None
+    (n1, t1), (n2, t2) = list(zip(sizes, medians))[-2:]
+    return math.log(max(t2, 1e-6) / max(t1, 1e-6)) / math.log(n2 / n1)
+
+
+def run_scaling(
+    sizes: list[int] = tuple(SIZES.values()),
+    backend: str = "memory",
+    seed: int = 0,
+    budget_scale: float = 1.0,
+    cases: list[Case] = CASES,
+) -> dict:
+    """
+    Time every case at every size and check the budgets.
+
+    Args:
+        sizes: Rows (wines and reviews) per cellar, smallest first
+        backend: Review store backend, as for REVIEW_STORE
+        seed: Seed for the data and the call arguments
+        budget_scale: Multiplier for every time budget, for slower machines
+        cases: Cases to run
+    """
+    sizes = sorted(sizes)
+    timings: dict[str, dict[int, list[float]]] = {case.name: {} for case in cases}
+    setup_seconds = {}
+    for rows in sizes:
+        measured, setup = _measure_size(rows, backend, seed, cases)
+        setup_seconds[str(rows)] = round(setup, 3)
+        for name, samples in measured.items():
+            timings[name][rows] = samples
+
+    report, violations = {}, []
+    for case in cases:
+        medians = [float(np.median(timings[case.name][rows])) for rows in sizes]
+        exponent = growth_exponent(sizes, medians)
+        budget = case.budget_ms * budget_scale
+        for rows, median in zip(sizes, medians):
+            if median > budget:
+                violations.append(f"{case.name}: median {median:.3f} ms at {rows} rows exceeds {budget:g} ms")
+        limit = COMPLEXITY[case.complexity]
+        if exponent is not None and exponent > limit and medians[-1] > NOISE_FLOOR_MS:
+            violations.append(
+                f"{case.name}: grows as n^{exponent:.2f} between {sizes[-2]} and {sizes[-1]} rows, "
+                f"{case.complexity} allows n^{limit:g}"
+            )
+        report[case.name] = {
+            "tool": case.tool,
+            "complexity": case.complexity,
+            "budget_ms": budget,
+            "p50_ms": {str(rows): round(median, 4) for rows, median in zip(sizes, medians)},
+            "p95_ms": {
+                str(rows): round(float(np.percentile(timings[case.name][rows], 95)), 4) for rows in sizes
+            },
+            "growth_exponent": None if exponent is None else round(exponent, 3),
+        }
+    return {
+        "backend": backend,
+        "sizes": sizes,
+        "seed": seed,
+        "setup_seconds": setup_seconds,
+        "cases": report,
+        "violations": violations,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes", default=",".join(str(rows) for rows in SIZES.values()),
+        help="comma-separated cellar sizes in rows",
+    )
+    parser.add_argument("--backend", default="memory", help="memory, columnar, journal or sqlite")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the data and the call arguments")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every time budget")
+    parser.add_argument("--output", type=Path, help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    sizes = [int(rows) for rows in args.sizes.split(",")]
+    result = run_scaling(sizes, args.backend, args.seed, args.budget_scale)
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report + "\n")
+    return 1 if result["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
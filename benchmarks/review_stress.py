@@ -0,0 +1,216 @@
+"""
+Concurrency stress test for the review tools.
+
+Runs hundreds of client threads against the review server's tool functions
+the way FastMCP does (sync tools run on a thread pool). Every client creates,
+lists, searches and deletes its own reviews, and all clients race to delete
+the same shared reviews. Afterwards the store is checked against what the
+clients observed, and throughput and per-tool latency are reported as JSON.
+
+Usage:
+    python -m benchmarks.review_stress --clients 200 --operations 20 --backend memory
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from wine_cellar.mcp_servers import review_server
+from wine_cellar.mcp_servers.review_store import create_store
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
+
+CONTENDED_REVIEWS = 20
+
+
+def _tool(name: str):
+    tool = getattr(review_server, name)
+    return tool.fn if hasattr(tool, "fn") else tool
+
+
+def _call(name: str, timings: dict, **kwargs) -> dict:
+    start = time.perf_counter()
+    result = json.loads(_tool(name)(**kwargs))
+    timings[name].append(time.perf_counter() - start)
+    return result
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _Client:
+    """One simulated agent working on its own wine plus the shared contended reviews."""
+
+    def __init__(self, number: int, operations: int, contended: list[str], start: threading.Barrier):
+        self.number = number
+        self.operations = operations
+        self.contended = contended
+        self.start = start
+        self.wine = f"Stress Wine {number:04d}"
+        self.token = f"sc{number:04d}z"
+        self.alive: set[str] = set()
+        self.created: list[str] = []
+        self.deleted_contended: list[str] = []
+        self.violations: list[str] = []
+        self.timings: dict[str, list[float]] = defaultdict(list)
+
+    def check(self, condition: bool, message: str) -> None:
+        if not condition:
+            self.violations.append(f"client {self.number}: {message}")
+
+    def run(self) -> None:
+        rng = random.Random(self.number)
+        self.start.wait()
+        for n in range(self.operations):
+            data = _call(
+                "create_review", self.timings,
+                wine_name=self.wine, vintage=2000 + n % 20, rating=1 + rng.randrange(9) / 2,
+                tasting_notes=f"Stress note {n} {self.token}", reviewer_name="Stress", price=float(n),
+            )
+            self.check(data["status"] == "success", f"create failed: {data}")
+            review_id = data["data"]["review_id"]
+            self.created.append(review_id)
+            self.alive.add(review_id)
+
+            listed = _call("list_reviews", self.timings, wine_name=self.wine, wine_match="exact")
+            ids = [r["id"] for r in listed["data"]["reviews"]]
+            self.check(set(ids) == self.alive, "list_reviews does not match this client's reviews")
+            self.check(listed["data"]["count"] == len(ids), "count differs from the number of reviews")
+
+            if n % 3 == 2:
+                victim = rng.choice(sorted(self.alive))
+                deleted = _call("delete_review", self.timings, review_id=victim)
+                self.check(deleted["status"] == "success", f"could not delete own review {victim}")
+                self.alive.discard(victim)
+                again = _call("delete_review", self.timings, review_id=victim)
+                self.check(again["status"] == "error", f"review {victim} deleted twice")
+
+            if n % 5 == 0:
+                shared = rng.choice(self.contended)
+                if _call("delete_review", self.timings, review_id=shared)["status"] == "success":
+                    self.deleted_contended.append(shared)
+
+            if n % 7 == 3:
+                found = _call("search_reviews", self.timings, keyword=self.token)
+                ids = {r["id"] for r in found["data"].get("reviews", [])}
+                self.check(ids == self.alive, "search_reviews does not match this client's reviews")
+
+            if n == self.operations // 2:
+                self.walk_pages()
+
+    def walk_pages(self) -> None:
+        """Page through the whole store while others write; keyset cursors must never repeat a review."""
+        seen: set[str] = set()
+        cursor: Optional[str] = None
+        while True:
+            page = _call("list_reviews", self.timings, limit=100, cursor=cursor)
+            ids = [r["id"] for r in page["data"]["reviews"]]
+            self.check(not seen.intersection(ids), "a paged listing returned a review twice")
+            seen.update(ids)
+            cursor = page["data"]["next_cursor"]
+            if cursor is None:
+                break
+        self.check(self.alive <= seen, "a paged listing missed a review that existed throughout")
+
+
+def run_stress(clients: int = 200, operations: int = 20, backend: str = "memory", path: Optional[Path] = None) -> dict:
+    """
+    Run the stress test against a fresh store and return throughput, latency and invariant violations.
+
+    The server's REVIEWS store is replaced for the duration of the run.
+    """
+    original = review_server.REVIEWS
+    with tempfile.TemporaryDirectory() as scratch:
+        review_server.REVIEWS = create_store(backend, path or Path(scratch) / "reviews", FAKE_REVIEWS.values())
+        try:
+            return _run(clients, operations, backend)
+        finally:
+            review_server.REVIEWS.close()
+            review_server.REVIEWS = original
+
+
+def _run(clients: int, operations: int, backend: str) -> dict:
+    timings: dict[str, list[float]] = defaultdict(list)
+    contended = [
+        _call("create_review", timings, wine_name="Contended", vintage=2020, rating=3.0,
+              tasting_notes="Shared")["data"]["review_id"]
+        for _ in range(CONTENDED_REVIEWS)
+    ]
+    barrier = threading.Barrier(clients)
+    workers = [_Client(n, operations, contended, barrier) for n in range(clients)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        futures = [pool.submit(worker.run) for worker in workers]
+        errors = [repr(f.exception()) for f in futures if f.exception() is not None]
+    elapsed = time.perf_counter() - started
+
+    violations = errors + [v for worker in workers for v in worker.violations]
+    deleted = [review_id for worker in workers for review_id in worker.deleted_contended]
+    if len(deleted) != len(set(deleted)):
+        violations.append("a contended review was deleted by more than one client")
+    created = [review_id for worker in workers for review_id in worker.created] + contended
+    if len(created) != len(set(created)):
+        violations.append("duplicate review ids were minted")
+
+    expected = set(FAKE_REVIEWS) | set(contended) - set(deleted)
+    for worker in workers:
+        expected |= worker.alive
+    stored = {review["id"] for review in review_server.REVIEWS.values()}
+    if stored != expected:
+        violations.append(f"store holds {len(stored)} reviews, clients expect {len(expected)}")
+    analytics = _call("review_analytics", timings)["data"]
+    if analytics["review_count"] != len(expected):
+        violations.append("review_analytics count disagrees with the store")
+    for worker in workers:
+        stats = _call("get_average_rating", timings, wine_name=worker.wine, wine_match="exact")
+        count = stats["data"]["review_count"] if stats["status"] == "success" else 0
+        if count != len(worker.alive):
+            violations.append(f"client {worker.number}: aggregates count {count}, expected {len(worker.alive)}")
+
+    for worker in workers:
+        for name, samples in worker.timings.items():
+            timings[name].extend(samples)
+    calls = sum(len(worker_timings) for worker in workers for worker_timings in worker.timings.values())
+    return {
+        "backend": backend,
+        "clients": clients,
+        "operations_per_client": operations,
+        "tool_calls": calls,
+        "seconds": round(elapsed, 3),
+        "calls_per_second": round(calls / elapsed, 1),
+        "latency_ms": {
+            name: {
+                "calls": len(samples),
+                "p50": round(_percentile(samples, 0.50) * 1000, 3),
+                "p99": round(_percentile(samples, 0.99) * 1000, 3),
+            }
+            for name, samples in sorted(timings.items())
+        },
+        "violations": violations,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200, help="number of concurrent clients")
+    parser.add_argument("--operations", type=int, default=20, help="create operations per client")
+    parser.add_argument("--backend", default="memory", help="memory, columnar, journal or sqlite")
+    args = parser.parse_args()
+
+    result = run_stress(args.clients, args.operations, args.backend)
+    print(json.dumps(result, indent=2))
+    return 1 if result["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
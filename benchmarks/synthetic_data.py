@@ -0,0 +1,157 @@
+"""
+Seeded synthetic wine cellar data.
+
+Generates wines shaped like WINES and reviews shaped like FAKE_REVIEWS at any
+size, so benchmarks and tests can look past the handful of sample records.
+Names, tasting notes and prices are assembled from small vocabularies, which
+gives realistic token and name distributions: common and rare tasting-note
+words, repeated reviewers, some reviews without a price, and half of the
+reviews going to a tenth of the wines. The same seed always produces the
+same data.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+SIZES = {"small": 10, "medium": 10_000, "large": 1_000_000}
+REVIEWS_PER_WINE = 50
+
+_HOUSES = {
+    "Château": "France",
+    "Domaine": "France",
+    "Clos": "France",
+    "Tenuta": "Italy",
+    "Cantina": "Italy",
+    "Bodega": "Spain",
+    "Weingut": "Germany",
+    "Quinta": "Portugal",
+    "Estate": "New Zealand",
+    "Viña": "Chile",
+    "Finca": "Argentina",
+}
+_FAMILIES = [
+    "Beaumont", "Rossi", "Moreau", "Lange", "Alvarez", "Serrano", "Costa", "Duval", "Hartmann", "Ferreira",
+    "Marchetti", "Lefèvre", "Navarro", "Keller", "Bianchi", "Olivier", "Sauvage", "Romano", "Fischer", "Mendes",
+    "Vidal", "Laurent", "Conti", "Brunner", "Castillo", "Girard", "Ricci", "Delacroix", "Vogel", "Pereira",
+]
+_GRAPES = {
+    "Cabernet Sauvignon": "red",
+    "Merlot": "red",
+    "Pinot Noir": "red",
+    "Syrah": "red",
+    "Nebbiolo": "red",
+    "Tempranillo": "red",
+    "Malbec": "red",
+    "Sangiovese": "red",
+    "Chardonnay": "white",
+    "Sauvignon Blanc": "white",
+    "Riesling": "white",
+    "Chenin Blanc": "white",
+    "Albariño": "white",
+    "Grenache": "rosé",
+    "Cinsault": "rosé",
+    "Chardonnay-Pinot Noir": "sparkling",
+}
+_MEALS = {
+    "red": ["roast beef", "lamb", "grilled steak", "game", "braised beef", "mature cheeses", "mushroom risotto", "barbecue"],
+    "white": ["seafood", "goat cheese", "light fish", "roast chicken", "creamy sauces", "spicy Asian food", "fresh salads"],
+    "rosé": ["Mediterranean salads", "grilled vegetables", "light seafood", "charcuterie", "paella"],
+    "sparkling": ["oysters", "fried chicken", "sushi", "celebrations", "smoked salmon"],
+}
+_AROMAS = [
+    "blackcurrant", "cherry", "raspberry", "plum", "blackberry", "strawberry", "green apple", "lemon zest", "lime",
+    "peach", "apricot", "passion fruit", "pineapple", "cedar", "tobacco", "leather", "vanilla", "toasted oak",
+    "brioche", "almond", "honey", "violet", "rose petal", "licorice", "graphite", "tar", "truffle", "mint",
+    "black pepper", "white flowers", "petrol", "flint", "herbs", "chocolate", "coffee", "smoke",
+]
+_OPENINGS = [
+    "Vibrant and fresh", "Bold and powerful", "Pure and precise", "Elegant and restrained", "Rich and opulent",
+    "Intense and concentrated", "Delicate and floral", "Ripe and generous", "Lean and mineral", "Earthy and savory",
+]
+_CLOSINGS = [
+    "Silky tannins and a long finish.", "Crisp acidity keeps it lively.", "Firm tannins need a few more years.",
+    "Outstanding minerality and length.", "A bit short on the finish.", "Drinking beautifully right now.",
+    "Creamy texture with persistent bubbles.", "Slightly hot on the palate.", "Great value for the price.",
+    "Needs time to open up in the glass.",
+]
+_FIRST_NAMES = [
+    "Sophie", "James", "Marco", "Emma", "Hans", "Charlotte", "Giuseppe", "Carlos", "Pierre", "Isabelle", "Ana",
+    "Lukas", "Chiara", "Diego", "Hannah", "Olivia", "Mateo", "Yuki", "Noah", "Elena", "Tomás", "Ingrid",
+]
+_LAST_NAMES = [
+    "Dubois", "Wilson", "Rossi", "Thompson", "Mueller", "Laurent", "Bianchi", "García", "Moreau", "Petit",
+    "Silva", "Novak", "Tanaka", "Jensen", "Kowalski", "Martin", "Schmidt", "Russo", "Lopez", "Berg",
+]
+
+
+def synthetic_wines(count: int, seed: int = 0) -> list[dict]:
+    """Return `count` wines with unique names, shaped like WINES."""
+    rng = random.Random(seed)
+    houses = list(_HOUSES)
+    grapes = list(_GRAPES)
+    wines = []
+    uses: dict[str, int] = {}
+    for _ in range(count):
+        house = rng.choice(houses)
+        producer = f"{house} {rng.choice(_FAMILIES)}"
+        grape = rng.choice(grapes)
+        name = f"{producer} {grape}"
+        uses[name] = uses.get(name, 0) + 1
+        if uses[name] > 1:
+            name = f"{name} Cuvée {uses[name]}"
+        colour = _GRAPES[grape]
+        wines.append({
+            "name": name,
+            "producer": producer,
+            "year": rng.randint(1990, 2023),
+            "colour": colour,
+            "country_origin": _HOUSES[house],
+            "grape_variety": grape,
+            "best_meals": rng.sample(_MEALS[colour], 3),
+        })
+    return wines
+
+
+def _tasting_notes(rng: random.Random) -> str:
+    first, second, third = rng.sample(_AROMAS, 3)
+    return f"{rng.choice(_OPENINGS)} with notes of {first}, {second}, and {third}. {rng.choice(_CLOSINGS)}"
+
+
+def iter_reviews(count: int, wines: list[dict], seed: int = 0) -> Iterator[dict]:
+    """Yield `count` reviews of `wines` with sequential ids, shaped like FAKE_REVIEWS."""
+    rng = random.Random(seed)
+    reviewers = [f"{first} {last}" for first in _FIRST_NAMES for last in _LAST_NAMES]
+    popular = wines[: max(1, len(wines) // 10)]
+    start = datetime(2020, 1, 1)
+    for n in range(count):
+        # Half of the reviews go to the first tenth of the wines, like a cellar's favourites
+        wine = rng.choice(popular if rng.random() < 0.5 else wines)
+        yield {
+            "id": f"rev{n + 1:07d}",
+            "wine_name": wine["name"],
+            "vintage": wine["year"],
+            "rating": round(rng.uniform(1, 5), 1),
+            "tasting_notes": _tasting_notes(rng),
+            "reviewer_name": rng.choice(reviewers),
+            "price": round(rng.lognormvariate(3.8, 0.8), 2) if rng.random() < 0.9 else None,
+            "created_at": (start + timedelta(seconds=rng.randrange(5 * 365 * 86400))).isoformat(),
+        }
+
+
+def synthetic_reviews(count: int, wines: list[dict], seed: int = 0) -> dict[str, dict]:
+    """Return `count` reviews of `wines` keyed by id, like FAKE_REVIEWS."""
+    return {review["id"]: review for review in iter_reviews(count, wines, seed)}
+
+
+def synthetic_cellar(rows: int, seed: int = 0) -> tuple[list[dict], dict[str, dict]]:
+    """
+    Return (wines, reviews) for a cellar of `rows` wines and `rows` reviews.
+
+    Reviews cover the first max(10, rows / REVIEWS_PER_WINE) wines, so large
+    cellars have many reviews per reviewed wine. Wine names draw from a fixed
+    vocabulary, so beyond a few thousand wines most names get a "Cuvée n" suffix.
+    """
+    wines = synthetic_wines(rows, seed)
+    reviewed = wines[: max(10, rows // REVIEWS_PER_WINE)]
+    return wines, synthetic_reviews(rows, reviewed, seed + 1)
@@ -0,0 +1,7 @@
+import os
+
+# Keep the cellar behind the tools in memory and the research cache off, so
+# tests never read or write files left in the working directory; tests
+# needing them use tmp_path
+os.environ["CELLAR_DB_PATH"] = ""
+os.environ["RESEARCH_CACHE_PATH"] = ""
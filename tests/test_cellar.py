@@ -0,0 +1,118 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.shared_library.cellar import Cellar, meal_terms, stem
+from wine_cellar.shared_library.wine_data import WINES
+
+
+def wine(name, year=2020, colour="red", country="France", grape="Merlot", meals=("lamb",), producer="Domaine Test"):
+    return {
+        "name": name,
+        "producer": producer,
+        "year": year,
+        "colour": colour,
+        "country_origin": country,
+        "grape_variety": grape,
+        "best_meals": list(meals),
+    }
+
+
+class TestCellar:
+    """Tests for the indexed cellar behind the wine tools"""
+
+    def test_primary_key_lookup(self):
+        cellar = Cellar(WINES)
+        assert len(cellar) == len(WINES)
+        assert cellar.get("barolo", "G.D. VAJRA", 2013) is WINES[5]
+        assert cellar.get("Chateau Margaux", "Chateau Margaux", 2015)["name"] == "Château Margaux"
+        assert cellar.get("Barolo", "G.D. Vajra", 2014) is None
+        assert list(cellar) == WINES
+        assert cellar.wines(2) == WINES[:2]
+
+    def test_same_key_replaces_in_place(self):
+        cellar = Cellar([wine("A"), wine("B")])
+        assert cellar.add(wine("a", colour="white", meals=("oysters",))) is False
+        assert [w["name"] for w in cellar] == ["a", "B"]
+        assert cellar.select(cellar.filter(colour="white")) == [cellar.get("A", "Domaine Test", 2020)]
+        assert cellar.filter(meal="lamb") == {1}
+        assert cellar.summary()["colour"] == {"red": 1, "white": 1}
+        # Another vintage is another wine
+        assert cellar.add(wine("A", year=2021)) is True
+        assert len(cellar) == 3
+        assert cellar.add_many([wine("C"), wine("b", grape="Syrah")]) == [True, False]
+        assert len(cellar) == 4
+
+    def test_filters_stay_consistent_after_replacements(self):
+        cellar = Cellar([wine("A", year=2018), wine("B", year=2019, grape="Pinot Noir")])
+        cellar.add(wine("B", year=2019, grape="Syrah", meals=("barbecue",)))
+        assert cellar.filter(grape_variety="pinot") == set()
+        assert cellar.filter(grape_variety="syrah", meal="barbecue") == {1}
+        assert cellar.filter(meal="lamb") == {0}
+        assert cellar.filter(min_year=2019) == {1}
+        assert cellar.filter(max_year=2018, colour="RED", country_origin="france") == {0}
+
+    def test_select_orders_and_limits(self):
+        cellar = Cellar(wine(f"W{n}", year=2000 + n % 3) for n in range(10))
+        positions = cellar.filter(min_year=2001)
+        assert len(positions) == 6
+        assert [w["name"] for w in cellar.select(positions, 3)] == ["W1", "W2", "W4"]
+
+    def test_summary_counts(self):
+        cellar = Cellar([wine("A", 2019), wine("B", 2018, country="Italy"), wine("C", 2019, "white", "Italy")])
+        assert cellar.summary() == {
+            "total": 3,
+            "colour": {"red": 2, "white": 1},
+            "country_origin": {"Italy": 2, "France": 1},
+            "year": {"2018": 1, "2019": 2},
+        }
+        cellar.add(wine("C", 2019, "red", "France"))
+        summary = cellar.summary()
+        assert summary["colour"] == {"red": 3}
+        assert summary["country_origin"] == {"France": 2, "Italy": 1}
+
+    def test_summary_groups_spellings(self):
+        cellar = Cellar([wine("A", country="Côte d'Ivoire"), wine("B", colour="white", country="cote d'ivoire")])
+        cellar.add(wine("C", colour="RED", country="France"))
+        summary = cellar.summary()
+        assert summary["colour"] == {"red": 2, "white": 1}
+        assert summary["country_origin"] == {"Côte d'Ivoire": 2, "France": 1}
+        # Once every wine with the first spelling is gone, the next one added names the facet
+        cellar.add(wine("A", country="France"))
+        cellar.add(wine("B", colour="white", country="France"))
+        cellar.add(wine("D", country="COTE D'IVOIRE"))
+        assert cellar.summary()["country_origin"] == {"France": 3, "COTE D'IVOIRE": 1}
+
+
+class TestMealPairings:
+    """Tests for the stemmed meal index behind recommend_for_meal"""
+
+    def test_stems_agree_across_inflections(self):
+        assert stem("cheeses") == stem("cheese")
+        assert stem("grilled") == stem("grilling") == stem("grill")
+        assert stem("berries") == "berry"
+        assert stem("dishes") == "dish"
+        assert stem("glass") == stem("glasses") == "glass"
+        assert stem("red") == "red"
+        assert meal_terms("Grilled steak with the aged cheeses") == {"grill", "steak", "aged", "chees"}
+
+    def test_pairings_rank_by_shared_rare_terms(self):
+        cellar = Cellar(WINES)
+        ranked = cellar.pairings("grilled steak", 3)
+        names = [cellar.wines()[position]["name"] for position, _ in ranked]
+        assert names == ["Sassicaia", "Rosé Provence", "Malbec Reserva"]
+        assert ranked[0][1] > ranked[1][1] == ranked[2][1]
+        assert cellar.pairings("pizza", 3) == []
+
+    def test_ties_keep_cellar_order(self):
+        cellar = Cellar(wine(f"W{n}", meals=("lamb", "fish") if n % 2 else ("lamb",)) for n in range(10))
+        assert [position for position, _ in cellar.pairings("lamb", 4)] == [0, 1, 2, 3]
+        assert [position for position, _ in cellar.pairings("lamb with fish", 3)] == [1, 3, 5]
+
+    def test_replaced_pairings_are_reindexed(self):
+        cellar = Cellar([wine("A", meals=("oysters",)), wine("B", meals=("oysters",))])
+        cellar.add(wine("A", meals=("roast chicken",)))
+        assert [position for position, _ in cellar.pairings("oyster", 5)] == [1]
+        assert [position for position, _ in cellar.pairings("chicken", 5)] == [0]
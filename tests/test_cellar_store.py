@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.shared_library.cellar import Cellar
+from wine_cellar.shared_library.cellar_store import PersistentCellar, cellar_from_env, parse_wines, validate_wine
+from wine_cellar.shared_library.wine_data import WINES
+
+
+WINE = {
+    "name": "Brunello di Montalcino",
+    "producer": "Biondi-Santi",
+    "year": 2016,
+    "colour": "red",
+    "country_origin": "Italy",
+    "grape_variety": "Sangiovese",
+    "best_meals": ["wild boar", "aged cheeses"],
+}
+
+
+class TestValidateWine:
+    """Tests for checking and normalizing a summarized wine"""
+
+    def test_normalizes_fields(self):
+        wine = validate_wine({
+            **WINE,
+            "name": "  Brunello di Montalcino ",
+            "year": "2016",
+            "colour": "Rose",
+            "best_meals": ["pasta", " pasta ", ""],
+            "notes": "ignored",
+        })
+        assert wine == {**WINE, "colour": "rosé", "best_meals": ["pasta"]}
+        assert list(wine) == list(WINES[0])
+
+    @pytest.mark.parametrize("field, value", [
+        ("name", ""),
+        ("producer", None),
+        ("year", "2016b"),
+        ("year", True),
+        ("year", 1066),
+        ("colour", "orange"),
+        ("best_meals", "pasta"),
+        ("best_meals", ["pasta", 3]),
+    ])
+    def test_rejects_invalid_fields(self, field, value):
+        with pytest.raises(ValueError, match=field):
+            validate_wine({**WINE, field: value})
+
+    def test_rejects_missing_fields_and_non_objects(self):
+        wine = dict(WINE)
+        del wine["country_origin"]
+        with pytest.raises(ValueError, match="country_origin"):
+            validate_wine(wine)
+        with pytest.raises(ValueError, match="object"):
+            validate_wine(["not", "a", "wine"])
+
+
+class TestParseWines:
+    """Tests for reading the writer agent's JSON reply"""
+
+    def test_plain_fenced_and_wrapped_json(self):
+        text = json.dumps(WINE)
+        assert parse_wines(text) == [WINE]
+        assert parse_wines(f"```json\n{text}\n```") == [WINE]
+        assert parse_wines(f"```\n{text}\n```") == [WINE]
+        assert parse_wines(f"Here is the summary:\n{text}\nEnjoy!") == [WINE]
+
+    def test_list_of_wines(self):
+        other = {**WINE, "year": 2015}
+        assert parse_wines(json.dumps([WINE, other])) == [WINE, other]
+
+    @pytest.mark.parametrize("text", ["", "no json here", "{\"name\": ", "[]", None])
+    def test_rejects_unusable_replies(self, text):
+        with pytest.raises(ValueError):
+            parse_wines(text)
+
+
+class TestPersistentCellar:
+    """Tests for the SQLite-backed cellar behind store_wines"""
+
+    def test_file_created_on_first_write(self, tmp_path):
+        path = tmp_path / "cellar.db"
+        cellar = PersistentCellar(path, WINES)
+        assert len(cellar) == len(WINES)
+        assert not path.exists()
+        assert cellar.add(WINE) is True
+        assert path.exists()
+        cellar.close()
+
+    def test_stored_wines_survive_a_reopen(self, tmp_path):
+        path = tmp_path / "cellar.db"
+        cellar = PersistentCellar(path, WINES)
+        other = {**WINE, "name": "Rosso di Montalcino", "year": 2019}
+        assert cellar.add_many([WINE, other]) == [True, True]
+        cellar.close()
+
+        reopened = PersistentCellar(path, WINES)
+        assert len(reopened) == len(WINES) + 2
+        assert reopened.wines()[-2:] == [WINE, other]
+        assert reopened.filter(country_origin="italy", grape_variety="sangiovese") == {len(WINES), len(WINES) + 1}
+        reopened.close()
+
+    def test_upsert_deduplicates_on_name_producer_and_year(self, tmp_path):
+        path = tmp_path / "cellar.db"
+        cellar = PersistentCellar(path, WINES)
+        cellar.add(WINE)
+        updated = {**WINE, "name": "BRUNELLO DI MONTALCINO", "best_meals": ["bistecca"]}
+        assert cellar.add(updated) is False
+        # Overriding a seed wine stores it, and it keeps its position
+        seed = {**WINES[0], "best_meals": ["duck"]}
+        assert cellar.add(seed) is False
+        cellar.close()
+
+        reopened = PersistentCellar(path, WINES)
+        assert len(reopened) == len(WINES) + 1
+        assert reopened.get("Brunello di Montalcino", "Biondi-Santi", 2016) == updated
+        assert reopened.wines()[0] == seed
+        assert reopened.summary()["total"] == len(WINES) + 1
+        reopened.close()
+
+    def test_failed_batch_stores_nothing(self, tmp_path):
+        cellar = PersistentCellar(tmp_path / "cellar.db", WINES)
+        with pytest.raises(KeyError):
+            cellar.add_many([WINE, {"name": "No producer"}])
+        assert len(cellar) == len(WINES)
+        cellar.close()
+        assert len(PersistentCellar(tmp_path / "cellar.db", WINES)) == len(WINES)
+
+    def test_cellar_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("CELLAR_DB_PATH", str(tmp_path / "env.db"))
+        cellar = cellar_from_env(WINES)
+        assert isinstance(cellar, PersistentCellar) and cellar.path == tmp_path / "env.db"
+        monkeypatch.setenv("CELLAR_DB_PATH", "")
+        cellar = cellar_from_env(WINES)
+        assert type(cellar) is Cellar and len(cellar) == len(WINES)
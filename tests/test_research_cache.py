@@ -0,0 +1,106 @@
+import os
+import sys
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.shared_library.research_cache import ResearchCache, research_cache_from_env, research_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResearchCache(tmp_path / "research.db", ttl=100, max_entries=3, clock=clock)
+    yield cache
+    cache.close()
+
+
+class TestResearchKey:
+    """Tests for the normalized name and vintage keying the research cache"""
+
+    def test_requests_for_one_wine_share_a_key(self):
+        assert research_key("Tignanello 2019") == "tignanello|2019"
+        assert research_key("Store the TIGNANELLO, vintage 2019 please") == "tignanello|2019"
+        assert research_key("Château Margaux 2015") == research_key("chateau margaux 2015")
+
+    def test_vintage_and_name_tell_wines_apart(self):
+        assert research_key("Tignanello 2018") != research_key("Tignanello 2019")
+        assert research_key("Tignanello") == "tignanello|"
+        # Only the last year is the vintage
+        assert research_key("Cuvée 1900 2010") == "cuvee 1900|2010"
+
+
+class TestResearchCache:
+    """Tests for the TTL and LRU research cache behind StoreWineAgent"""
+
+    def test_research_then_summary(self, cache):
+        assert cache.get("a|2019") is None
+        cache.put_research("a|2019", "findings")
+        assert cache.get("a|2019") == {"research_findings": "findings", "final_summary": None}
+        cache.put_summary("a|2019", "{}")
+        assert cache.get("a|2019") == {"research_findings": "findings", "final_summary": "{}"}
+        # New research drops the summary written from the old one
+        cache.put_research("a|2019", "newer findings")
+        assert cache.get("a|2019") == {"research_findings": "newer findings", "final_summary": None}
+
+    def test_entries_expire_with_their_research(self, cache, clock):
+        cache.put_research("a|2019", "findings")
+        clock.now += 60
+        cache.put_summary("a|2019", "{}")
+        clock.now += 39
+        assert cache.get("a|2019")["final_summary"] == "{}"
+        clock.now += 1
+        assert cache.get("a|2019") is None
+        assert len(cache) == 0
+
+    def test_summaries_need_their_research(self, cache, clock):
+        for key in ("a|", "b|", "c|", "d|"):
+            clock.now += 1
+            cache.put_research(key, key)
+        # The research was evicted while the summary was being written: it must not come back
+        cache.put_summary("a|", "{}")
+        assert cache.get("a|") is None
+        assert len(cache) == 3
+
+    def test_least_recently_used_are_evicted(self, cache, clock):
+        for key in ("a|", "b|", "c|"):
+            clock.now += 1
+            cache.put_research(key, key)
+        clock.now += 1
+        cache.get("a|")
+        clock.now += 1
+        cache.put_research("d|", "d")
+        assert len(cache) == 3
+        assert cache.get("b|") is None
+        assert all(cache.get(key) for key in ("a|", "c|", "d|"))
+
+    def test_survives_a_reopen(self, tmp_path, clock):
+        path = tmp_path / "research.db"
+        cache = ResearchCache(path, clock=clock)
+        assert cache.get("a|") is None and len(cache) == 0
+        assert not path.exists()
+        cache.put_research("a|", "findings")
+        cache.close()
+        assert ResearchCache(path, clock=clock).get("a|")["research_findings"] == "findings"
+
+    def test_research_cache_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RESEARCH_CACHE_PATH", str(tmp_path / "env.db"))
+        monkeypatch.setenv("RESEARCH_CACHE_TTL", "60")
+        monkeypatch.setenv("RESEARCH_CACHE_SIZE", "5")
+        cache = research_cache_from_env()
+        assert (cache.path, cache.ttl, cache.max_entries) == (tmp_path / "env.db", 60, 5)
+        monkeypatch.setenv("RESEARCH_CACHE_PATH", "")
+        assert research_cache_from_env() is None
@@ -0,0 +1,113 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers.review_analytics import (
+    ReviewFrame,
+    filter_frame,
+    group_averages,
+    price_percentiles,
+    rating_histogram,
+)
+from wine_cellar.mcp_servers.review_store import create_store
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
+
+
+def as_reviews(frame):
+    """Turn a frame back into comparable rows, independent of name codes."""
+    return sorted(
+        (
+            frame.wine_names[wine],
+            int(vintage),
+            float(rating),
+            frame.reviewer_names[reviewer],
+            None if np.isnan(price) else float(price),
+        )
+        for wine, vintage, rating, reviewer, price in zip(
+            frame.wine, frame.vintage, frame.rating, frame.reviewer, frame.price
+        )
+    )
+
+
+class TestStatistics:
+    """Tests for the vectorized statistics"""
+
+    def test_histogram_includes_top_rating(self):
+        histogram = rating_histogram(np.array([1.0, 4.9, 5.0, 5.0]), bin_width=0.3)
+        assert histogram[0] == {"from": 1.0, "to": 1.3, "count": 1}
+        assert histogram[-1]["to"] >= 5.0
+        assert histogram[-1]["count"] == 3
+        assert sum(b["count"] for b in histogram) == 4
+
+    def test_percentiles_without_prices(self):
+        stats = price_percentiles(np.array([np.nan, np.nan]), [50, 90])
+        assert stats == {
+            "priced_reviews": 0,
+            "average": None,
+            "min": None,
+            "max": None,
+            "percentiles": {"p50": None, "p90": None},
+        }
+
+    def test_group_average_price_ignores_missing_prices(self):
+        frame = ReviewFrame.from_records([
+            ("A", 2020, 4.0, "X", 10.0),
+            ("A", 2020, 2.0, "X", None),
+            ("B", 2019, 5.0, "Y", None),
+        ])
+        assert group_averages(frame, "vintage") == [
+            {"vintage": 2019, "review_count": 1, "average_rating": 5.0, "average_price": None},
+            {"vintage": 2020, "review_count": 2, "average_rating": 3.0, "average_price": 10.0},
+        ]
+        with pytest.raises(ValueError):
+            group_averages(frame, "country")
+
+    def test_groups_ignore_case_and_accents(self):
+        frame = ReviewFrame.from_records([
+            ("Opus One", 2018, 4.0, "Zoé", None),
+            ("opus one", 2018, 2.0, "ZOE", None),
+            ("Rosé", 2020, 5.0, "zoe", None),
+        ])
+        assert group_averages(frame, "wine") == [
+            {"wine": "Opus One", "review_count": 2, "average_rating": 3.0, "average_price": None},
+            {"wine": "Rosé", "review_count": 1, "average_rating": 5.0, "average_price": None},
+        ]
+        assert [(row["reviewer"], row["review_count"]) for row in group_averages(frame, "reviewer")] == [("Zoé", 3)]
+
+    def test_filter_frame(self):
+        frame = ReviewFrame.from_reviews(FAKE_REVIEWS.values())
+        assert filter_frame(frame) is frame
+        filtered = filter_frame(frame, reviewer_name="MARCO ROSSI", min_vintage=2016)
+        assert as_reviews(filtered) == [("Sassicaia", 2016, 4.8, "Marco Rossi", 220.0)]
+
+
+@pytest.mark.parametrize("backend", ["memory", "columnar", "sqlite"])
+def test_backends_build_the_same_frame(backend, tmp_path):
+    store = create_store(backend, tmp_path / "reviews.db", FAKE_REVIEWS.values())
+    store.remove("rev004")
+    store.add({**FAKE_REVIEWS["rev004"], "id": "new001", "price": None})
+    expected = [
+        (r["wine_name"], r["vintage"], r["rating"], r["reviewer_name"], r["price"])
+        for r in store.values()
+    ]
+
+    assert as_reviews(store.frame()) == sorted(expected)
+    assert as_reviews(store.frame("cloudy", "prefix")) == sorted(e for e in expected if e[0].startswith("Cloudy"))
+    store.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "columnar", "journal"])
+def test_in_memory_frame_is_kept_until_a_change(backend, tmp_path):
+    store = create_store(backend, tmp_path / "reviews", FAKE_REVIEWS.values())
+    frame = store.frame()
+    assert store.frame() is frame
+    store.add({**FAKE_REVIEWS["rev001"], "id": "new001"})
+    changed = store.frame()
+    assert changed is not frame and len(changed) == len(frame) + 1
+    store.remove("new001")
+    assert len(store.frame()) == len(frame)
+    store.close()
@@ -0,0 +1,48 @@
+import os
+import sys
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers.review_changes import ChangeLog
+
+
+class TestChangeLog:
+    """Tests for the bounded log of review changes"""
+
+    def test_returns_changes_after_a_version_in_order(self):
+        log = ChangeLog(100)
+        for version in range(101, 106):
+            log.record(version, "create", f"r{version}", "Wine")
+        changes, complete = log.since(102, 10)
+        assert complete
+        assert [change.version for change in changes] == [103, 104, 105]
+        assert changes[0].to_dict() == {"version": 103, "kind": "create", "review_id": "r103", "wine_name": "Wine"}
+
+    def test_limit_and_caught_up(self):
+        log = ChangeLog(0)
+        for version in range(1, 6):
+            log.record(version, "delete", f"r{version}", "Wine")
+        changes, _ = log.since(0, 2)
+        assert [change.version for change in changes] == [1, 2]
+        assert log.since(5, 10) == ([], True)
+
+    def test_dropped_changes_make_older_versions_incomplete(self):
+        log = ChangeLog(0, capacity=3)
+        for version in range(1, 6):
+            log.record(version, "create", f"r{version}", "Wine")
+        assert log.floor == 2
+        assert log.since(1, 10) == ([], False)
+        changes, complete = log.since(2, 10)
+        assert complete
+        assert [change.version for change in changes] == [3, 4, 5]
+
+    def test_versions_before_the_start_are_incomplete(self):
+        log = ChangeLog(50)
+        assert log.since(49, 10) == ([], False)
+        assert log.since(50, 10) == ([], True)
+
+    def test_capacity_must_be_positive(self):
+        with pytest.raises(ValueError):
+            ChangeLog(0, capacity=0)
@@ -0,0 +1,169 @@
+import os
+import sys
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.review_memory import measure
+from wine_cellar.mcp_servers import review_columns
+from wine_cellar.mcp_servers.pagination import PageRequest
+from wine_cellar.mcp_servers.review_columns import ColumnarReviewStore, ReviewColumns
+from wine_cellar.mcp_servers.review_index import KeyRange
+from wine_cellar.mcp_servers.review_store import REVIEW_FIELDS, InMemoryReviewStore, ReviewTable
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
+
+
+def new_review(review_id, notes="Ripe cherry", **fields):
+    review = {
+        "id": review_id,
+        "wine_name": "Columnar Test Wine",
+        "vintage": 2020,
+        "rating": 4.0,
+        "tasting_notes": notes,
+        "reviewer_name": "Tester",
+        "price": None,
+        "created_at": "2025-01-01T00:00:00",
+    }
+    review.update(fields)
+    return review
+
+
+class TestReviewColumns:
+    """Tests for the columnar review table"""
+
+    def test_round_trip(self):
+        table = ReviewColumns(FAKE_REVIEWS.values())
+        assert len(table) == len(FAKE_REVIEWS)
+        for review_id, review in FAKE_REVIEWS.items():
+            assert table[review_id] == review
+            assert list(table[review_id]) == list(REVIEW_FIELDS)
+
+    def test_optional_price_and_microseconds(self):
+        table = ReviewColumns()
+        table["a"] = new_review("a", created_at="2025-03-04T05:06:07.089000", price=None)
+        table["b"] = new_review("b", notes="Crème brûlée 🍷", price=12.5)
+        assert table["a"]["price"] is None
+        assert table["a"]["created_at"] == "2025-03-04T05:06:07.089000"
+        assert table["b"]["tasting_notes"] == "Crème brûlée 🍷"
+        assert table["b"]["price"] == 12.5
+
+    def test_value_reads_single_fields(self):
+        table = ReviewColumns(FAKE_REVIEWS.values())
+        for review_id, review in FAKE_REVIEWS.items():
+            for field in REVIEW_FIELDS:
+                assert table.value(review_id, field) == review[field]
+
+    def test_names_are_interned(self):
+        table = ReviewColumns(new_review(str(i), wine_name="Barolo") for i in range(100))
+        assert len(table._wine_names) == 1
+        assert len(table._reviewer_names) == 1
+
+    def test_deleted_rows_are_reused(self):
+        table = ReviewColumns(new_review(str(i)) for i in range(10))
+        del table["3"]
+        assert "3" not in table
+        table["new"] = new_review("new", notes="Fresh")
+        assert len(table._ids) == 10
+        assert table["new"]["tasting_notes"] == "Fresh"
+        with pytest.raises(KeyError):
+            table["3"]
+
+    def test_replacing_a_review(self):
+        table = ReviewColumns([new_review("a")])
+        table["a"] = new_review("a", notes="Changed", rating=2.0)
+        assert len(table) == 1
+        assert table["a"]["tasting_notes"] == "Changed"
+        assert table["a"]["rating"] == 2.0
+
+    def test_notes_buffer_is_compacted(self, monkeypatch):
+        monkeypatch.setattr(review_columns, "_MIN_GARBAGE", 0)
+        table = ReviewColumns(new_review(str(i), notes=f"Note number {i}") for i in range(20))
+        for i in range(15):
+            del table[str(i)]
+        live = sum(len(f"Note number {i}") for i in range(15, 20))
+        assert len(table._notes) - table._garbage == live
+        assert len(table._notes) <= 2 * live
+        assert [table[str(i)]["tasting_notes"] for i in range(15, 20)] == [f"Note number {i}" for i in range(15, 20)]
+
+    def test_invalid_value_leaves_table_unchanged(self):
+        table = ReviewColumns([new_review("a")])
+        with pytest.raises(TypeError):
+            table["b"] = new_review("b", vintage="2019")
+        with pytest.raises(ValueError):
+            table["c"] = new_review("c", created_at="2025-01-01T00:00:00+02:00")
+        assert list(table) == ["a"]
+        assert all(len(column) == 1 for column in (table._wine, table._vintage, table._rating, table._created_at))
+        table["b"] = new_review("b")
+        assert table["b"] == new_review("b")
+
+    def test_uses_less_memory_than_dicts(self):
+        dict_bytes = measure(lambda reviews: ReviewTable((r["id"], r) for r in reviews), 2000)
+        columnar_bytes = measure(ReviewColumns, 2000)
+        assert dict_bytes > 2 * columnar_bytes
+
+
+def test_columnar_store_matches_dict_store():
+    store = ColumnarReviewStore(FAKE_REVIEWS.values())
+    reference = InMemoryReviewStore(FAKE_REVIEWS.values())
+    for page in (PageRequest(order_by="rating", descending=True, limit=2), PageRequest(after=("2023-09-01", "x"))):
+        assert store.find(page, min_rating=4.0) == reference.find(page, min_rating=4.0)
+        assert store.search(page, "cherry") == reference.search(page, "cherry")
+    assert store.get("rev001") == FAKE_REVIEWS["rev001"]
+    assert store.get("rev001") is not store.get("rev001")
+
+
+class TestColumnarStoreIndexes:
+    """The row-keyed indexes of ColumnarReviewStore answer like the dict store's."""
+
+    def reviews(self, count):
+        names = ["Barolo Riserva", "Barbaresco", "Chablis Premier Cru", "Rosé de Provence"]
+        notes = ["Ripe cherry and tar", "cherry cherry, roses", "Flinty citrus", "Strawberry and fresh herbs"]
+        return [
+            new_review(
+                f"r{n:03d}", notes[n % 4] + (" finish" * (n % 3)),
+                wine_name=names[n % 4], vintage=2010 + n % 7, rating=float(1 + n % 5),
+                price=None if n % 5 == 0 else 10.0 + n, created_at=f"2025-01-{1 + n % 28:02d}T00:00:{n % 60:02d}",
+            )
+            for n in range(count)
+        ]
+
+    def assert_same(self, store, reference):
+        page = PageRequest(limit=5)
+        for wine_name, match in (("bar", "contains"), ("barolo riserva", "exact"), ("ch", "prefix")):
+            assert store.find(page, wine_name=wine_name, wine_match=match) == \
+                reference.find(page, wine_name=wine_name, wine_match=match)
+            assert store.wine_stats(wine_name, match) == reference.wine_stats(wine_name, match)
+        ranges = {"price": KeyRange(20, 60), "created_at": KeyRange("2025-01-05")}
+        for order_by in ("created_at", "price", "vintage"):
+            ordered = PageRequest(order_by=order_by, descending=True, limit=7)
+            assert store.find(ordered, ranges=ranges) == reference.find(ordered, ranges=ranges)
+            assert store.find(ordered) == reference.find(ordered)
+        assert store.search(page, "cherr ros", "any") == reference.search(page, "cherr ros", "any")
+        assert store.search_ranked("cherry finish", 5, "any") == reference.search_ranked("cherry finish", 5, "any")
+        assert store.top_rated(3) == reference.top_rated(3)
+        assert store.similar_wines("barollo") == reference.similar_wines("barollo")
+        assert len(store) == len(reference)
+
+    def test_indexes_follow_replacements_and_deletes(self):
+        reviews = self.reviews(120)
+        store, reference = ColumnarReviewStore(reviews), InMemoryReviewStore(reviews)
+        self.assert_same(store, reference)
+
+        # Deleted rows are reused by the reviews added next, out of row order
+        for target in (store, reference):
+            target.remove_many([f"r{n:03d}" for n in range(0, 120, 3)])
+            target.add(new_review("r001", "Corked", wine_name="Chablis Premier Cru", rating=1.0, price=99.0))
+            target.add_many(self.reviews(140)[120:])
+        self.assert_same(store, reference)
+        assert store.wine_keys("rosé") == reference.wine_keys("rosé") == {"rose de provence"}
+
+        for target in (store, reference):
+            target.remove_many([review["id"] for review in self.reviews(140) if review["wine_name"] == "Barbaresco"])
+        self.assert_same(store, reference)
+        assert store.wine_keys("barb") == set()
+
+    def test_store_uses_less_memory_than_dict_store(self):
+        dict_bytes = measure(InMemoryReviewStore, 5000)
+        columnar_bytes = measure(ColumnarReviewStore, 5000)
+        assert dict_bytes > 2.5 * columnar_bytes
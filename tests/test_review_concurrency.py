@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+import time
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.review_stress import run_stress
+from wine_cellar.mcp_servers.review_store import ReadWriteLock
+
+
+class TestReadWriteLock:
+    """Tests for the store's reader-writer lock"""
+
+    def test_readers_share_the_lock(self):
+        lock = ReadWriteLock()
+        inside = threading.Barrier(3, timeout=5)
+
+        def reader():
+            with lock.read():
+                inside.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_writer_excludes_readers_and_goes_first(self):
+        lock = ReadWriteLock()
+        events = []
+
+        def writer():
+            with lock.write():
+                events.append("write")
+
+        def late_reader():
+            with lock.read():
+                events.append("late read")
+
+        with lock.read():
+            writer_thread = threading.Thread(target=writer)
+            writer_thread.start()
+            while not lock._waiting_writers:
+                time.sleep(0.001)
+            reader_thread = threading.Thread(target=late_reader)
+            reader_thread.start()
+            time.sleep(0.05)
+            assert events == []
+        writer_thread.join()
+        reader_thread.join()
+        assert events == ["write", "late read"]
+
+
+@pytest.mark.parametrize("backend", ["memory", "columnar", "journal", "sqlite"])
+def test_concurrent_clients_keep_invariants(backend, tmp_path):
+    result = run_stress(clients=200, operations=10, backend=backend, path=tmp_path / "reviews")
+    assert result["violations"] == []
+    assert result["tool_calls"] >= 200 * 10 * 2
+    assert result["calls_per_second"] > 0
@@ -0,0 +1,31 @@
+import os
+import sys
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.review_http_load import DEFAULT_MIX, parse_mix, run_load
+
+
+class TestParseMix:
+    """Tests for the tool mix option"""
+
+    def test_weights(self):
+        assert parse_mix("list_reviews=3, get_review=1.5") == {"list_reviews": 3.0, "get_review": 1.5}
+
+    @pytest.mark.parametrize("text", ["list_reviews", "drop_table=1", "get_review=-1", "get_review=0"])
+    def test_rejects_invalid_mix(self, text):
+        with pytest.raises(ValueError):
+            parse_mix(text)
+
+
+def test_drives_every_tool_over_http():
+    result = run_load(clients=3, duration=2.0, warmup=0.0, seed=1)
+    assert set(result["tools"]) == set(DEFAULT_MIX)
+    assert result["total"]["failures"] == 0
+    assert result["total"]["calls"] == sum(tool["calls"] for tool in result["tools"].values())
+    for tool in result["tools"].values():
+        assert tool["calls"] > 0
+        latency = tool["latency_ms"]
+        assert 0 < latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
@@ -0,0 +1,53 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers.review_ids import ReviewIdGenerator
+
+
+class FakeClock:
+    def __init__(self, ms):
+        self.ms = ms
+
+    def __call__(self):
+        return self.ms * 1_000_000
+
+
+class TestReviewIdGenerator:
+    """Tests for time-sortable review ids"""
+
+    def test_ids_sort_by_time(self):
+        clock = FakeClock(1_700_000_000_000)
+        generator = ReviewIdGenerator(clock)
+        earlier = generator.new_id()
+        clock.ms += 1
+        later = generator.new_id()
+        assert len(earlier) == len(later) == 16
+        assert earlier < later
+        assert earlier[:10] < later[:10]
+
+    def test_same_millisecond_counts_up(self):
+        generator = ReviewIdGenerator(FakeClock(1_700_000_000_000))
+        review_ids = [generator.new_id() for _ in range(1000)]
+        assert review_ids == sorted(set(review_ids))
+        assert len({review_id[:10] for review_id in review_ids}) == 1
+
+    def test_clock_stepping_back_stays_monotonic(self):
+        clock = FakeClock(1_700_000_000_000)
+        generator = ReviewIdGenerator(clock)
+        first = generator.new_id()
+        clock.ms -= 5000
+        assert generator.new_id() > first
+
+    def test_skips_existing_ids(self):
+        checked = []
+
+        def exists(review_id):
+            checked.append(review_id)
+            return len(checked) <= 2
+
+        review_id = ReviewIdGenerator(FakeClock(1_700_000_000_000)).new_id(exists)
+        assert review_id == checked[-1]
+        assert len(checked) == len(set(checked)) == 3
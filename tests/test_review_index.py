@@ -0,0 +1,348 @@
+import math
+import os
+import random
+import sys
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers.review_index import (
+    KeyRange,
+    NameIndex,
+    NameMatcher,
+    RatingAggregates,
+    SortedIndex,
+    TokenIndex,
+    TrigramIndex,
+    normalize_text,
+    tokenize,
+    trigrams,
+)
+
+
+def test_normalize_text_strips_case_and_accents():
+    assert normalize_text("Rosé Provence") == "rose provence"
+    assert normalize_text("CHÂTEAU") == "chateau"
+
+
+def test_tokenize_splits_on_punctuation():
+    assert tokenize("Plum, blackberry & hints of chocolate!") == ["plum", "blackberry", "hints", "of", "chocolate"]
+
+
+class TestTokenIndex:
+    """Tests for the tasting notes inverted index"""
+
+    @pytest.fixture
+    def index(self):
+        index = TokenIndex()
+        index.add("a", "Dark cherry and fruity plum")
+        index.add("b", "Tropical fruit and citrus")
+        index.add("c", "Cherry, citrus and crème brûlée")
+        return index
+
+    def test_prefix_match(self, index):
+        assert index.search("fruit") == {"a", "b"}
+
+    def test_all_and_any(self, index):
+        assert index.search("cherry citrus") == {"c"}
+        assert index.search("plum citrus", match="any") == {"a", "b", "c"}
+
+    def test_accent_insensitive(self, index):
+        assert index.search("creme brulee") == {"c"}
+
+    def test_remove_prunes_vocabulary(self, index):
+        index.remove("b")
+        assert index.search("tropical") == set()
+        assert index.search("citrus") == {"c"}
+        assert "tropical" not in index._vocabulary
+
+    def test_readd_replaces_terms(self, index):
+        index.add("a", "Leather and tobacco")
+        assert index.search("cherry") == {"c"}
+        assert index.search("tobacco") == {"a"}
+
+    def test_invalid_match(self, index):
+        with pytest.raises(ValueError):
+            index.search("cherry", match="most")
+        with pytest.raises(ValueError):
+            index.rank("cherry", 3, match="most")
+
+
+class TestBM25Ranking:
+    """Tests for BM25 ranking over the tasting notes index"""
+
+    @pytest.fixture
+    def index(self):
+        index = TokenIndex()
+        index.add("long", "Cherry with leather, tobacco, cedar, graphite and a long savory finish")
+        index.add("short", "Cherry and plum")
+        index.add("twice", "Cherry, cherry and more cherry on the palate")
+        for n in range(10):
+            index.add(f"other{n}", "Crisp citrus and green apple")
+        return index
+
+    def test_bm25_score(self, index):
+        # One document, three tokens: idf = ln(12.5 / 1.5), length norm = 1.2 * (1 - 0.75 + 0.75 * 3 / avgdl)
+        average = (11 + 3 + 8 + 10 * 5) / 13
+        expected = math.log(12.5 / 1.5) * 2.2 / (1 + 1.2 * (0.25 + 0.75 * 3 / average))
+        assert index.rank("plum", 5) == [("short", pytest.approx(expected))]
+
+    def test_frequency_and_length_order(self, index):
+        assert [review_id for review_id, _ in index.rank("cherry", 5)] == ["twice", "short", "long"]
+
+    def test_rare_terms_weigh_more(self, index):
+        ranked = index.rank("cherry citrus", 20, match="any")
+        assert [review_id for review_id, _ in ranked[:3]] == ["twice", "short", "long"]
+        assert ranked[0][1] > ranked[3][1]
+
+    def test_top_k_ties_and_prefixes(self, index):
+        top = index.rank("citr", 3)
+        assert [review_id for review_id, _ in top] == ["other0", "other1", "other2"]
+        assert len({score for _, score in top}) == 1
+        assert index.rank("missing", 3) == []
+        [(review_id, both)] = index.rank("cherry leather", 3)
+        assert review_id == "long"
+        assert both > index.rank("leather", 1)[0][1]
+
+    def test_statistics_follow_removals(self, index):
+        before = dict(index.rank("cherry", 3))
+        for n in range(10):
+            index.remove(f"other{n}")
+        assert index._total_length == 22
+        after = dict(index.rank("cherry", 3))
+        assert after.keys() == before.keys()
+        # Every document now holds "cherry", so its idf drops to the floor
+        assert all(score < 1e-5 for score in after.values())
+
+
+class TestNameIndex:
+    """Tests for the normalized wine name index"""
+
+    @pytest.fixture
+    def index(self):
+        index = NameIndex()
+        index.add("r1", "Rosé Provence")
+        index.add("r2", "Rose Provence")
+        index.add("r3", "Château Margaux")
+        index.add("r4", "Pavillon Rouge du Château Margaux")
+        return index
+
+    def test_exact(self, index):
+        assert index.search("ROSÉ provence", mode="exact") == {"r1", "r2"}
+
+    def test_prefix(self, index):
+        assert index.search("chat", mode="prefix") == {"r3"}
+
+    def test_contains(self, index):
+        assert index.search("margaux") == {"r3", "r4"}
+        assert index.search("du chat") == {"r4"}
+
+    def test_remove_last_review_drops_name(self, index):
+        index.remove("r4")
+        assert index.search("rouge") == set()
+        assert index.names("") == {"rose provence", "chateau margaux"}
+        assert "pavillon rouge du chateau margaux" not in index._matcher
+        assert all("pavillon rouge du chateau margaux" not in names for names in index._matcher._names._postings.values())
+        assert "pavillon" not in index._matcher._word_names
+
+    def test_invalid_mode(self, index):
+        with pytest.raises(ValueError):
+            index.search("margaux", mode="fuzzy")
+
+    def test_add_many_matches_add(self, index):
+        entries = [(f"b{n}", f"Bulk Wine {n % 80}") for n in range(200)] + [("r4", "Barolo"), ("b0", "Barolo")]
+        bulk = NameIndex()
+        bulk.add_many([("r1", "Rosé Provence"), ("r2", "Rose Provence"), ("r3", "Château Margaux"),
+                       ("r4", "Pavillon Rouge du Château Margaux")] + entries)
+        for review_id, name in entries:
+            index.add(review_id, name)
+        assert bulk._names == index._names
+        assert bulk._matcher._names._postings == index._matcher._names._postings
+        assert bulk.search("barolo") == {"r4", "b0"}
+        assert bulk.search("rouge") == set()
+
+
+class TestTrigramIndex:
+    """Tests for the trigram index behind substring and fuzzy name lookups"""
+
+    @pytest.fixture
+    def index(self):
+        index = TrigramIndex()
+        for word in ["nebbiolo", "sangiovese", "merlot", "malbec", "barbera"]:
+            index.add(word)
+        return index
+
+    def test_trigrams_are_padded(self):
+        assert trigrams("abc") == {"  a", " ab", "abc", "bc "}
+
+    def test_contains(self, index):
+        assert index.contains("bbio") == {"nebbiolo"}
+        assert index.contains("b") == {"nebbiolo", "malbec", "barbera"}
+        assert index.contains("xyz") == set()
+
+    def test_similar_tolerates_typos(self, index):
+        assert index.similar("nebiolo")[0] == ("nebbiolo", 0.875)
+        assert index.similar("malbek", limit=1) == [("malbec", 0.714)]
+        assert index.similar("zinfandel") == []
+
+    def test_remove(self, index):
+        index.remove("nebbiolo")
+        index.remove("unknown")
+        assert "nebbiolo" not in index
+        assert index.similar("nebiolo") == []
+        assert len(index) == 4
+
+
+class TestNameMatcher:
+    """Tests for word-by-word fuzzy wine name matching"""
+
+    @pytest.fixture
+    def matcher(self):
+        matcher = NameMatcher()
+        for name in ["chateau margaux", "pavillon rouge du chateau margaux", "sassicaia", "tenuta rossi nebbiolo",
+                     "tenuta rossi nebbiolo cuvee 2", "tenuta romano barbera"]:
+            matcher.add(name)
+        return matcher
+
+    def test_misspelt_names(self, matcher):
+        assert matcher.similar("chateu margaux", limit=1) == [("chateau margaux", 0.857)]
+        assert matcher.similar("sasicaia", limit=1)[0][0] == "sassicaia"
+        assert [name for name, _ in matcher.similar("tenuta rosi nebiolo")] == [
+            "tenuta rossi nebbiolo", "tenuta rossi nebbiolo cuvee 2",
+        ]
+
+    def test_unmatched_words_lower_the_similarity(self, matcher):
+        name, similarity = matcher.similar("sassicaia riserva")[0]
+        assert name == "sassicaia"
+        assert similarity == 0.5
+        assert matcher.similar("sassicaia riserva speciale") == []
+        assert matcher.similar("opus one") == []
+
+    def test_words_no_name_shares_are_skipped(self, matcher):
+        # Both words are known but no name holds both; the first of the equally rare words wins
+        assert matcher.similar("sassicaia barbera") == [("sassicaia", 0.5)]
+
+    def test_follows_adds_and_removes(self, matcher):
+        matcher.remove("sassicaia")
+        assert matcher.similar("sasicaia") == []
+        assert "sassicaia" not in matcher._vocabulary
+        matcher.add("sassicaia bolgheri")
+        assert matcher.similar("sasicaia")[0][0] == "sassicaia bolgheri"
+        assert matcher.contains("bolgh") == {"sassicaia bolgheri"}
+
+    def test_ranks_many_candidates_by_length(self):
+        matcher = NameMatcher()
+        for n in range(500):
+            matcher.add(f"domaine {'x' * (n % 40)} cuvee {n}")
+        matcher.add("domaine")
+        assert matcher.similar("domain", limit=2)[0] == ("domaine", 0.857)
+
+
+class TestSortedIndex:
+    """Tests for the sorted range index"""
+
+    @pytest.fixture
+    def index(self):
+        index = SortedIndex()
+        for review_id, price in [("a", 30.0), ("b", 45.0), ("c", 45.0), ("d", 80.0), ("e", None)]:
+            index.add(review_id, price)
+        return index
+
+    def test_ranges(self, index):
+        assert list(index.ids()) == ["a", "b", "c", "d"]
+        assert list(index.ids(KeyRange(40, 80))) == ["b", "c", "d"]
+        assert list(index.ids(KeyRange(high=45))) == ["a", "b", "c"]
+        assert list(index.ids(KeyRange(high=45, high_inclusive=False))) == ["a"]
+        assert list(index.ids(KeyRange(90))) == []
+        assert list(index.ids(KeyRange(50, 40))) == []
+        assert index.count(KeyRange(45, 45)) == 2
+
+    def test_descending_after_position(self, index):
+        assert list(index.ids(descending=True)) == ["d", "c", "b", "a"]
+        assert list(index.ids(after=(45.0, "b"))) == ["c", "d"]
+        assert list(index.ids(KeyRange(high=80, high_inclusive=False), descending=True, after=(45.0, "c"))) == ["b", "a"]
+
+    def test_remove(self, index):
+        index.remove("b", 45.0)
+        index.remove("b", 45.0)
+        index.remove("e", None)
+        assert list(index.ids()) == ["a", "c", "d"]
+        assert len(index) == 3
+
+    def test_add_many(self, index):
+        bulk = SortedIndex()
+        entries = [(f"x{n:03d}", float(n % 50)) for n in range(100)]
+        bulk.add_many(entries + [("a", 30.0), ("y", None)])
+        for review_id, value in entries:
+            index.add(review_id, value)
+        index.remove("b", 45.0)
+        index.remove("c", 45.0)
+        index.remove("d", 80.0)
+        assert len(bulk) == len(index)
+        assert list(bulk.ids()) == list(index.ids())
+        assert list(bulk.ids(KeyRange(20, 30), descending=True)) == list(index.ids(KeyRange(20, 30), descending=True))
+
+    def test_blocks_split_and_merge(self, monkeypatch):
+        monkeypatch.setattr(SortedIndex, "LOAD", 4)
+        rng = random.Random(3)
+        index, expected = SortedIndex(), []
+        for n in range(300):
+            review_id, value = f"r{n:03d}", rng.randrange(40)
+            index.add(review_id, value)
+            expected.append((value, review_id))
+        for value, review_id in rng.sample(expected, 200):
+            index.remove(review_id, value)
+            expected.remove((value, review_id))
+        expected.sort()
+        assert max(len(block) for block in index._blocks) <= 8
+        assert len(index) == len(expected)
+        assert list(index.ids()) == [review_id for _, review_id in expected]
+        for low, high in [(5, 20), (0, 0), (39, None), (None, 7)]:
+            inside = [e for e in expected if (low is None or e[0] >= low) and (high is None or e[0] <= high)]
+            assert index.count(KeyRange(low, high)) == len(inside)
+            assert list(index.ids(KeyRange(low, high), descending=True)) == [i for _, i in reversed(inside)]
+        middle = expected[len(expected) // 2]
+        assert list(index.ids(after=middle)) == [i for v, i in expected if (v, i) > middle]
+        assert list(index.ids(descending=True, after=middle)) == [i for v, i in reversed(expected) if (v, i) < middle]
+
+    def test_key_range_membership(self):
+        assert 5 in KeyRange(1, 5)
+        assert 5 not in KeyRange(1, 5, high_inclusive=False)
+        assert None not in KeyRange()
+        assert not KeyRange()
+        assert KeyRange(low=0)
+
+
+class TestRatingAggregates:
+    """Tests for the incremental per-wine aggregates"""
+
+    def review(self, review_id, wine_name, rating, price=None):
+        return {"id": review_id, "wine_name": wine_name, "rating": rating, "price": price}
+
+    def test_min_max_follow_removals(self):
+        aggregates = RatingAggregates()
+        aggregates.add(self.review("a", "Barolo", 3.0, 40.0))
+        aggregates.add(self.review("b", "barolo", 5.0))
+        aggregates.add(self.review("c", "Barolo", 4.0, 60.0))
+
+        stats = aggregates.get("barolo")
+        assert (stats.count, stats.min_rating, stats.max_rating) == (3, 3.0, 5.0)
+        assert stats.average_price == 50.0
+
+        aggregates.remove("b")
+        aggregates.remove("a")
+        stats = aggregates.get("barolo")
+        assert (stats.count, stats.min_rating, stats.max_rating) == (1, 4.0, 4.0)
+        assert stats.average_rating == 4.0
+
+        aggregates.remove("c")
+        assert aggregates.get("barolo") is None
+        assert len(aggregates) == 0
+
+    def test_combine(self):
+        aggregates = RatingAggregates()
+        aggregates.add(self.review("a", "Barolo", 4.0))
+        aggregates.add(self.review("b", "Barolo Riserva", 5.0))
+        stats = aggregates.combine(["barolo", "barolo riserva", "missing"], "Barolo")
+        assert (stats.count, stats.average_rating) == (2, 4.5)
@@ -0,0 +1,161 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers.pagination import PageRequest
+from wine_cellar.mcp_servers.review_journal import (
+    JOURNAL_FILE,
+    OLD_JOURNAL_FILE,
+    SNAPSHOT_FILE,
+    JournaledReviewStore,
+)
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
+
+
+def new_review(review_id, rating=4.0):
+    return {
+        "id": review_id,
+        "wine_name": "Journal Test Wine",
+        "vintage": 2020,
+        "rating": rating,
+        "tasting_notes": "Crème de cassis",
+        "reviewer_name": "Tester",
+        "price": 12.5,
+        "created_at": "2025-01-01T00:00:00",
+    }
+
+
+def open_store(directory, **options):
+    options.setdefault("snapshot_interval", None)
+    return JournaledReviewStore(directory, FAKE_REVIEWS.values(), **options)
+
+
+class TestJournaledReviewStore:
+    """Tests for journal replay, compaction and crash recovery"""
+
+    def test_mutations_survive_restart(self, tmp_path):
+        store = open_store(tmp_path)
+        store.add(new_review("new001"))
+        store.remove("rev001")
+        store.close()
+
+        restarted = open_store(tmp_path)
+        assert len(restarted) == len(FAKE_REVIEWS)
+        assert restarted["new001"] == new_review("new001")
+        assert "rev001" not in restarted
+        assert [r["id"] for r in restarted.search(PageRequest(), "creme")] == ["new001"]
+        restarted.close()
+
+    def test_seed_only_used_for_new_directory(self, tmp_path):
+        store = open_store(tmp_path)
+        for review_id in list(store):
+            store.remove(review_id)
+        store.close()
+
+        assert len(open_store(tmp_path)) == 0
+
+    def test_compaction_truncates_journal(self, tmp_path):
+        store = open_store(tmp_path)
+        for i in range(20):
+            store.add(new_review(f"new{i:03}"))
+        store.remove("new000")
+        assert (tmp_path / JOURNAL_FILE).stat().st_size > 0
+
+        store.compact()
+        assert (tmp_path / JOURNAL_FILE).stat().st_size == 0
+        assert not (tmp_path / OLD_JOURNAL_FILE).exists()
+        store.add(new_review("after"))
+        store.close()
+
+        restarted = open_store(tmp_path)
+        assert len(restarted) == len(FAKE_REVIEWS) + 20
+        assert "after" in restarted and "new000" not in restarted
+        restarted.close()
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        store = open_store(tmp_path)
+        store.add(new_review("kept"))
+        store.close()
+        with open(tmp_path / JOURNAL_FILE, "ab") as f:
+            f.write(b'{"s":99,"op":"c","r":{"id":"tor')
+
+        restarted = open_store(tmp_path)
+        assert "kept" in restarted
+        restarted.add(new_review("next"))
+        restarted.close()
+
+        again = open_store(tmp_path)
+        assert "kept" in again and "next" in again
+        again.close()
+
+    def test_interrupted_compaction_recovers(self, tmp_path):
+        store = open_store(tmp_path)
+        store.add(new_review("before"))
+        # Simulate a crash right after rotation, before the snapshot was written
+        store._journal.rotate()
+        store.add(new_review("during"))
+        store._journal.close()
+        assert (tmp_path / OLD_JOURNAL_FILE).exists()
+
+        restarted = open_store(tmp_path)
+        assert "before" in restarted and "during" in restarted
+        assert not (tmp_path / OLD_JOURNAL_FILE).exists()
+        restarted.add(new_review("later"))
+        restarted.compact()
+        restarted.close()
+
+        again = open_store(tmp_path)
+        assert {"before", "during", "later"} <= set(again)
+        again.close()
+
+    def test_failed_compactions_keep_every_journal(self, tmp_path, monkeypatch):
+        store = open_store(tmp_path)
+        # Every compaction rotates the journal but never gets to write its snapshot
+        monkeypatch.setattr(store._journal, "write_snapshot", lambda reviews, seq, version: None)
+        store.add(new_review("first"))
+        store.compact()
+        store.add(new_review("second"))
+        store.compact()
+        store.add(new_review("third"))
+        store.close()
+
+        reopened = open_store(tmp_path)
+        assert all(reopened.get(review_id) for review_id in ("first", "second", "third"))
+        assert not (tmp_path / OLD_JOURNAL_FILE).exists()
+        reopened.close()
+
+    def test_fsync_batching(self, tmp_path, monkeypatch):
+        calls = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd) or real_fsync(fd))
+        store = open_store(tmp_path, fsync_every=5)
+        calls.clear()
+        for i in range(12):
+            store.add(new_review(f"new{i:03}"))
+        assert len(calls) == 2
+        store.close()
+        assert len(calls) == 3
+
+    def test_batches_share_one_fsync(self, tmp_path, monkeypatch):
+        store = open_store(tmp_path)
+        calls = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd) or real_fsync(fd))
+        store.add_many([new_review(f"new{i:03}") for i in range(10)])
+        store.remove_many(["new000", "new001", "missing"])
+        assert len(calls) == 2
+        store.close()
+
+        restarted = open_store(tmp_path)
+        assert len(restarted) == len(FAKE_REVIEWS) + 8
+        restarted.close()
+
+    def test_background_compaction(self, tmp_path):
+        store = open_store(tmp_path, snapshot_interval=0.05)
+        store.add(new_review("background"))
+        store._stop.wait(0.5)
+        store.close()
+        with open(tmp_path / SNAPSHOT_FILE, "rb") as f:
+            assert b'"background"' in f.read()
@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers import review_json
+from wine_cellar.mcp_servers.review_json import FragmentCache, dumps, dumps_with_raw, raw_array
+from wine_cellar.mcp_servers.review_store import InMemoryReviewStore
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(review_json, "orjson", None)
+    return request.param
+
+
+def test_dumps_round_trips(encoder):
+    review = FAKE_REVIEWS["rev001"]
+    assert json.loads(dumps(review)) == review
+    assert "Château" in dumps(review)
+
+
+def test_dumps_with_raw_matches_plain_encoding(encoder):
+    reviews = [FAKE_REVIEWS["rev001"], FAKE_REVIEWS["rev002"]]
+    payload = {"status": "success", "data": {"reviews": reviews, "count": 2, "next_cursor": None}}
+    spliced = dumps_with_raw(payload, ("data", "reviews"), raw_array(dumps(r) for r in reviews))
+    assert json.loads(spliced) == payload
+
+    assert json.loads(dumps_with_raw({"status": "success", "data": None}, ("data",), dumps(reviews[0]))) == {
+        "status": "success",
+        "data": reviews[0],
+    }
+
+
+def test_fragment_cache_evicts_oldest():
+    cache = FragmentCache(max_entries=2)
+    for review_id in ("rev001", "rev002", "rev003"):
+        cache.get(FAKE_REVIEWS[review_id])
+    assert len(cache) == 2
+    assert "rev001" not in cache._fragments
+
+
+def test_store_invalidates_fragments():
+    store = InMemoryReviewStore(FAKE_REVIEWS.values())
+    first = store.serialize(store["rev001"])
+    assert store.serialize(store["rev001"]) is first
+
+    store.remove("rev001")
+    store.add({**FAKE_REVIEWS["rev001"], "rating": 1.0})
+    assert json.loads(store.serialize(store["rev001"]))["rating"] == 1.0
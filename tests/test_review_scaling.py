@@ -0,0 +1,47 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.review_scaling import CASES, growth_exponent, run_scaling
+from benchmarks.synthetic_data import synthetic_cellar
+from wine_cellar.mcp_servers.review_server import _review_input_error
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS, WINES
+
+
+class TestSyntheticData:
+    """Tests for the seeded cellar generator"""
+
+    def test_shapes_match_the_sample_data(self):
+        wines, reviews = synthetic_cellar(500)
+        assert len(wines) == len(reviews) == 500
+        assert all(wine.keys() == WINES[0].keys() for wine in wines)
+        assert all(review.keys() == FAKE_REVIEWS["rev001"].keys() for review in reviews.values())
+        assert all(_review_input_error(review) is None for review in reviews.values())
+        assert len({wine["name"] for wine in wines}) == len(wines)
+        names = {wine["name"]: wine["year"] for wine in wines}
+        assert all(names[review["wine_name"]] == review["vintage"] for review in reviews.values())
+
+    def test_same_seed_same_data(self):
+        assert synthetic_cellar(100, seed=3) == synthetic_cellar(100, seed=3)
+        assert synthetic_cellar(100, seed=3) != synthetic_cellar(100, seed=4)
+
+
+class TestScaling:
+    """Tests for the scaling benchmark"""
+
+    def test_growth_exponent(self):
+        assert growth_exponent([10], [1.0]) is None
+        assert round(growth_exponent([10, 100, 1000], [5.0, 1.0, 100.0]), 6) == 2.0
+
+    def test_every_case_stays_within_budget(self):
+        result = run_scaling(sizes=[10, 1000])
+        assert result["violations"] == []
+        assert set(result["cases"]) == {case.name for case in CASES}
+        assert all(set(case["p50_ms"]) == {"10", "1000"} for case in result["cases"].values())
+
+    def test_exceeded_budget_is_reported(self):
+        result = run_scaling(sizes=[10], budget_scale=1e-9, cases=CASES[:1])
+        assert len(result["violations"]) == 1
+        assert result["violations"][0].startswith("get_review: median")
@@ -8,6 +8,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from wine_cellar.mcp_servers import review_server
+from wine_cellar.mcp_servers.review_store import create_store
 
 # Access the underlying functions from the MCP tools
 def get_tool_function(tool_name):
@@ -17,14 +18,16 @@ def get_tool_function(tool_name):
     return tool.fn if hasattr(tool, 'fn') else tool
 
 
-@pytest.fixture
-def reset_reviews():
-    """Reset REVIEWS to original state before each test"""
+@pytest.fixture(params=["memory", "columnar", "journal", "sqlite"])
+def reset_reviews(request, tmp_path):
+    """Reset REVIEWS to original state before each test, once per storage backend"""
     from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
-    review_server.REVIEWS = FAKE_REVIEWS.copy()
+    original = review_server.REVIEWS
+    review_server.REVIEWS = create_store(request.param, tmp_path / "reviews", FAKE_REVIEWS.values())
     yield
     # Cleanup after test
-    review_server.REVIEWS = FAKE_REVIEWS.copy()
+    review_server.REVIEWS.close()
+    review_server.REVIEWS = original
 
 
 class TestCreateReview:
@@ -176,7 +179,8 @@ class TestListReviews:
     
     def test_list_reviews_empty_results(self, reset_reviews):
         # Clear all reviews
-        review_server.REVIEWS = {}
+        for review_id in list(review_server.REVIEWS):
+            review_server.REVIEWS.remove(review_id)
         list_reviews_fn = get_tool_function('list_reviews')
         result = list_reviews_fn()
         
@@ -193,6 +197,374 @@ class TestListReviews:
         data = json.loads(result)
         assert data["status"] == "success"
         assert data["data"]["count"] == 0
+    
+    def test_list_reviews_accent_insensitive(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        result = list_reviews_fn(wine_name="rose provence")
+        
+        data = json.loads(result)
+        assert data["status"] == "success"
+        assert [r["id"] for r in data["data"]["reviews"]] == ["rev010"]
+    
+    def test_list_reviews_prefix_and_exact_match(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        
+        prefix = json.loads(list_reviews_fn(wine_name="cha", wine_match="prefix"))
+        assert {r["wine_name"] for r in prefix["data"]["reviews"]} == {"Château Margaux", "Champagne Brut", "Chablis"}
+        
+        exact = json.loads(list_reviews_fn(wine_name="Margaux", wine_match="exact"))
+        assert exact["data"]["count"] == 0
+        
+        contains = json.loads(list_reviews_fn(wine_name="Margaux"))
+        assert contains["data"]["count"] == 2
+    
+    def test_list_reviews_invalid_wine_match(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        result = list_reviews_fn(wine_name="Barolo", wine_match="fuzzy")
+        
+        data = json.loads(result)
+        assert data["status"] == "error"
+
+
+class TestListReviewRanges:
+    """Tests for the created_at, price and vintage range filters of list_reviews"""
+    
+    def ids(self, **kwargs):
+        data = json.loads(get_tool_function('list_reviews')(**kwargs))
+        assert data["status"] == "success"
+        return [r["id"] for r in data["data"]["reviews"]]
+    
+    def test_since_until(self, reset_reviews):
+        assert self.ids(since="2024-01-01", until="2024-03-12") == ["rev005", "rev002"]
+        assert self.ids(since="2024-03-12T18:45:00", until="2024-04-08") == ["rev007"]
+        assert self.ids(since="2024-04-01", descending=True) == ["rev013", "rev011"]
+    
+    def test_price_range(self, reset_reviews):
+        assert self.ids(max_price=35, order_by="rating") == ["rev013", "rev010", "rev004", "rev005"]
+        assert self.ids(min_price=95, max_price=220) == ["rev012", "rev003", "rev007"]
+    
+    def test_price_range_skips_unpriced_reviews(self, reset_reviews):
+        get_tool_function('create_review')("Chablis", 2019, 4.0, "Steely")
+        assert self.ids(wine_name="Chablis") != self.ids(wine_name="Chablis", min_price=0)
+        assert self.ids(wine_name="Chablis", min_price=0) == ["rev009"]
+    
+    def test_vintage_range_with_other_filters(self, reset_reviews):
+        assert self.ids(min_vintage=2018, max_vintage=2019) == ["rev009", "rev005", "rev011"]
+        assert self.ids(min_vintage=2013, max_vintage=2015, min_rating=4.8, wine_name="a") == ["rev001", "rev012", "rev006"]
+        assert self.ids(since="2023-09-01", max_price=100, min_vintage=2014) == ["rev008", "rev006", "rev005", "rev011", "rev013"]
+    
+    def test_ranges_follow_mutations(self, reset_reviews):
+        create_review_fn = get_tool_function('create_review')
+        review_id = json.loads(create_review_fn("Barolo", 2013, 4.0, "Tar", price=60.0))["data"]["review_id"]
+        assert self.ids(min_price=60, max_price=60) == [review_id]
+        today = datetime.now().date().isoformat()
+        assert self.ids(since=today) == [review_id]
+        get_tool_function('delete_review')(review_id)
+        assert self.ids(min_price=60, max_price=60) == []
+        assert self.ids(since=today) == []
+    
+    def test_paginated_range(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        first = json.loads(list_reviews_fn(max_price=50, limit=2))
+        assert [r["id"] for r in first["data"]["reviews"]] == ["rev010", "rev004"]
+        second = json.loads(list_reviews_fn(max_price=50, limit=2, cursor=first["data"]["next_cursor"]))
+        assert [r["id"] for r in second["data"]["reviews"]] == ["rev009", "rev005"]
+        changed = json.loads(list_reviews_fn(max_price=60, limit=2, cursor=first["data"]["next_cursor"]))
+        assert changed["status"] == "error"
+    
+    def test_invalid_timestamp(self, reset_reviews):
+        data = json.loads(get_tool_function('list_reviews')(since="last month"))
+        assert data["status"] == "error"
+        assert "ISO 8601" in data["data"]
+    
+    def test_new_ids_sort_by_creation(self, reset_reviews):
+        create_review_fn = get_tool_function('create_review')
+        review_ids = [
+            json.loads(create_review_fn("Chablis", 2019, 4.0, f"Note {i}"))["data"]["review_id"]
+            for i in range(20)
+        ]
+        assert len(set(review_ids)) == 20
+        assert review_ids == sorted(review_ids)
+        assert all(len(review_id) == 16 for review_id in review_ids)
+
+
+class TestPagination:
+    """Tests for cursor-based pagination of list_reviews and search_reviews"""
+    
+    def collect_pages(self, tool_fn, **kwargs):
+        pages = []
+        cursor = None
+        while True:
+            data = json.loads(tool_fn(cursor=cursor, **kwargs))
+            assert data["status"] == "success"
+            pages.append([r["id"] for r in data["data"]["reviews"]])
+            cursor = data["data"]["next_cursor"]
+            if cursor is None:
+                return pages
+    
+    def test_list_reviews_pages_cover_everything_in_order(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        pages = self.collect_pages(list_reviews_fn, limit=5)
+        
+        assert [len(p) for p in pages] == [5, 5, 3]
+        ids = [i for p in pages for i in p]
+        expected = sorted(review_server.REVIEWS.values(), key=lambda r: (r["created_at"], r["id"]))
+        assert ids == [r["id"] for r in expected]
+    
+    def test_list_reviews_by_rating_descending(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        pages = self.collect_pages(list_reviews_fn, limit=4, order_by="rating", descending=True)
+        
+        ratings = [review_server.REVIEWS[i]["rating"] for p in pages for i in p]
+        assert ratings == sorted(ratings, reverse=True)
+        assert len(ratings) == len(review_server.REVIEWS)
+    
+    def test_cursor_survives_concurrent_mutations(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        create_review_fn = get_tool_function('create_review')
+        delete_review_fn = get_tool_function('delete_review')
+        
+        first = json.loads(list_reviews_fn(limit=3))["data"]
+        first_ids = [r["id"] for r in first["reviews"]]
+        # Delete the review the cursor points at, then add a newer one
+        delete_review_fn(first_ids[-1])
+        new_id = json.loads(create_review_fn("Cursor Wine", 2022, 4.0, "Fresh"))["data"]["review_id"]
+        
+        second = json.loads(list_reviews_fn(limit=100, cursor=first["next_cursor"]))["data"]
+        second_ids = [r["id"] for r in second["reviews"]]
+        assert not set(first_ids) & set(second_ids)
+        assert len(second_ids) == len(review_server.REVIEWS) - 2
+        assert second_ids[-1] == new_id
+        assert second["next_cursor"] is None
+    
+    def test_search_reviews_pagination(self, reset_reviews):
+        search_reviews_fn = get_tool_function('search_reviews')
+        pages = self.collect_pages(search_reviews_fn, keyword="notes", limit=2)
+        
+        ids = [i for p in pages for i in p]
+        everything = json.loads(search_reviews_fn("notes"))["data"]["reviews"]
+        assert ids == [r["id"] for r in everything]
+        assert len(pages) > 1
+    
+    def test_cursor_rejected_for_other_query(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        cursor = json.loads(list_reviews_fn(limit=2))["data"]["next_cursor"]
+        
+        assert json.loads(list_reviews_fn(limit=2, cursor=cursor, min_rating=4.5))["status"] == "error"
+        assert json.loads(list_reviews_fn(limit=2, cursor=cursor, order_by="rating"))["status"] == "error"
+        assert json.loads(list_reviews_fn(limit=2, cursor="garbage"))["status"] == "error"
+    
+    def test_invalid_limit_and_order(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        assert json.loads(list_reviews_fn(limit=0))["status"] == "error"
+        assert json.loads(list_reviews_fn(order_by="price"))["status"] == "error"
+
+
+class TestFieldProjection:
+    """Tests for the fields parameter of list_reviews and search_reviews"""
+    
+    def test_list_reviews_projection(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        full = json.loads(list_reviews_fn(wine_name="Margaux"))["data"]
+        projected = json.loads(list_reviews_fn(wine_name="Margaux", fields=["id", "wine_name", "rating"]))["data"]
+        
+        assert projected["count"] == full["count"] == 2
+        assert projected["reviews"] == [
+            {"id": r["id"], "wine_name": r["wine_name"], "rating": r["rating"]} for r in full["reviews"]
+        ]
+    
+    def test_default_returns_whole_reviews(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        reviews = json.loads(list_reviews_fn(limit=3))["data"]["reviews"]
+        assert all(r == review_server.REVIEWS[r["id"]] for r in reviews)
+    
+    def test_search_reviews_projection(self, reset_reviews):
+        search_reviews_fn = get_tool_function('search_reviews')
+        data = json.loads(search_reviews_fn("citrus", fields=["rating", "id", "rating"]))["data"]
+        assert data["keyword"] == "citrus"
+        assert data["count"] > 0
+        assert all(list(r) == ["rating", "id"] for r in data["reviews"])
+    
+    def test_projection_keeps_cursors_working(self, reset_reviews):
+        list_reviews_fn = get_tool_function('list_reviews')
+        first = json.loads(list_reviews_fn(limit=5, order_by="rating", fields=["wine_name"]))["data"]
+        assert all(list(r) == ["wine_name"] for r in first["reviews"])
+        # The projection is not part of the query, so it may change from page to page
+        second = json.loads(list_reviews_fn(limit=5, order_by="rating", cursor=first["next_cursor"]))["data"]
+        everything = json.loads(list_reviews_fn(order_by="rating"))["data"]["reviews"]
+        assert [r["id"] for r in second["reviews"]] == [r["id"] for r in everything[5:10]]
+    
+    @pytest.mark.parametrize("fields", [[], ["id", "colour"]])
+    def test_invalid_fields(self, reset_reviews, fields):
+        assert json.loads(get_tool_function('list_reviews')(fields=fields))["status"] == "error"
+        assert json.loads(get_tool_function('search_reviews')("cherry", fields=fields))["status"] == "error"
+
+
+class TestVersions:
+    """Tests for store versions and if_version on the read tools"""
+    
+    def call(self, tool_name, *args, **kwargs):
+        return json.loads(get_tool_function(tool_name)(*args, **kwargs))
+    
+    def test_unchanged_reads_are_not_modified(self, reset_reviews):
+        for tool_name, args in [
+            ("list_reviews", {"limit": 3}),
+            ("list_reviews", {"wine_name": "Margaux"}),
+            ("search_reviews", {"keyword": "citrus"}),
+            ("get_average_rating", {"wine_name": "Barolo"}),
+            ("top_rated_wines", {}),
+            ("review_analytics", {"wine_name": "Chablis", "wine_match": "exact"}),
+            ("similar_reviews", {"text": "cherry and oak"}),
+        ]:
+            first = self.call(tool_name, **args)
+            assert first["status"] == "success"
+            version = first["data"]["version"]
+            again = self.call(tool_name, **args, if_version=version)
+            assert again == {"status": "not_modified", "data": {"version": version}}
+            stale = self.call(tool_name, **args, if_version=version - 1)
+            assert stale == first
+    
+    def test_writes_advance_the_version(self, reset_reviews):
+        before = self.call("list_reviews", limit=1)["data"]["version"]
+        review_id = self.call("create_review", "Version Wine", 2020, 4.0, "Fresh")["data"]["review_id"]
+        created = self.call("list_reviews", limit=1)["data"]["version"]
+        self.call("delete_review", review_id)
+        deleted = self.call("list_reviews", limit=1)["data"]["version"]
+        assert before < created < deleted
+        assert self.call("list_reviews", limit=1, if_version=created)["status"] == "success"
+    
+    def test_wine_versions_ignore_other_wines(self, reset_reviews):
+        barolo = self.call("get_average_rating", "Barolo")["data"]["version"]
+        margaux = self.call("list_reviews", wine_name="Château Margaux", wine_match="exact")["data"]["version"]
+        new_id = self.call("create_review", "Barolo", 2016, 3.0, "Tarry")["data"]["review_id"]
+        
+        assert self.call("list_reviews", wine_name="Château Margaux", wine_match="exact",
+                         if_version=margaux)["status"] == "not_modified"
+        assert self.call("get_average_rating", "Barolo", if_version=barolo)["status"] == "success"
+        self.call("delete_review", new_id)
+        assert self.call("get_average_rating", "Barolo", if_version=barolo)["status"] == "success"
+    
+    def test_wines_coming_and_going_change_partial_matches(self, reset_reviews):
+        version = self.call("list_reviews", wine_name="chateau")["data"]["version"]
+        new_id = self.call("create_review", "Château Neuf", 2019, 4.0, "Spicy")["data"]["review_id"]
+        data = self.call("list_reviews", wine_name="chateau", if_version=version)["data"]
+        assert "Château Neuf" in [r["wine_name"] for r in data["reviews"]]
+        
+        # A newer Margaux review now carries the highest version among the matches
+        self.call("create_review", "Château Margaux", 2016, 4.0, "Cedar")
+        version = self.call("list_reviews", wine_name="chateau")["data"]["version"]
+        self.call("delete_review", new_id)
+        data = self.call("list_reviews", wine_name="chateau", if_version=version)["data"]
+        assert "Château Neuf" not in [r["wine_name"] for r in data["reviews"]]
+    
+    def test_review_versions_follow_their_wine(self, reset_reviews):
+        review_id = self.call("create_review", "Version Wine", 2020, 4.0, "Fresh")["data"]["review_id"]
+        version = self.call("get_review", review_id)["version"]
+        assert self.call("get_review", review_id, if_version=version) == {
+            "status": "not_modified", "data": {"version": version}
+        }
+        self.call("create_review", "Barolo", 2016, 3.0, "Tarry")
+        assert self.call("get_review", review_id, if_version=version)["status"] == "not_modified"
+        
+        self.call("delete_review", review_id)
+        assert self.call("get_review", review_id, if_version=version)["status"] == "error"
+    
+    def test_batch_reads_are_not_modified_until_a_wine_changes(self, reset_reviews):
+        ids = [r["id"] for r in self.call("list_reviews", limit=2)["data"]["reviews"]]
+        first = self.call("get_reviews", ids)
+        version = first["data"]["version"]
+        assert self.call("get_reviews", ids, if_version=version)["status"] == "not_modified"
+        
+        wine_name = first["data"]["results"][0]["data"]["wine_name"]
+        self.call("create_review", wine_name, 2016, 3.0, "Tarry")
+        assert self.call("get_reviews", ids, if_version=version)["status"] == "success"
+        
+        # A missing id falls back to the store version, which any change advances
+        version = self.call("get_reviews", [ids[0], "missing"])["data"]["version"]
+        assert version == self.call("list_reviews", limit=1)["data"]["version"]
+
+
+class TestChangeFeed:
+    """Tests for the changes_since tool"""
+    
+    def call(self, tool_name, *args, **kwargs):
+        return json.loads(get_tool_function(tool_name)(*args, **kwargs))
+    
+    def test_reports_creates_and_deletes_in_order(self, reset_reviews):
+        version = self.call("list_reviews", limit=1)["data"]["version"]
+        first = self.call("create_review", "Feed Wine", 2020, 4.0, "Fresh")["data"]["review_id"]
+        second = self.call("create_reviews", [
+            {"wine_name": "Feed Wine", "vintage": 2021, "rating": 3.5, "tasting_notes": "Lean"},
+        ])["data"]["results"][0]["review_id"]
+        self.call("delete_review", first)
+        
+        data = self.call("changes_since", version)["data"]
+        assert [(c["kind"], c["review_id"]) for c in data["changes"]] == [
+            ("create", first), ("create", second), ("delete", first),
+        ]
+        assert all(c["wine_name"] == "Feed Wine" for c in data["changes"])
+        assert data["count"] == 3
+        assert data["next_version"] == data["version"] == self.call("list_reviews", limit=1)["data"]["version"]
+        assert data["has_more"] is False
+    
+    def test_follows_the_store_with_next_version(self, reset_reviews):
+        version = self.call("top_rated_wines")["data"]["version"]
+        created = [self.call("create_review", "Feed Wine", 2020, 4.0, f"Note {n}")["data"]["review_id"] for n in range(5)]
+        
+        seen = []
+        while True:
+            data = self.call("changes_since", version, limit=2)["data"]
+            seen.extend(c["review_id"] for c in data["changes"])
+            version = data["next_version"]
+            if not data["has_more"]:
+                break
+        assert seen == created
+        assert self.call("changes_since", version)["data"]["changes"] == []
+    
+    def test_versions_no_longer_in_the_log_fail(self, reset_reviews):
+        version = self.call("list_reviews", limit=1)["data"]["version"]
+        assert self.call("changes_since", version - 10**9)["status"] == "error"
+        assert self.call("changes_since", version, limit=0)["status"] == "error"
+        assert self.call("changes_since", version, limit=review_server.MAX_BATCH_SIZE + 1)["status"] == "error"
+
+
+class TestFuzzyWineNames:
+    """Tests for the similar-name fallback of list_reviews and get_average_rating"""
+    
+    def call(self, tool_name, *args, **kwargs):
+        return json.loads(get_tool_function(tool_name)(*args, **kwargs))
+    
+    def test_misspelt_average_rating(self, reset_reviews):
+        data = self.call("get_average_rating", "Châteu Margaux")["data"]
+        assert data["matched_wine_name"] == "Château Margaux"
+        assert data["similarity"] >= 0.5
+        exact = self.call("get_average_rating", "Château Margaux")["data"]
+        assert data["average_rating"] == exact["average_rating"]
+        assert "matched_wine_name" not in exact
+    
+    def test_misspelt_listing(self, reset_reviews):
+        data = self.call("list_reviews", wine_name="Sasicaia", limit=5)["data"]
+        assert data["matched_wine_name"] == "Sassicaia"
+        assert data["count"] >= 1
+        assert {r["wine_name"] for r in data["reviews"]} == {"Sassicaia"}
+    
+    def test_exact_lookups_and_unknown_wines_do_not_fall_back(self, reset_reviews):
+        assert self.call("get_average_rating", "Sasicaia", wine_match="exact")["status"] == "error"
+        assert self.call("list_reviews", wine_name="Sasicaia", wine_match="exact")["data"]["count"] == 0
+        assert self.call("get_average_rating", "Opus One")["status"] == "error"
+    
+    def test_follows_new_and_deleted_wines(self, reset_reviews):
+        assert self.call("get_average_rating", "Quintesa")["status"] == "error"
+        review_id = self.call("create_review", "Quintessa", 2018, 4.5, "Cassis")["data"]["review_id"]
+        data = self.call("get_average_rating", "Quintesa")["data"]
+        assert data["matched_wine_name"] == "Quintessa"
+        
+        # The version of a fuzzy answer follows the matched wine
+        other_id = self.call("create_review", "Quintessa", 2019, 3.5, "Herbal")["data"]["review_id"]
+        assert self.call("get_average_rating", "Quintesa", if_version=data["version"])["data"]["review_count"] == 2
+        
+        self.call("delete_reviews", [review_id, other_id])
+        assert self.call("get_average_rating", "Quintesa")["status"] == "error"
 
 
 class TestDeleteReview:
@@ -260,6 +632,143 @@ class TestGetAverageRating:
         data = json.loads(result)
         assert data["status"] == "success"
         assert data["data"]["review_count"] >= 2
+    
+    def test_get_average_rating_accent_insensitive(self, reset_reviews):
+        get_average_rating_fn = get_tool_function('get_average_rating')
+        result = get_average_rating_fn("chateau margaux", wine_match="exact")
+        
+        data = json.loads(result)
+        assert data["status"] == "success"
+        assert data["data"]["review_count"] == 2
+        assert data["data"]["average_rating"] == 4.75
+
+
+class TestTopRatedWines:
+    """Tests for top_rated_wines function"""
+    
+    def test_top_rated_wines(self, reset_reviews):
+        top_rated_wines_fn = get_tool_function('top_rated_wines')
+        result = top_rated_wines_fn(k=3)
+        
+        data = json.loads(result)
+        assert data["status"] == "success"
+        assert data["data"]["count"] == 3
+        names = [w["wine_name"] for w in data["data"]["wines"]]
+        # Champagne Brut (4.9), Barolo (5.0 and 4.7 -> 4.85), Sassicaia (4.8)
+        assert names == ["Champagne Brut", "Barolo", "Sassicaia"]
+        assert data["data"]["wines"][1]["min_rating"] == 4.7
+        assert data["data"]["wines"][1]["max_rating"] == 5.0
+        assert data["data"]["wines"][1]["average_price"] == 96.5
+    
+    def test_top_rated_wines_min_reviews(self, reset_reviews):
+        top_rated_wines_fn = get_tool_function('top_rated_wines')
+        result = top_rated_wines_fn(k=5, min_reviews=2)
+        
+        data = json.loads(result)
+        names = [w["wine_name"] for w in data["data"]["wines"]]
+        assert names == ["Barolo", "Château Margaux", "Cloudy Bay Sauvignon Blanc"]
+    
+    def test_top_rated_wines_tracks_mutations(self, reset_reviews):
+        create_review_fn = get_tool_function('create_review')
+        delete_review_fn = get_tool_function('delete_review')
+        top_rated_wines_fn = get_tool_function('top_rated_wines')
+        
+        review_id = json.loads(create_review_fn("Sassicaia", 2016, 1.0, "Corked"))["data"]["review_id"]
+        data = json.loads(top_rated_wines_fn(k=1, min_reviews=2))
+        assert data["data"]["wines"][0]["wine_name"] == "Barolo"
+        sassicaia = json.loads(get_tool_function('get_average_rating')("Sassicaia"))
+        assert sassicaia["data"]["average_rating"] == 2.9
+        
+        delete_review_fn(review_id)
+        delete_review_fn("rev007")
+        delete_review_fn("rev012")
+        data = json.loads(top_rated_wines_fn(k=1, min_reviews=2))
+        assert data["data"]["wines"][0]["wine_name"] == "Château Margaux"
+    
+    def test_top_rated_wines_invalid_k(self, reset_reviews):
+        top_rated_wines_fn = get_tool_function('top_rated_wines')
+        data = json.loads(top_rated_wines_fn(k=0))
+        assert data["status"] == "error"
+
+
+class TestReviewAnalytics:
+    """Tests for review_analytics function"""
+    
+    def test_whole_store(self, reset_reviews):
+        review_analytics_fn = get_tool_function('review_analytics')
+        data = json.loads(review_analytics_fn())
+        
+        assert data["status"] == "success"
+        stats = data["data"]
+        assert stats["review_count"] == 13
+        assert (stats["rating"]["min"], stats["rating"]["max"]) == (4.0, 5.0)
+        histogram = {(b["from"], b["to"]): b["count"] for b in stats["rating"]["histogram"]}
+        assert len(histogram) == 8
+        assert histogram[(4.0, 4.5)] == 4
+        assert histogram[(4.5, 5.0)] == 9
+        assert stats["price"]["priced_reviews"] == 13
+        assert stats["price"]["percentiles"]["p50"] == 65.0
+        assert [g["vintage"] for g in stats["groups"]] == [2013, 2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021]
+    
+    def test_filtered_by_wine(self, reset_reviews):
+        review_analytics_fn = get_tool_function('review_analytics')
+        data = json.loads(review_analytics_fn(wine_name="chateau margaux", wine_match="exact"))
+        
+        assert data["data"]["review_count"] == 2
+        assert data["data"]["groups"] == [
+            {"vintage": 2015, "review_count": 2, "average_rating": 4.75, "average_price": 447.5}
+        ]
+    
+    def test_vintage_range_grouped_by_wine(self, reset_reviews):
+        review_analytics_fn = get_tool_function('review_analytics')
+        data = json.loads(review_analytics_fn(min_vintage=2018, max_vintage=2020, group_by="wine"))
+        
+        groups = data["data"]["groups"]
+        assert [g["wine"] for g in groups] == [
+            "Chablis", "Cloudy Bay Sauvignon Blanc", "Malbec Reserva", "Riesling Kabinett"
+        ]
+        assert groups[1]["review_count"] == 2
+        assert groups[1]["average_rating"] == 4.15
+    
+    def test_grouped_by_reviewer(self, reset_reviews):
+        create_review_fn = get_tool_function('create_review')
+        create_review_fn("Chablis", 2019, 3.5, "Flinty", reviewer_name="Pierre Moreau")
+        review_analytics_fn = get_tool_function('review_analytics')
+        data = json.loads(review_analytics_fn(reviewer_name="pierre moreau", group_by="reviewer", percentiles=[50]))
+        
+        assert data["data"]["review_count"] == 2
+        assert data["data"]["groups"] == [
+            {"reviewer": "Pierre Moreau", "review_count": 2, "average_rating": 4.0, "average_price": 42.0}
+        ]
+        assert data["data"]["price"]["priced_reviews"] == 1
+        assert data["data"]["price"]["percentiles"] == {"p50": 42.0}
+    
+    def test_tracks_deletes(self, reset_reviews):
+        get_tool_function('delete_reviews')(["rev001", "rev002"])
+        data = json.loads(get_tool_function('review_analytics')(min_rating=4.5))
+        
+        assert data["data"]["review_count"] == 7
+        assert data["data"]["price"]["max"] == 220.0
+    
+    def test_no_matching_reviews(self, reset_reviews):
+        review_analytics_fn = get_tool_function('review_analytics')
+        data = json.loads(review_analytics_fn(wine_name="Nonexistent"))
+        
+        assert data["status"] == "success"
+        assert data["data"]["review_count"] == 0
+        assert data["data"]["rating"]["average"] is None
+        assert data["data"]["price"]["percentiles"]["p50"] is None
+        assert data["data"]["groups"] == []
+    
+    @pytest.mark.parametrize("arguments", [
+        {"group_by": "country"},
+        {"bin_width": 0},
+        {"percentiles": [150]},
+        {"wine_name": "Barolo", "wine_match": "fuzzy"},
+    ])
+    def test_invalid_arguments(self, reset_reviews, arguments):
+        data = json.loads(get_tool_function('review_analytics')(**arguments))
+        assert data["status"] == "error"
 
 
 class TestSearchReviews:
@@ -304,6 +813,174 @@ class TestSearchReviews:
         assert data["status"] == "success"
         # Should match "fruit", "fruity", "tropical fruit", etc.
         assert data["data"]["count"] >= 1
+    
+    def test_search_reviews_all_keywords(self, reset_reviews):
+        search_reviews_fn = get_tool_function('search_reviews')
+        result = search_reviews_fn("green apple minerality")
+        
+        data = json.loads(result)
+        assert data["status"] == "success"
+        assert {r["id"] for r in data["data"]["reviews"]} == {"rev005", "rev009"}
+    
+    def test_search_reviews_any_keyword(self, reset_reviews):
+        search_reviews_fn = get_tool_function('search_reviews')
+        result = search_reviews_fn("truffle tobacco", match="any")
+        
+        data = json.loads(result)
+        assert data["status"] == "success"
+        assert {r["id"] for r in data["data"]["reviews"]} == {"rev001", "rev007", "rev012"}
+    
+    def test_search_reviews_invalid_match(self, reset_reviews):
+        search_reviews_fn = get_tool_function('search_reviews')
+        result = search_reviews_fn("cherry", match="some")
+        
+        data = json.loads(result)
+        assert data["status"] == "error"
+    
+    def test_search_reviews_tracks_created_and_deleted(self, reset_reviews):
+        create_review_fn = get_tool_function('create_review')
+        delete_review_fn = get_tool_function('delete_review')
+        search_reviews_fn = get_tool_function('search_reviews')
+        
+        review_id = json.loads(create_review_fn(
+            wine_name="Index Test Wine",
+            vintage=2022,
+            rating=4.0,
+            tasting_notes="Notes of quince and saffron"
+        ))["data"]["review_id"]
+        data = json.loads(search_reviews_fn("quince"))
+        assert [r["id"] for r in data["data"]["reviews"]] == [review_id]
+        
+        delete_review_fn(review_id)
+        data = json.loads(search_reviews_fn("quince"))
+        assert data["data"]["count"] == 0
+
+
+class TestRankedSearch:
+    """Tests for BM25-ranked search_reviews with top_k"""
+    
+    def call(self, *args, **kwargs):
+        return json.loads(get_tool_function("search_reviews")(*args, **kwargs))
+    
+    def test_top_k_ranks_by_relevance(self, reset_reviews):
+        data = self.call("fruit", top_k=2)["data"]
+        assert data["count"] == 2
+        assert [r["id"] for r in data["reviews"]] == ["rev004", "rev008"]
+        assert data["scores"] == sorted(data["scores"], reverse=True)
+        assert "next_cursor" not in data
+        everything = self.call("fruit")["data"]
+        assert {r["id"] for r in data["reviews"]} <= {r["id"] for r in everything["reviews"]}
+    
+    def test_backends_agree_on_scores(self, reset_reviews):
+        data = self.call("citrus mineral", match="any", top_k=5)["data"]
+        assert [r["id"] for r in data["reviews"]] == ["rev009", "rev013", "rev005", "rev006", "rev008"]
+        assert data["scores"] == [1.1356, 1.1356, 1.1086, 1.1086, 1.1086]
+    
+    def test_new_reviews_are_ranked(self, reset_reviews):
+        create_review_fn = get_tool_function("create_review")
+        review_id = json.loads(create_review_fn("Ranked Wine", 2020, 4.0, "Fruit fruit fruit"))["data"]["review_id"]
+        data = self.call("fruit", top_k=1, fields=["id"])["data"]
+        assert data["reviews"] == [{"id": review_id}]
+    
+    def test_no_match_and_invalid_arguments(self, reset_reviews):
+        data = self.call("nonexistentkeyword", top_k=3)["data"]
+        assert data["reviews"] == [] and data["count"] == 0
+        assert self.call("fruit", top_k=0)["status"] == "error"
+        assert self.call("fruit", top_k=review_server.MAX_BATCH_SIZE + 1)["status"] == "error"
+        assert self.call("fruit", top_k=3, limit=3)["status"] == "error"
+        assert self.call("fruit", top_k=3, fields=["bouquet"])["status"] == "error"
+
+
+class TestSimilarReviews:
+    """Tests for the similar_reviews tool"""
+    
+    def call(self, *args, **kwargs):
+        return json.loads(get_tool_function("similar_reviews")(*args, **kwargs))
+    
+    def test_similar_to_a_review(self, reset_reviews):
+        data = self.call(review_id="rev001", k=4)["data"]
+        assert [r["id"] for r in data["reviews"]] == ["rev008", "rev002", "rev007", "rev012"]
+        assert data["similarities"] == [0.2356, 0.2201, 0.1803, 0.1783]
+        assert data["count"] == 4
+    
+    def test_similar_to_text_with_fields(self, reset_reviews):
+        data = self.call(text="crisp citrus mineral", k=2, fields=["id", "rating"])["data"]
+        assert data["reviews"] == [{"id": "rev004", "rating": 4.3}, {"id": "rev008", "rating": 4.4}]
+    
+    def test_follows_creates_and_deletes(self, reset_reviews):
+        create_review_fn = get_tool_function("create_review")
+        delete_review_fn = get_tool_function("delete_review")
+        self.call(text="quince", k=1)
+        review_id = json.loads(create_review_fn("Vectors Wine", 2020, 4.0, "Quince and beeswax"))["data"]["review_id"]
+        data = self.call(text="quince", k=1)["data"]
+        assert data["reviews"][0]["id"] == review_id
+        assert data["similarities"][0] > 0
+        delete_review_fn(review_id)
+        data = self.call(text="quince", k=1)["data"]
+        assert review_id not in [r["id"] for r in data["reviews"]]
+        data = self.call(text="...", k=1)["data"]
+        assert data["reviews"] == [] and data["count"] == 0
+    
+    def test_invalid_arguments(self, reset_reviews):
+        assert self.call()["status"] == "error"
+        assert self.call(review_id="rev001", text="cherry")["status"] == "error"
+        assert self.call(review_id="missing")["status"] == "error"
+        assert self.call(text="cherry", k=0)["status"] == "error"
+        assert self.call(text="cherry", k=review_server.MAX_BATCH_SIZE + 1)["status"] == "error"
+        assert self.call(text="cherry", fields=["bouquet"])["status"] == "error"
+
+
+class TestBulkTools:
+    """Tests for create_reviews, get_reviews and delete_reviews"""
+    
+    def test_create_reviews_mixed_batch(self, reset_reviews):
+        create_reviews_fn = get_tool_function('create_reviews')
+        result = create_reviews_fn([
+            {"wine_name": "Bulk Wine A", "vintage": 2020, "rating": 4.0, "tasting_notes": "Bright acidity"},
+            {"wine_name": "Bulk Wine B", "vintage": 2019, "rating": 6.0, "tasting_notes": "Too good"},
+            {"wine_name": "Bulk Wine C", "vintage": 2018, "tasting_notes": "No rating"},
+            {"wine_name": "Bulk Wine D", "vintage": 2021, "rating": 3, "tasting_notes": "Simple",
+             "reviewer_name": "Batch Tester", "price": 12},
+        ])
+        
+        data = json.loads(result)
+        assert data["status"] == "success"
+        assert (data["data"]["created"], data["data"]["failed"]) == (2, 2)
+        statuses = [r["status"] for r in data["data"]["results"]]
+        assert statuses == ["success", "error", "error", "success"]
+        assert "Rating must be between 1 and 5" in data["data"]["results"][1]["data"]
+        assert "rating" in data["data"]["results"][2]["data"]
+        
+        created = review_server.REVIEWS[data["data"]["results"][3]["review_id"]]
+        assert created["reviewer_name"] == "Batch Tester"
+        assert created["price"] == 12
+        assert len(review_server.REVIEWS) == 15
+    
+    def test_get_reviews(self, reset_reviews):
+        get_reviews_fn = get_tool_function('get_reviews')
+        data = json.loads(get_reviews_fn(["rev003", "missing", "rev001"]))
+        
+        assert data["status"] == "success"
+        assert (data["data"]["found"], data["data"]["missing"]) == (2, 1)
+        results = data["data"]["results"]
+        assert [r["review_id"] for r in results] == ["rev003", "missing", "rev001"]
+        assert results[0]["data"]["wine_name"] == "Sassicaia"
+        assert results[1]["status"] == "error"
+    
+    def test_delete_reviews(self, reset_reviews):
+        delete_reviews_fn = get_tool_function('delete_reviews')
+        data = json.loads(delete_reviews_fn(["rev001", "missing", "rev002", "rev001"]))
+        
+        assert data["status"] == "success"
+        assert [r["status"] for r in data["data"]["results"]] == ["success", "error", "success", "error"]
+        assert "rev001" not in review_server.REVIEWS
+        assert "rev002" not in review_server.REVIEWS
+        assert json.loads(get_tool_function('get_average_rating')("Château Margaux"))["status"] == "error"
+    
+    def test_batch_size_limit(self, reset_reviews):
+        get_reviews_fn = get_tool_function('get_reviews')
+        data = json.loads(get_reviews_fn(["rev001"] * (review_server.MAX_BATCH_SIZE + 1)))
+        assert data["status"] == "error"
 
 
 class TestIntegrationScenarios:
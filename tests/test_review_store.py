@@ -0,0 +1,199 @@
+import os
+import random
+import sys
+import time
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers.pagination import PageRequest
+from wine_cellar.mcp_servers.review_index import KeyRange
+from wine_cellar.mcp_servers.review_store import InMemoryReviewStore, SqliteReviewStore, create_store
+from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
+
+
+def new_review(review_id, wine_name="Store Test Wine", rating=4.0):
+    return {
+        "id": review_id,
+        "wine_name": wine_name,
+        "vintage": 2020,
+        "rating": rating,
+        "tasting_notes": "Ripe cherry",
+        "reviewer_name": "Tester",
+        "price": None,
+        "created_at": "2025-01-01T00:00:00",
+    }
+
+
+class TestSqliteReviewStore:
+    """Tests specific to the SQLite backend"""
+
+    def test_reopen_keeps_data_without_reseeding(self, tmp_path):
+        path = tmp_path / "reviews.db"
+        store = SqliteReviewStore(path, FAKE_REVIEWS.values())
+        store.add(new_review("new001"))
+        store.remove("rev001")
+        store.close()
+
+        reopened = SqliteReviewStore(path, FAKE_REVIEWS.values())
+        assert len(reopened) == len(FAKE_REVIEWS)
+        assert "new001" in reopened
+        assert "rev001" not in reopened
+        assert reopened["new001"] == new_review("new001")
+        reopened.close()
+
+    def test_reopen_upgrades_a_database_without_saved_versions(self, tmp_path):
+        path = tmp_path / "reviews.db"
+        store = SqliteReviewStore(path, FAKE_REVIEWS.values())
+        store._query("DROP TABLE store_meta")
+        store._query("PRAGMA user_version=1")
+        store.close()
+
+        reopened = SqliteReviewStore(path, [new_review("seed001")])
+        assert len(reopened) == len(FAKE_REVIEWS)
+        reopened.add(new_review("new001"))
+        assert reopened._query("SELECT value FROM store_meta WHERE key = 'version'")[0][0] == reopened.version
+        reopened.close()
+
+    def test_wal_mode(self, tmp_path):
+        store = SqliteReviewStore(tmp_path / "reviews.db")
+        assert store._query("PRAGMA journal_mode")[0][0] == "wal"
+        store.close()
+
+    def test_filters_use_indexes(self, tmp_path):
+        store = SqliteReviewStore(tmp_path / "reviews.db", FAKE_REVIEWS.values())
+        plan = " ".join(
+            str(row) for row in store._query(
+                "EXPLAIN QUERY PLAN SELECT id FROM reviews WHERE wine_key = ? ORDER BY created_at", ("barolo",)
+            )
+        )
+        assert "idx_reviews_wine_name" in plan
+        plan = " ".join(
+            str(row) for row in store._query("EXPLAIN QUERY PLAN SELECT id FROM reviews ORDER BY created_at, id LIMIT 5")
+        )
+        assert "idx_reviews_created_at" in plan
+        store.close()
+
+    def test_contains_match_uses_the_name_index(self, tmp_path):
+        store = SqliteReviewStore(tmp_path / "reviews.db", FAKE_REVIEWS.values())
+        condition, params = store._name_condition("BAR", "contains")
+        plan = " ".join(
+            str(row) for row in store._query(
+                f"EXPLAIN QUERY PLAN SELECT id FROM reviews WHERE {condition} ORDER BY created_at DESC LIMIT 5", params
+            )
+        )
+        assert "idx_reviews_wine_name" in plan and "SCAN reviews" not in plan
+        page = PageRequest(order_by="created_at", limit=10)
+        assert {review["wine_name"] for review in store.find(page, wine_name="bar")} == {"Barolo"}
+        assert store.wine_stats("rol").count == store.wine_stats("Barolo", "exact").count
+        assert store.wine_keys("ar") >= {"barolo"}
+        store.close()
+
+    def test_aggregates_follow_deletes(self, tmp_path):
+        store = SqliteReviewStore(tmp_path / "reviews.db", FAKE_REVIEWS.values())
+        store.remove("rev007")
+        stats = store.wine_stats("Barolo", "exact")
+        assert (stats.count, stats.average_rating, stats.average_price) == (1, 5.0, 98.0)
+        store.remove("rev012")
+        assert store.wine_stats("Barolo", "exact").count == 0
+        assert store._query("SELECT COUNT(*) FROM wine_stats WHERE wine_key = 'barolo'")[0][0] == 0
+        store.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "columnar", "sqlite"])
+def test_backends_agree(backend, tmp_path):
+    reference = InMemoryReviewStore(FAKE_REVIEWS.values())
+    store = create_store(backend, tmp_path / "reviews.db", FAKE_REVIEWS.values())
+    page = PageRequest(order_by="rating", descending=True)
+
+    assert store.find(page, wine_name="c", wine_match="prefix") == reference.find(page, wine_name="c", wine_match="prefix")
+    assert store.search(page, "cherry rose", "any") == reference.search(page, "cherry rose", "any")
+    assert [s.to_dict() for s in store.top_rated(3, 2)] == [s.to_dict() for s in reference.top_rated(3, 2)]
+    store.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_store("redis")
+
+
+@pytest.mark.parametrize("backend", ["memory", "columnar", "sqlite"])
+def test_range_filters_match_a_full_scan(backend, tmp_path):
+    rng = random.Random(7)
+    reviews = [
+        new_review(f"r{n:03}", rating=rng.choice([3.0, 4.0, 4.5, 5.0])) | {
+            "price": rng.choice([None, 20.0, 35.5, 50.0, 99.0]),
+            "vintage": rng.randint(2010, 2020),
+            "created_at": f"2025-01-{rng.randint(1, 28):02}T{rng.randint(0, 23):02}:00:00",
+        }
+        for n in range(200)
+    ]
+    store = create_store(backend, tmp_path / "reviews.db", reviews)
+    ranges = {
+        "created_at": KeyRange("2025-01-10", "2025-01-20", high_inclusive=False),
+        "price": KeyRange(high=50.0),
+        "vintage": KeyRange(2012, 2018),
+    }
+
+    for fields in (["created_at"], ["price"], ["vintage", "price"], list(ranges)):
+        query = {field: ranges[field] for field in fields}
+        expected = [
+            r for r in reviews
+            if all(r[field] in key_range for field, key_range in query.items()) and r["rating"] >= 4.0
+        ]
+        for descending in (False, True):
+            page = PageRequest(descending=descending, limit=7)
+            expected.sort(key=page.sort_key, reverse=descending)
+            rows = []
+            while True:
+                found = store.find(page, min_rating=4.0, ranges=query)
+                rows += found[:7]
+                if len(found) <= 7:
+                    break
+                page = PageRequest(descending=descending, limit=7, after=page.sort_key(found[6]))
+            assert rows == expected
+    store.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "columnar"])
+def test_bulk_add_matches_single_adds(backend, tmp_path):
+    reviews = [new_review(f"b{n:03}", f"Bulk Wine {n % 30}", rating=1 + n % 5) | {"price": float(n)} for n in range(150)]
+    # Replace a seeded review and one added earlier in the same batch
+    reviews += [new_review("rev001", "Barolo", 2.0), new_review("b007", "Barolo", 3.0) | {"price": 999.0}]
+    bulk = create_store(backend, None, FAKE_REVIEWS.values())
+    bulk.add_many(reviews)
+    single = create_store(backend, None, FAKE_REVIEWS.values())
+    for review in reviews:
+        single.add(review)
+
+    page = PageRequest(order_by="rating")
+    assert bulk.find(page) == single.find(page)
+    assert bulk.find(page, wine_name="barolo", wine_match="exact") == single.find(page, wine_name="barolo", wine_match="exact")
+    assert bulk.find(page, ranges={"price": KeyRange(100.0)}) == single.find(page, ranges={"price": KeyRange(100.0)})
+    assert bulk.wine_stats("bulk wine 7", "exact").to_dict() == single.wine_stats("bulk wine 7", "exact").to_dict()
+    assert len(bulk) == len(single) == len(FAKE_REVIEWS) + 150
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+def test_versions_keep_increasing_across_restarts(backend, tmp_path, monkeypatch):
+    # A frozen clock: only the saved version can keep a restarted store ahead
+    monkeypatch.setattr(time, "time_ns", lambda: 1_000_000_000)
+    store = create_store(backend, tmp_path / "reviews", FAKE_REVIEWS.values())
+    store.add_many([new_review(f"v{n}") for n in range(50)])
+    # Deleted reviews leave the snapshot with fewer reviews than changes
+    store.remove_many([f"v{n}" for n in range(50)])
+    if backend == "journal":
+        store.compact()
+    store.add(new_review("v50"))
+    version, wine_version = store.version, store.wine_version("Store Test Wine", "exact")
+    assert version == wine_version
+    store.close()
+
+    reopened = create_store(backend, tmp_path / "reviews")
+    assert reopened.version >= version
+    assert reopened.wine_version("Store Test Wine", "exact") >= wine_version
+    reopened.remove("v50")
+    assert reopened.version > version
+    assert reopened.wine_version("store test") > wine_version
+    reopened.close()
@@ -0,0 +1,83 @@
+import os
+import sys
+import math
+import numpy as np
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from wine_cellar.mcp_servers.review_vectors import NoteVectors
+
+
+NOTES = {
+    "a": "Cherry and leather with firm tannins",
+    "b": "Cherry, plum and leather",
+    "c": "Crisp citrus and green apple",
+    "d": "Citrus, green apple and flint",
+    "e": "Cherry cherry cherry",
+}
+
+
+@pytest.fixture
+def vectors():
+    vectors = NoteVectors()
+    vectors.add_many(NOTES.items())
+    return vectors
+
+
+class TestNoteVectors:
+    """Tests for the hashed TF-IDF vectors behind similar_reviews"""
+
+    def test_vector_is_log_scaled_and_stable(self):
+        vectors = NoteVectors(dimensions=64)
+        vector = vectors.vector("Cherry cherry CHERRY")
+        assert vector.dtype == np.float32 and vector.shape == (64,)
+        assert np.count_nonzero(vector) == 1
+        assert math.isclose(vector.max(), 1 + math.log(3), rel_tol=1e-6)
+        assert np.array_equal(vector, NoteVectors(dimensions=64).vector("cherry cherry cherry"))
+        assert not vectors.vector("...").any()
+
+    def test_most_similar_first(self, vectors):
+        similar = vectors.similar(NOTES["c"], 5, exclude="c")
+        assert [review_id for review_id, _ in similar][0] == "d"
+        assert "c" not in dict(similar)
+        assert all(0 < score <= 1 for _, score in similar)
+        assert [score for _, score in similar] == sorted((score for _, score in similar), reverse=True)
+
+    def test_identical_text_scores_one(self, vectors):
+        review_id, score = vectors.similar(NOTES["b"], 1)[0]
+        assert review_id == "b"
+        assert math.isclose(score, 1, rel_tol=1e-5)
+
+    def test_unrelated_text_matches_nothing(self, vectors):
+        assert vectors.similar("zzzz", 3) == []
+        assert NoteVectors().similar("cherry", 3) == []
+
+    def test_ties_go_to_the_smaller_id(self):
+        vectors = NoteVectors()
+        vectors.add_many([("z", "cherry plum"), ("y", "cherry plum"), ("x", "cherry plum"), ("w", "lemon")])
+        assert [review_id for review_id, _ in vectors.similar("cherry plum", 2)] == ["x", "y"]
+
+    def test_incremental_updates_match_a_rebuild(self, vectors):
+        vectors.remove("a")
+        vectors.add("f", "Leather, tobacco and cherry")
+        vectors.add("b", "Lemon and lime")
+        vectors.remove("missing")
+        notes = {**NOTES, "f": "Leather, tobacco and cherry", "b": "Lemon and lime"}
+        del notes["a"]
+        rebuilt = NoteVectors()
+        rebuilt.add_many(notes.items())
+        assert len(vectors) == len(rebuilt) == 5
+        assert "a" not in vectors and "f" in vectors
+        assert np.array_equal(vectors._document_frequency, rebuilt._document_frequency)
+        for text in ("cherry leather", "lemon", "green apple"):
+            ours, theirs = vectors.similar(text, 5), rebuilt.similar(text, 5)
+            assert [i for i, _ in ours] == [i for i, _ in theirs]
+            assert np.allclose([s for _, s in ours], [s for _, s in theirs])
+
+    def test_matrix_grows(self):
+        vectors = NoteVectors(dimensions=16)
+        vectors.add_many((f"r{n:03d}", f"note {n}") for n in range(200))
+        assert len(vectors) == 200
+        assert vectors.similar("note 7", 1)[0][0] == "r007"
@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import top-level modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from wine_cellar.shared_library import tools
+from wine_cellar.shared_library.cellar import Cellar
+from wine_cellar.shared_library.research_cache import ResearchCache, research_key
+from wine_cellar.shared_library.wine_data import WINES
+from wine_cellar.sub_agents import store_wine
+from wine_cellar.sub_agents.store_wine import (
+    CellarStoreAgent, StoreWineAgent, WriterAgent, cache_research, use_cached_research, use_cached_summary,
+)
+
+
+WINE = {
+    "name": "Etna Rosso", "producer": "Benanti", "year": 2020, "colour": "red",
+    "country_origin": "Italy", "grape_variety": "Nerello Mascalese", "best_meals": ["grilled tuna"],
+}
+
+
+def run_agent(agent, request, state=None):
+    """Run `agent` on `request` in a new session; return its events and the final session state."""
+
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="user", state=state or {})
+        message = types.Content(role="user", parts=[types.Part(text=request)])
+        events = [e async for e in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+        session = await runner.session_service.get_session(app_name="test", user_id="user", session_id=session.id)
+        return events, session.state
+
+    return asyncio.run(run())
+
+
+def run_store_step(final_summary):
+    """Run the store step alone on a session holding `final_summary`; return its reply and the session state."""
+    events, state = run_agent(CellarStoreAgent(name="cellar_store_agent"), "store it", {"final_summary": final_summary})
+    return json.loads(events[-1].content.parts[0].text), state
+
+
+def callback_context(request, state=None):
+    """The parts of a CallbackContext the cache callbacks use."""
+    return SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=request)]), state=state or {})
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResearchCache(tmp_path / "research.db")
+    monkeypatch.setattr(store_wine, "RESEARCH_CACHE", cache)
+    monkeypatch.setattr(tools, "CELLAR", Cellar(WINES))
+    yield cache
+    cache.close()
+
+
+class TestCellarStoreAgent:
+    """Tests for the step storing StoreWineAgent's summary in the cellar"""
+
+    def test_runs_after_the_writer(self):
+        names = [agent.name for agent in StoreWineAgent.sub_agents]
+        assert names.index("cellar_store_agent") == names.index(WriterAgent.name) + 1
+
+    def test_stores_the_summary(self, monkeypatch):
+        monkeypatch.setattr(tools, "CELLAR", Cellar(WINES))
+        reply, state = run_store_step(f"```json\n{json.dumps(WINE)}\n```")
+        assert reply == {"status": "success", "data": [{**WINE, "created": True}]}
+        assert state["stored_wines"] == reply
+        assert tools.retrieve_wines(grape_variety="nerello")["data"] == [WINE]
+
+    def test_reports_an_invalid_summary(self, monkeypatch):
+        monkeypatch.setattr(tools, "CELLAR", Cellar(WINES))
+        reply, state = run_store_step("I could not find this wine.")
+        assert reply["status"] == "error"
+        assert state["stored_wines"] == reply
+        assert len(tools.CELLAR) == len(WINES)
+
+
+class TestResearchCacheCallbacks:
+    """Tests for skipping the search and the writer on cached wines"""
+
+    def test_misses_run_both_agents(self, cache):
+        context = callback_context("Etna Rosso 2020")
+        assert use_cached_research(context) is None
+        assert use_cached_summary(context) is None
+        assert context.state == {}
+
+    def test_search_findings_are_cached(self, cache):
+        cache_research(callback_context("Store Etna Rosso 2020", {"research_findings": "Benanti, Sicily"}))
+        entry = cache.get(research_key("etna rosso, vintage 2020"))
+        assert entry == {"research_findings": "Benanti, Sicily", "final_summary": None}
+
+    def test_cached_research_skips_only_the_search(self, cache):
+        cache.put_research(research_key("Etna Rosso 2020"), "Benanti, Sicily")
+        context = callback_context("Etna Rosso 2020")
+        assert use_cached_research(context).parts[0].text == "Benanti, Sicily"
+        assert context.state == {"research_findings": "Benanti, Sicily"}
+        assert use_cached_summary(context) is None
+        # Another vintage is researched again
+        assert use_cached_research(callback_context("Etna Rosso 2019")) is None
+
+    def test_stored_summary_skips_both_agents(self, cache):
+        cache.put_research(research_key("Etna Rosso 2020"), "Benanti, Sicily")
+        run_agent(CellarStoreAgent(name="cellar_store_agent"), "Etna Rosso 2020", {"final_summary": json.dumps(WINE)})
+        assert cache.get(research_key("Etna Rosso 2020"))["final_summary"] == json.dumps(WINE)
+
+        # The whole pipeline now runs without a model call
+        events, state = run_agent(StoreWineAgent, "Store the Etna Rosso, vintage 2020")
+        replies = {event.author: event.content.parts[0].text for event in events if event.content}
+        assert replies["retrieve_wine_information_agent"] == "Benanti, Sicily"
+        assert replies["writer_agent"] == json.dumps(WINE)
+        assert json.loads(replies["cellar_store_agent"])["status"] == "success"
+        assert state["final_summary"] == json.dumps(WINE)
+        assert tools.CELLAR.get("Etna Rosso", "Benanti", 2020) == WINE
+
+    def test_rejected_summary_is_not_cached(self, cache):
+        events, state = run_agent(
+            CellarStoreAgent(name="cellar_store_agent"), "Etna Rosso 2020", {"final_summary": "no idea"}
+        )
+        assert state["stored_wines"]["status"] == "error"
+        assert cache.get(research_key("Etna Rosso 2020")) is None
@@ -1,11 +1,11 @@
 import os
 import sys
-import pytest
+import json
 
 # Ensure project root is on sys.path so tests can import top-level modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from wine_cellar.shared_library.tools import retrieve_wines
+from wine_cellar.shared_library.tools import cellar_summary, recommend_for_meal, retrieve_wines, store_wines
 
 
 def test_retrieve_wines_count_and_structure():
@@ -19,3 +19,106 @@ def test_retrieve_wines_count_and_structure():
     w = wines["data"][0]
     for key in ["name", "producer", "year", "colour", "country_origin", "grape_variety", "best_meals"]:
         assert key in w
+
+
+def names(result):
+    return [wine["name"] for wine in result["data"]]
+
+
+def test_retrieve_wines_filters():
+    assert names(retrieve_wines(colour="red")) == [
+        "Château Margaux", "Sassicaia", "Barolo", "Priorat Garnacha", "Malbec Reserva"
+    ]
+    # Case and accents are ignored
+    assert names(retrieve_wines(colour="ROSE")) == ["Rosé Provence"]
+    assert names(retrieve_wines(country_origin="france", min_year=2015)) == ["Château Margaux", "Chablis", "Rosé Provence"]
+    assert names(retrieve_wines(min_year=2013, max_year=2014)) == ["Champagne Brut", "Barolo"]
+
+
+def test_retrieve_wines_word_filters():
+    # Every word must start a word of the grape variety or of one meal pairing
+    assert names(retrieve_wines(grape_variety="pinot noir")) == ["Champagne Brut"]
+    assert names(retrieve_wines(meal="cheese")) == [
+        "Château Margaux", "Cloudy Bay Sauvignon Blanc", "Barolo", "Priorat Garnacha"
+    ]
+    assert names(retrieve_wines(meal="braised beef")) == ["Barolo"]
+    assert names(retrieve_wines(meal="oysters beef")) == []
+
+
+def test_retrieve_wines_limit_and_total():
+    result = retrieve_wines(meal="beef", limit=1)
+    assert names(result) == ["Château Margaux"]
+    assert result["total"] == 2
+    assert len(retrieve_wines(limit=3)["data"]) == 3
+    assert retrieve_wines()["total"] == 10
+    assert retrieve_wines(limit=0)["status"] == "error"
+    result = retrieve_wines(colour="blue")
+    assert result["status"] == "success"
+    assert result["data"] == [] and result["total"] == 0
+
+
+def test_retrieve_wines_sees_added_wines(monkeypatch):
+    from wine_cellar.shared_library import tools
+    from wine_cellar.shared_library.cellar import Cellar
+    from wine_cellar.shared_library.wine_data import WINES
+
+    monkeypatch.setattr(tools, "CELLAR", Cellar(WINES))
+    assert retrieve_wines(colour="red")["total"] == 5
+    tools.CELLAR.add({**WINES[0], "name": "Extra Red"})
+    assert names(retrieve_wines(colour="red"))[-1] == "Extra Red"
+
+
+def test_recommend_for_meal():
+    result = recommend_for_meal("grilled steak", 2)
+    assert result["status"] == "success"
+    assert names(result) == ["Sassicaia", "Rosé Provence"]
+    best = result["data"][0]
+    assert best["matched_meals"] == ["grilled steak"]
+    assert best["pairing_score"] > result["data"][1]["pairing_score"]
+    # Stored wines are not modified
+    assert "pairing_score" not in retrieve_wines(limit=2)["data"][1]
+    assert names(recommend_for_meal("Cheese", 5)) == [
+        "Château Margaux", "Cloudy Bay Sauvignon Blanc", "Barolo", "Priorat Garnacha"
+    ]
+    assert recommend_for_meal("pizza")["data"] == []
+    assert recommend_for_meal("grilled steak", 0)["status"] == "error"
+    assert recommend_for_meal("with the")["status"] == "error"
+
+
+def test_cellar_summary():
+    summary = cellar_summary()
+    assert summary["status"] == "success"
+    data = summary["data"]
+    assert data["total"] == 10
+    assert data["colour"] == {"red": 5, "white": 3, "rosé": 1, "sparkling": 1}
+    assert list(data["country_origin"].items())[:2] == [("France", 4), ("Italy", 2)]
+    assert data["year"]["2018"] == 2
+    assert sum(data["year"].values()) == 10
+
+
+def test_store_wines(monkeypatch, tmp_path):
+    from wine_cellar.shared_library import tools
+    from wine_cellar.shared_library.cellar_store import PersistentCellar
+    from wine_cellar.shared_library.wine_data import WINES
+
+    monkeypatch.setattr(tools, "CELLAR", PersistentCellar(tmp_path / "cellar.db", WINES))
+    wine = {
+        "name": "Etna Rosso", "producer": "Benanti", "year": "2020", "colour": "Red",
+        "country_origin": "Italy", "grape_variety": "Nerello Mascalese", "best_meals": ["grilled tuna"],
+    }
+    result = store_wines(f"```json\n{json.dumps(wine)}\n```")
+    assert result["status"] == "success"
+    stored = result["data"][0]
+    assert stored["year"] == 2020 and stored["colour"] == "red" and stored["created"] is True
+    # Visible to the other tools at once, and stored again without a duplicate
+    assert names(retrieve_wines(country_origin="italy", min_year=2020)) == ["Etna Rosso"]
+    assert recommend_for_meal("tuna", 1)["data"][0]["name"] == "Etna Rosso"
+    assert store_wines(json.dumps(wine))["data"][0]["created"] is False
+    assert cellar_summary()["data"]["total"] == 11
+    tools.CELLAR.close()
+    assert len(PersistentCellar(tmp_path / "cellar.db", WINES)) == 11
+
+    result = store_wines('{"name": "Half a wine"}')
+    assert result["status"] == "error"
+    assert "producer" in result["data"]
+    assert cellar_summary()["data"]["total"] == 11
@@ -2,7 +2,7 @@ from google.adk.agents import Agent
 from google.adk.models.google_llm import Gemini
 from google.adk.tools import AgentTool, FunctionTool
 from .shared_library.helper import LLM_MODEL, retry_config
-from .shared_library.tools import retrieve_wines
+from .shared_library.tools import cellar_summary, recommend_for_meal, retrieve_wines
 from .shared_library.mcp_client import mcp_review_wine_server
 from .sub_agents.store_wine import StoreWineAgent
 from .sub_agents.buy_wine import RemoteBuyWineAgent
@@ -17,9 +17,11 @@ root_agent = Agent(
         Your goal is to answer the user's query by orchestrating a workflow.
         
         You have access to the following tools:
-        1. retrieve_wines: Provides a list of wines available in the cellar.
-        2. store_wine_agent: Given a wine name, it retrieves detailed information about the wine and stores it in the cellar.
-        3. mcp_review_wine_server: Manages wine reviews with tools to create, retrieve, list, search, and delete reviews. Can filter by wine name/rating, search tasting notes by keyword, and calculate average ratings. Reviews include wine name, vintage, rating (1-5), tasting notes, reviewer name, and optional price.
+        1. retrieve_wines: Provides the wines available in the cellar. Accepts optional filters (colour, country_origin, grape_variety, min_year, max_year, meal) and a limit; total tells how many wines match.
+        2. recommend_for_meal: Given a meal, provides the k wines of the cellar that pair best with it, with a pairing score and the matched meals.
+        3. cellar_summary: Provides the number of wines in the cellar, in total and per colour, country and vintage.
+        4. store_wine_agent: Given a wine name, it retrieves detailed information about the wine and stores it in the cellar. It replies with the stored wine (created is false when it updated a wine already in the cellar) or with an error status when the wine could not be stored.
+        5. mcp_review_wine_server: Manages wine reviews with tools to create, retrieve, list, search, and delete reviews. Can filter by wine name, rating, creation date (since/until), price and vintage ranges, search tasting notes by keyword, calculate average ratings, and rank the top-rated wines. For aggregate questions (rating distribution, price percentiles, averages by vintage, reviewer or wine) use review_analytics instead of listing reviews and computing the numbers yourself. When listing or searching reviews only to compare names or ratings, pass fields (for example ["id", "wine_name", "rating"]) so the tasting notes are left out. To find the reviews that best match a description, call search_reviews with top_k instead of paging through every match. For "wines like this one" requests, call similar_reviews with the review id (or a description of the wine) and recommend the wines of the reviews it returns. If a result carries matched_wine_name, the wine name was misspelt and the answer is for that wine: mention the correction to the user. Read tools return a version: when repeating a call you already made in this conversation, pass it as if_version and reuse your earlier result if the answer is "not_modified". Batch tools (create_reviews, get_reviews, delete_reviews) handle several reviews in one call: prefer them whenever more than one review is involved. Reviews include wine name, vintage, rating (1-5), tasting notes, reviewer name, and optional price.
         
         You have access to the following sub agents:
         1. buy_wine_agent: Given a wine name, it proposes the URLs of the best websites where to buy the wine.
@@ -33,15 +35,16 @@ root_agent = Agent(
         6. all other requests should be politely declined.
         
         Directives to follow **always**:
-        - When an user asks for wine recommendations, use the retrieve_wines tool to get the list of wines. Analyze the list based on the user's preferences (e.g., meal pairings, wine colour, country of origin) and recommend the most suitable wines.
-        - When an user raise question about the cellar inventory, use the retrieve_wines tool to get the list of wines.
-        - When an user wants to store a new wine, use the store_wine_agent tool and after successfully storing a wine, **always** respond by confirming the action and then immediately list the details of the wine that was stored
+        - When an user asks for a wine to pair with a meal or dish, use the recommend_for_meal tool and choose among the wines it returns.
+        - When an user asks for other wine recommendations, use the retrieve_wines tool with the filters matching the user's preferences (e.g., meal for meal pairings, colour, country_origin) instead of retrieving the whole cellar, then recommend the most suitable wines from the result. If no wine matches, retry with fewer filters.
+        - When an user raise question about the cellar inventory, use the cellar_summary tool for counts (how many wines, how many per colour, country or vintage) and the retrieve_wines tool, with filters, when the wines themselves are needed.
+        - When an user wants to store a new wine, use the store_wine_agent tool and after successfully storing a wine (status "success"), **always** respond by confirming the action and then immediately list the details of the wine that was stored. If the status is "error", tell the user the wine could not be stored and why
         - When an user wants to buy a wine, use the sub agent buy_wine_agent which will provide you the URLs of the best websites where to buy the wine. **Always** provide the URLs found to the user.
         - When an user want to create, retrieve, list, search, and delete reviews, use the tool mcp_review_wine_server
         - If the user's request does not fall into one of these categories, politely inform them that you are unable to assist with that request.
 
     """,
-    tools=[FunctionTool(retrieve_wines), AgentTool(StoreWineAgent),mcp_review_wine_server],
+    tools=[FunctionTool(retrieve_wines), FunctionTool(recommend_for_meal), FunctionTool(cellar_summary), AgentTool(StoreWineAgent),mcp_review_wine_server],
     sub_agents=[RemoteBuyWineAgent]
 )
 
@@ -0,0 +1,124 @@
+"""
+Keyset pagination for review listings.
+
+A cursor records the sort key and id of the last review on a page, so the
+next page starts strictly after that position. Unlike offsets, positions
+stay valid while other clients create or delete reviews: new reviews land
+on whichever page their sort key belongs to and deleted ones simply vanish.
+"""
+
+import base64
+import hashlib
+import heapq
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+ORDER_FIELDS = ("created_at", "rating")
+
+
+class CursorError(ValueError):
+    """Raised when a cursor is malformed or was issued for a different query."""
+
+
+def _sort_key(review: dict, order_by: str) -> tuple:
+    return (review[order_by], review["id"])
+
+
+def query_fingerprint(**filters: Any) -> str:
+    """Return a short digest identifying a set of query filters."""
+    encoded = json.dumps(filters, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=6).hexdigest()
+
+
+def encode_cursor(review: dict, order_by: str, descending: bool, fingerprint: str) -> str:
+    """Build the opaque cursor pointing just after `review`."""
+    payload = {
+        "o": order_by,
+        "d": descending,
+        "q": fingerprint,
+        "k": review[order_by],
+        "i": review["id"],
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str, order_by: str, descending: bool, fingerprint: str) -> tuple:
+    """Return the sort key stored in `cursor`, checking it matches the current query."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        position = (payload["k"], payload["i"])
+        issued_for = (payload["o"], payload["d"], payload["q"])
+    except (ValueError, TypeError, KeyError):
+        raise CursorError("Invalid cursor")
+    if issued_for != (order_by, descending, fingerprint):
+        raise CursorError("Cursor does not match the query it is used with")
+    return position
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    """Ordering, page size and start position of a listing query."""
+
+    order_by: str = "created_at"
+    descending: bool = False
+    limit: Optional[int] = None
+    after: Optional[tuple] = None
+
+    def sort_key(self, review: dict) -> tuple:
+        return _sort_key(review, self.order_by)
+
+
+def page_request(
+    order_by: str = "created_at",
+    descending: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fingerprint: str = "",
+) -> PageRequest:
+    """
+    Validate listing arguments and decode the cursor into a PageRequest.
+
+    Raises:
+        CursorError: If the cursor, ordering or limit is invalid
+    """
+    if order_by not in ORDER_FIELDS:
+        raise CursorError(f"order_by must be one of {', '.join(ORDER_FIELDS)}")
+    if limit is not None and limit < 1:
+        raise CursorError("limit must be at least 1")
+    after = decode_cursor(cursor, order_by, descending, fingerprint) if cursor else None
+    return PageRequest(order_by, descending, limit, after)
+
+
+def select_page(
+    reviews: Iterable,
+    request: PageRequest,
+    key: Optional[Callable[[Any], tuple]] = None,
+) -> list:
+    """
+    Return the reviews of one page in order, plus one look-ahead review if more follow.
+
+    Ties on the sort field are broken by review id, so the order is total.
+    Only `limit + 1` reviews are kept while selecting a page. `key` lets
+    callers page over something other than review dicts (e.g. ids) as long
+    as it returns the same (sort field, id) tuple as PageRequest.sort_key.
+    """
+    key = key or request.sort_key
+    if request.after is not None:
+        if request.descending:
+            reviews = (r for r in reviews if key(r) < request.after)
+        else:
+            reviews = (r for r in reviews if key(r) > request.after)
+
+    if request.limit is None:
+        return sorted(reviews, key=key, reverse=request.descending)
+    select = heapq.nlargest if request.descending else heapq.nsmallest
+    return select(request.limit + 1, reviews, key=key)
+
+
+def finish_page(rows: list[dict], request: PageRequest, fingerprint: str = "") -> tuple[list[dict], Optional[str]]:
+    """Trim the look-ahead row off a selected page and build the next cursor."""
+    if request.limit is None or len(rows) <= request.limit:
+        return rows, None
+    page = rows[:request.limit]
+    return page, encode_cursor(page[-1], request.order_by, request.descending, fingerprint)
@@ -0,0 +1,199 @@
+"""
+Vectorized aggregate statistics over reviews.
+
+Stores hand out a ReviewFrame, one NumPy array per numeric field plus coded
+wine and reviewer names, and every statistic is computed with array
+operations over it. The columnar store builds its frame straight from its
+typed arrays; the other backends build one from their rows.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from wine_cellar.mcp_servers.review_index import normalize_text
+
+RATING_RANGE = (1.0, 5.0)
+GROUP_FIELDS = ("vintage", "reviewer", "wine")
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+@dataclass(frozen=True)
+class ReviewFrame:
+    """
+    Review fields as parallel arrays.
+
+    `price` holds NaN for reviews without a price. `wine` and `reviewer` are
+    integer codes into `wine_names` and `reviewer_names`.
+    """
+
+    rating: np.ndarray
+    price: np.ndarray
+    vintage: np.ndarray
+    wine: np.ndarray
+    reviewer: np.ndarray
+    wine_names: Sequence[str]
+    reviewer_names: Sequence[str]
+
+    def __len__(self) -> int:
+        return len(self.rating)
+
+    @classmethod
+    def from_records(cls, records: Iterable[tuple]) -> "ReviewFrame":
+        """Build a frame from (wine_name, vintage, rating, reviewer_name, price) tuples."""
+        wine_codes: dict[str, int] = {}
+        reviewer_codes: dict[str, int] = {}
+        wine, vintage, rating, reviewer, price = [], [], [], [], []
+        for wine_name, review_vintage, review_rating, reviewer_name, review_price in records:
+            wine.append(wine_codes.setdefault(wine_name, len(wine_codes)))
+            vintage.append(review_vintage)
+            rating.append(review_rating)
+            reviewer.append(reviewer_codes.setdefault(reviewer_name, len(reviewer_codes)))
+            price.append(math.nan if review_price is None else review_price)
+        return cls(
+            rating=np.array(rating, dtype=np.float64),
+            price=np.array(price, dtype=np.float64),
+            vintage=np.array(vintage, dtype=np.int64),
+            wine=np.array(wine, dtype=np.int64),
+            reviewer=np.array(reviewer, dtype=np.int64),
+            wine_names=list(wine_codes),
+            reviewer_names=list(reviewer_codes),
+        )
+
+    @classmethod
+    def from_reviews(cls, reviews: Iterable[dict]) -> "ReviewFrame":
+        """Build a frame from review dicts."""
+        return cls.from_records(
+            (r["wine_name"], r["vintage"], r["rating"], r["reviewer_name"], r.get("price")) for r in reviews
+        )
+
+    def where(self, mask: np.ndarray) -> "ReviewFrame":
+        """Return the frame restricted to the rows selected by a boolean mask."""
+        return ReviewFrame(
+            rating=self.rating[mask],
+            price=self.price[mask],
+            vintage=self.vintage[mask],
+            wine=self.wine[mask],
+            reviewer=self.reviewer[mask],
+            wine_names=self.wine_names,
+            reviewer_names=self.reviewer_names,
+        )
+
+
+def _matching_codes(names: Sequence[str], name: str) -> np.ndarray:
+    wanted = normalize_text(name)
+    return np.array([code for code, candidate in enumerate(names) if normalize_text(candidate) == wanted], dtype=np.int64)
+
+
+def filter_frame(
+    frame: ReviewFrame,
+    reviewer_name: Optional[str] = None,
+    min_vintage: Optional[int] = None,
+    max_vintage: Optional[int] = None,
+    min_rating: Optional[float] = None,
+) -> ReviewFrame:
+    """Apply the optional filters with one combined boolean mask."""
+    mask = np.ones(len(frame), dtype=bool)
+    if reviewer_name is not None:
+        mask &= np.isin(frame.reviewer, _matching_codes(frame.reviewer_names, reviewer_name))
+    if min_vintage is not None:
+        mask &= frame.vintage >= min_vintage
+    if max_vintage is not None:
+        mask &= frame.vintage <= max_vintage
+    if min_rating is not None:
+        mask &= frame.rating >= min_rating
+    return frame if mask.all() else frame.where(mask)
+
+
+def _round(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), 2)
+
+
+def rating_histogram(ratings: np.ndarray, bin_width: float = 0.5) -> list[dict]:
+    """Count ratings in consecutive bins of `bin_width` stars from 1 to 5; the last bin includes 5."""
+    low, high = RATING_RANGE
+    bins = math.ceil(round((high - low) / bin_width, 9))
+    edges = np.round(low + bin_width * np.arange(bins + 1), 6)
+    counts, _ = np.histogram(ratings, bins=edges)
+    return [
+        {"from": float(start), "to": float(end), "count": int(count)}
+        for start, end, count in zip(edges[:-1], edges[1:], counts)
+    ]
+
+
+def price_percentiles(prices: np.ndarray, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> dict:
+    """Return the requested percentiles of the known prices (None when no review has a price)."""
+    known = prices[~np.isnan(prices)]
+    values = np.percentile(known, percentiles) if known.size else [math.nan] * len(percentiles)
+    return {
+        "priced_reviews": int(known.size),
+        "average": _round(known.mean()) if known.size else None,
+        "min": _round(known.min()) if known.size else None,
+        "max": _round(known.max()) if known.size else None,
+        "percentiles": {f"p{p:g}": _round(value) for p, value in zip(percentiles, values)},
+    }
+
+
+def group_averages(frame: ReviewFrame, group_by: str) -> list[dict]:
+    """Review count, average rating and average price for each vintage, reviewer or wine."""
+    if group_by not in GROUP_FIELDS:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_FIELDS)}")
+    if group_by == "vintage":
+        keys = frame.vintage
+    else:
+        # Spellings differing only in case or accents form one group, listed under the first code's spelling
+        names = frame.reviewer_names if group_by == "reviewer" else frame.wine_names
+        first_codes: dict[str, int] = {}
+        canonical = np.array(
+            [first_codes.setdefault(normalize_text(name), code) for code, name in enumerate(names)], dtype=np.int64
+        )
+        keys = canonical[frame.reviewer if group_by == "reviewer" else frame.wine]
+    groups, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    rating_sums = np.bincount(inverse, weights=frame.rating, minlength=len(groups))
+    priced = ~np.isnan(frame.price)
+    price_counts = np.bincount(inverse[priced], minlength=len(groups))
+    price_sums = np.bincount(inverse[priced], weights=frame.price[priced], minlength=len(groups))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_prices = np.where(price_counts > 0, price_sums / price_counts, np.nan)
+
+    if group_by == "vintage":
+        labels = [int(key) for key in groups]
+    else:
+        labels = [names[key] for key in groups]
+    rows = [
+        {
+            group_by: label,
+            "review_count": int(count),
+            "average_rating": _round(rating_sum / count),
+            "average_price": _round(average_price),
+        }
+        for label, count, rating_sum, average_price in zip(labels, counts, rating_sums, average_prices)
+    ]
+    if group_by != "vintage":
+        rows.sort(key=lambda row: normalize_text(row[group_by]))
+    return rows
+
+
+def summarize(
+    frame: ReviewFrame,
+    group_by: str = "vintage",
+    bin_width: float = 0.5,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> dict:
+    """Compute every statistic reported by the review_analytics tool."""
+    empty = len(frame) == 0
+    return {
+        "review_count": len(frame),
+        "rating": {
+            "average": None if empty else _round(frame.rating.mean()),
+            "min": None if empty else float(frame.rating.min()),
+            "max": None if empty else float(frame.rating.max()),
+            "histogram": rating_histogram(frame.rating, bin_width),
+        },
+        "price": price_percentiles(frame.price, percentiles),
+        "group_by": group_by,
+        "groups": group_averages(frame, group_by),
+    }
@@ -0,0 +1,72 @@
+"""
+Bounded in-memory log of review changes.
+
+Every review store records each created or deleted review under the store
+version the change produced. Clients that remember the version of their last
+read can ask for everything after it and update incrementally, as long as the
+log still reaches back that far; older changes are dropped once the log is
+full, and a client that fell behind has to re-read the reviews instead.
+"""
+
+import threading
+from bisect import bisect_right
+from collections import deque
+from operator import itemgetter
+from typing import NamedTuple
+
+
+class Change(NamedTuple):
+    """One created or deleted review and the store version it produced."""
+
+    version: int
+    kind: str
+    review_id: str
+    wine_name: str
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class ChangeLog:
+    """
+    The most recent changes to a store, oldest first.
+
+    Args:
+        start_version: Store version before the first recorded change
+        capacity: Number of changes kept; recording more drops the oldest
+    """
+
+    def __init__(self, start_version: int, capacity: int = 10_000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        # Plain (version, kind, review_id, wine_name) tuples: recording is on every write path
+        self._changes: deque[tuple] = deque(maxlen=capacity)
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        # Oldest version a client can continue from without missing a change
+        self._floor = start_version
+
+    @property
+    def floor(self) -> int:
+        return self._floor
+
+    def record(self, version: int, kind: str, review_id: str, wine_name: str) -> None:
+        with self._lock:
+            if len(self._changes) == self._capacity:
+                self._floor = self._changes[0][0]
+            self._changes.append((version, kind, review_id, wine_name))
+
+    def since(self, version: int, limit: int) -> tuple[list[Change], bool]:
+        """
+        Return up to `limit` changes made after `version`, oldest first.
+
+        The flag is False when changes after `version` have already been
+        dropped (or were made before the store started), so the list is not
+        the complete history since `version`.
+        """
+        with self._lock:
+            if version < self._floor:
+                return [], False
+            start = bisect_right(self._changes, version, key=itemgetter(0))
+            end = min(start + limit, len(self._changes))
+            return [Change._make(self._changes[n]) for n in range(start, end)], True
@@ -0,0 +1,444 @@
+"""
+Columnar in-memory storage for reviews.
+
+A review dict costs close to a kilobyte once its keys, boxed numbers and
+strings are counted, and every review repeats its wine name and an ISO
+timestamp. ReviewColumns keeps one typed array per field instead: names are
+interned and stored as integer codes, numbers live unboxed in `array`s,
+timestamps are integer microseconds since the epoch and tasting notes are
+UTF-8 slices of one shared buffer. Review dicts are only built when a review
+is handed back to a caller.
+
+The indexes of a ColumnarReviewStore refer to reviews by their row in the
+table rather than by id, and read what they need back from the columns: a
+posting is a 4-byte row number in an `array` instead of a string in a set,
+and nothing is kept per review that the table already holds.
+"""
+
+import heapq
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from itertools import chain, repeat
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+from wine_cellar.mcp_servers.review_analytics import ReviewFrame
+from wine_cellar.mcp_servers.review_index import (
+    NameIndex, RatingAggregates, SortedIndex, TokenIndex, normalize_text, tokenize,
+)
+from wine_cellar.mcp_servers.review_store import RANGE_FIELDS, InMemoryReviewStore
+
+_EPOCH = datetime(1970, 1, 1)
+_MISSING_PRICE = math.nan
+# Compact the notes buffer once dead bytes outnumber live ones (and exceed this)
+_MIN_GARBAGE = 64 * 1024
+
+
+def _to_micros(timestamp: str) -> int:
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is not None:
+        raise ValueError("created_at must be a naive ISO timestamp")
+    delta = moment - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> str:
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+class _Interner:
+    """Maps repeated strings to small integer codes and back."""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ReviewColumns(MutableMapping):
+    """
+    Mapping from review id to review dict, stored column by column.
+
+    Only the fields in REVIEW_FIELDS are kept. Rows freed by deletes are
+    reused by later inserts; interned names are kept for the lifetime of the
+    table since there are far fewer distinct names than reviews.
+    """
+
+    def __init__(self, reviews: Iterable[dict] = ()):
+        self._rows: dict[str, int] = {}
+        self._ids: list[Optional[str]] = []
+        self._free: list[int] = []
+        self._wine_names = _Interner()
+        self._reviewer_names = _Interner()
+        self._wine = array("I")
+        self._reviewer = array("I")
+        self._vintage = array("i")
+        self._rating = array("d")
+        self._price = array("d")
+        self._created_at = array("q")
+        self._note_start = array("Q")
+        self._note_length = array("I")
+        self._live = array("B")
+        self._notes = bytearray()
+        self._garbage = 0
+        self._readers: dict[str, Callable[[int], Any]] = {
+            "id": self._ids.__getitem__,
+            "wine_name": lambda row: self._wine_names.values[self._wine[row]],
+            "vintage": self._vintage.__getitem__,
+            "rating": self._rating.__getitem__,
+            "tasting_notes": self._note,
+            "reviewer_name": lambda row: self._reviewer_names.values[self._reviewer[row]],
+            "price": self._price_at,
+            "created_at": lambda row: _from_micros(self._created_at[row]),
+        }
+        for review in reviews:
+            self[review["id"]] = review
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __contains__(self, review_id: object) -> bool:
+        return review_id in self._rows
+
+    def __getitem__(self, review_id: str) -> dict:
+        return self._review(self._rows[review_id])
+
+    def __setitem__(self, review_id: str, review: dict) -> None:
+        notes = review["tasting_notes"].encode()
+        price = review["price"]
+        values = (
+            self._wine_names.code(review["wine_name"]),
+            self._reviewer_names.code(review["reviewer_name"]),
+            review["vintage"],
+            review["rating"],
+            _MISSING_PRICE if price is None else price,
+            _to_micros(review["created_at"]),
+        )
+        columns = (self._wine, self._reviewer, self._vintage, self._rating, self._price, self._created_at)
+        reuse = bool(self._free)
+        row = self._free[-1] if reuse else len(self._ids)
+        try:
+            for column, value in zip(columns, values):
+                if reuse:
+                    column[row] = value
+                else:
+                    column.append(value)
+        except (TypeError, OverflowError):
+            # A value that does not fit its column leaves the table unchanged
+            for column in columns:
+                del column[len(self._ids):]
+            raise
+        if reuse:
+            self._free.pop()
+        else:
+            self._ids.append(None)
+            self._note_start.append(0)
+            self._note_length.append(0)
+            self._live.append(0)
+        if review_id in self._rows:
+            del self[review_id]
+        self._note_start[row] = len(self._notes)
+        self._note_length[row] = len(notes)
+        self._notes += notes
+        self._ids[row] = review_id
+        self._live[row] = 1
+        self._rows[review_id] = row
+
+    def __delitem__(self, review_id: str) -> None:
+        row = self._rows.pop(review_id)
+        self._ids[row] = None
+        self._live[row] = 0
+        self._garbage += self._note_length[row]
+        self._note_length[row] = 0
+        self._free.append(row)
+        if self._garbage > _MIN_GARBAGE and self._garbage * 2 > len(self._notes):
+            self._compact_notes()
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def value(self, review_id: str, field: str) -> Any:
+        """Return one field of a review without building the whole dict."""
+        return self._readers[field](self._rows[review_id])
+
+    def row(self, review_id: str) -> int:
+        """Return the row holding a review; rows are only reused once their review is deleted."""
+        return self._rows[review_id]
+
+    def review_id(self, row: int) -> str:
+        """Return the id of the review in a live row."""
+        return self._ids[row]
+
+    def reader(self, field: str) -> Callable[[int], Any]:
+        """Return the function reading one field of a row, as value() returns it."""
+        return self._readers[field]
+
+    def frame(self, review_ids: Optional[Iterable[str]] = None) -> ReviewFrame:
+        """Return the given reviews (default: all) as a ReviewFrame sliced from the columns."""
+        if review_ids is None:
+            rows = np.flatnonzero(np.frombuffer(self._live, dtype=np.uint8))
+        else:
+            rows = np.fromiter(map(self._rows.__getitem__, review_ids), dtype=np.int64)
+
+        def column(values: array, dtype) -> np.ndarray:
+            # Fancy indexing copies, so no view keeps the array's buffer exported
+            return np.frombuffer(values, dtype=values.typecode)[rows].astype(dtype)
+
+        return ReviewFrame(
+            rating=column(self._rating, np.float64),
+            price=column(self._price, np.float64),
+            vintage=column(self._vintage, np.int64),
+            wine=column(self._wine, np.int64),
+            reviewer=column(self._reviewer, np.int64),
+            wine_names=list(self._wine_names.values),
+            reviewer_names=list(self._reviewer_names.values),
+        )
+
+    def _note(self, row: int) -> str:
+        start = self._note_start[row]
+        return self._notes[start:start + self._note_length[row]].decode()
+
+    def _price_at(self, row: int) -> Optional[float]:
+        price = self._price[row]
+        return None if math.isnan(price) else price
+
+    def _review(self, row: int) -> dict:
+        return {
+            "id": self._ids[row],
+            "wine_name": self._wine_names.values[self._wine[row]],
+            "vintage": self._vintage[row],
+            "rating": self._rating[row],
+            "tasting_notes": self._note(row),
+            "reviewer_name": self._reviewer_names.values[self._reviewer[row]],
+            "price": self._price_at(row),
+            "created_at": _from_micros(self._created_at[row]),
+        }
+
+    def _compact_notes(self) -> None:
+        notes = bytearray()
+        for row in self._rows.values():
+            start, length = self._note_start[row], self._note_length[row]
+            self._note_start[row] = len(notes)
+            notes += self._notes[start:start + length]
+        self._notes = notes
+        self._garbage = 0
+
+
+class RowTokenIndex(TokenIndex):
+    """
+    TokenIndex over the rows of a ReviewColumns table.
+
+    A posting is a sorted array of rows holding each row once per occurrence
+    of the token, so it also gives the term frequencies BM25 needs, and the
+    document lengths are an array indexed by row. A removed review's tokens
+    are read back from its notes, so the table must hold a review while it
+    is added or removed.
+    """
+
+    def __init__(self, table: ReviewColumns):
+        super().__init__()
+        self._table = table
+        self._postings: dict[str, array] = {}
+        self._lengths = array("I")
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, review_id: str, text: str) -> None:
+        """Index the tokens of `text` under the row of `review_id`, which must not be indexed yet."""
+        row = self._table.row(review_id)
+        terms = tokenize(text)
+        if row >= len(self._lengths):
+            self._lengths.extend(repeat(0, row + 1 - len(self._lengths)))
+        self._lengths[row] = len(terms)
+        self._total_length += len(terms)
+        self._count += 1
+        for term, frequency in Counter(terms).items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[sys.intern(term)] = array("I")
+                insort(self._vocabulary, term)
+            if not posting or posting[-1] < row:
+                posting.extend(repeat(row, frequency))
+            else:
+                position = bisect_left(posting, row)
+                posting[position:position] = array("I", repeat(row, frequency))
+
+    def remove(self, review_id: str) -> None:
+        """Drop the row of `review_id`, which must be indexed, from the index."""
+        row = self._table.row(review_id)
+        terms = tokenize(self._table.value(review_id, "tasting_notes"))
+        self._total_length -= len(terms)
+        self._count -= 1
+        self._lengths[row] = 0
+        for term in set(terms):
+            posting = self._postings[term]
+            del posting[bisect_left(posting, row):bisect_right(posting, row)]
+            if not posting:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def clear(self) -> None:
+        super().clear()
+        self._lengths = array("I")
+        self._count = 0
+
+    def search(self, query: str, match: str = "all") -> set[str]:
+        return set(map(self._table.review_id, super().search(query, match)))
+
+    def rank(self, query: str, k: int, match: str = "all") -> list[tuple[str, float]]:
+        terms = self._query_terms(query, match)
+        if not terms:
+            return []
+        tokens = {term: self._tokens_starting_with(term) for term in terms}
+        # Row -> occurrences of every token the term is a prefix of
+        frequencies = {
+            term: Counter(chain.from_iterable(self._postings[token] for token in tokens[term])) for term in terms
+        }
+        rows = self._combine([set(counts) for counts in frequencies.values()], match)
+        if not rows:
+            return []
+
+        average_length = self._total_length / self._count
+        idf = {
+            term: max(math.log((self._count - len(counts) + 0.5) / (len(counts) + 0.5)), 1e-6)
+            for term, counts in frequencies.items()
+        }
+        k1, b = self.K1, self.B
+
+        def score(row: int) -> float:
+            norm = k1 * (1 - b + b * self._lengths[row] / average_length)
+            total = 0.0
+            for term in tokens:
+                frequency = frequencies[term].get(row)
+                if frequency:
+                    total += idf[term] * frequency * (k1 + 1) / (frequency + norm)
+            return total
+
+        review_id = self._table.review_id
+        best = heapq.nsmallest(k, ((score(row), review_id(row)) for row in rows),
+                               key=lambda entry: (-entry[0], entry[1]))
+        return [(review_id, value) for value, review_id in best]
+
+
+class RowNameIndex(NameIndex):
+    """
+    NameIndex from normalized wine names to arrays of ReviewColumns rows.
+
+    A removed review's name is read back from the table, so the table must
+    hold a review while it is added or removed.
+    """
+
+    def __init__(self, table: ReviewColumns):
+        super().__init__()
+        self._table = table
+        self._ids: dict[str, array] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, review_id: str, name: str) -> None:
+        """Index the row of `review_id`, which must not be indexed yet, under `name`."""
+        self.add_many([(review_id, name)])
+
+    def add_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        new_keys: list[str] = []
+        for review_id, name in entries:
+            key = sys.intern(normalize_text(name))
+            rows = self._ids.get(key)
+            if rows is None:
+                rows = self._ids[key] = array("I")
+                new_keys.append(key)
+            rows.append(self._table.row(review_id))
+            self._count += 1
+        self._insert_names(new_keys)
+
+    def remove(self, review_id: str) -> None:
+        """Drop the row of `review_id`, which must be indexed, from the index."""
+        key = normalize_text(self._table.value(review_id, "wine_name"))
+        rows = self._ids[key]
+        rows.remove(self._table.row(review_id))
+        self._count -= 1
+        if not rows:
+            del self._ids[key]
+            del self._names[bisect_left(self._names, key)]
+            self._matcher.remove(key)
+
+    def clear(self) -> None:
+        super().clear()
+        self._count = 0
+
+    def ids_for(self, names: Iterable[str]) -> set[str]:
+        review_id = self._table.review_id
+        return {review_id(row) for name in names if name in self._ids for row in self._ids[name]}
+
+
+class RowRatingAggregates(RatingAggregates):
+    """RatingAggregates that reads a removed review's rating and price back from a ReviewColumns table."""
+
+    def __init__(self, table: ReviewColumns):
+        super().__init__()
+        self._table = table
+
+    def add(self, review: dict) -> None:
+        """Fold `review`, which must not be folded in yet, into the aggregates of its wine."""
+        self._fold(sys.intern(normalize_text(review["wine_name"])), review["wine_name"], review["rating"],
+                   review.get("price"))
+
+    def remove(self, review_id: str) -> None:
+        """Subtract a review still held by the table from its wine's aggregates."""
+        value = self._table.value
+        self._unfold(normalize_text(value(review_id, "wine_name")), value(review_id, "rating"),
+                     value(review_id, "price"))
+
+
+class RowSortedIndex(SortedIndex):
+    """SortedIndex whose blocks are arrays of ReviewColumns rows, ordered by (field value, id)."""
+
+    def __init__(self, table: ReviewColumns, field: str):
+        super().__init__()
+        self._table = table
+        read, review_id = table.reader(field), table.review_id
+        self._value_key = read
+        self._entry_key = lambda row: (read(row), review_id(row))
+
+    def _entry(self, review_id: str, value: Any) -> int:
+        return self._table.row(review_id)
+
+    def _review_id(self, row: int) -> str:
+        return self._table.review_id(row)
+
+    def _new_block(self, rows: list[int]) -> array:
+        return array("I", rows)
+
+
+class ColumnarReviewStore(InMemoryReviewStore):
+    """In-memory review store that keeps reviews in ReviewColumns instead of dicts, indexed by row."""
+
+    table_factory = ReviewColumns
+
+    def _create_indexes(self) -> None:
+        self._notes = RowTokenIndex(self._reviews)
+        self._names = RowNameIndex(self._reviews)
+        self._stats = RowRatingAggregates(self._reviews)
+        self._sorted = {field: RowSortedIndex(self._reviews, field) for field in RANGE_FIELDS}
@@ -0,0 +1,69 @@
+"""
+Time-sortable review ids.
+
+An id is 16 Crockford base32 characters: the first 10 encode the creation
+time in milliseconds since the epoch and the last 6 hold 30 random bits.
+Within one millisecond the random part is incremented instead of redrawn, so
+the ids minted by a generator are strictly increasing and sort in creation
+order, like ULIDs.
+"""
+
+import os
+import threading
+import time
+from typing import Callable
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_TIME_CHARS = 10
+_RANDOM_CHARS = 6
+_RANDOM_LIMIT = 1 << (5 * _RANDOM_CHARS)
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+class ReviewIdGenerator:
+    """
+    Mints unique, time-ordered review ids.
+
+    Args:
+        clock: Returns the current time in nanoseconds (default: time.time_ns)
+    """
+
+    def __init__(self, clock: Callable[[], int] = time.time_ns):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def _next(self) -> str:
+        now_ms = self._clock() // 1_000_000
+        if now_ms > self._last_ms:
+            # Start in the lower half so a busy millisecond has room to count up
+            self._last_ms = now_ms
+            self._last_random = int.from_bytes(os.urandom(4), "big") % (_RANDOM_LIMIT // 2)
+        else:
+            # Same millisecond, or the clock stepped back: keep counting from the last id
+            self._last_random += 1
+            if self._last_random >= _RANDOM_LIMIT:
+                self._last_ms += 1
+                self._last_random = 0
+        return _encode(self._last_ms, _TIME_CHARS) + _encode(self._last_random, _RANDOM_CHARS)
+
+    def new_id(self, exists: Callable[[str], bool] = lambda review_id: False) -> str:
+        """
+        Return a new id, skipping any for which `exists` returns True.
+
+        Ids from one generator never repeat; `exists` guards against ids
+        already stored by another process or an earlier run.
+        """
+        with self._lock:
+            review_id = self._next()
+            while exists(review_id):
+                review_id = self._next()
+            return review_id
@@ -0,0 +1,855 @@
+"""
+In-memory indexes kept alongside the review store.
+
+The indexes are updated incrementally by the review server whenever a
+review is created or deleted, so lookups never need to walk every review.
+Keys derived from reviews (tokens, normalized names) are interned so that
+the per-review bookkeeping shares one string object per distinct value.
+"""
+
+import heapq
+import math
+import re
+import sys
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Below this many new entries, insort beats appending and re-sorting the whole list
+_BULK_THRESHOLD = 64
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold text and strip accents so that "Rosé" and "rose" compare equal."""
+    folded = text.casefold()
+    if folded.isascii():
+        # ASCII has nothing to decompose or strip
+        return folded
+    decomposed = unicodedata.normalize("NFKD", folded)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _insert_sorted(entries: list, new: list) -> None:
+    """Insert `new` into the sorted list `entries`; large batches are sorted in once."""
+    if len(new) < _BULK_THRESHOLD:
+        for entry in new:
+            insort(entries, entry)
+    else:
+        entries.extend(new)
+        entries.sort()
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into normalized word tokens."""
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def trigrams(key: str) -> set[str]:
+    """Return the distinct trigrams of a normalized name, padded so its first and last letters get their own."""
+    padded = f"  {key} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+class TokenIndex:
+    """
+    Inverted index from normalized word tokens to review ids.
+
+    Query terms match every indexed token they are a prefix of, so "fruit"
+    finds reviews mentioning "fruit" as well as "fruity". The vocabulary is
+    kept sorted so each term is resolved with a binary search.
+
+    Each document's tokens are kept in order, which gives the term
+    frequencies and document lengths for BM25 ranking; the total length is
+    maintained alongside, so the average is known without a scan.
+    """
+
+    # BM25 parameters, the same as SQLite FTS5's bm25()
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: dict[str, set[str]] = {}
+        self._vocabulary: list[str] = []
+        # Document -> all its tokens, repeats included
+        self._doc_terms: dict[str, tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, review_id: str, text: str) -> None:
+        """Index the tokens of `text` under `review_id`, replacing any previous entry."""
+        if review_id in self._doc_terms:
+            self.remove(review_id)
+        terms = tuple(sys.intern(term) for term in tokenize(text))
+        self._doc_terms[review_id] = terms
+        self._total_length += len(terms)
+        for term in set(terms):
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = set()
+                insort(self._vocabulary, term)
+            posting.add(review_id)
+
+    def remove(self, review_id: str) -> None:
+        """Drop `review_id` from the index; unknown ids are ignored."""
+        terms = self._doc_terms.pop(review_id, None)
+        if terms is None:
+            return
+        self._total_length -= len(terms)
+        for term in set(terms):
+            posting = self._postings[term]
+            posting.discard(review_id)
+            if not posting:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._vocabulary.clear()
+        self._doc_terms.clear()
+        self._total_length = 0
+
+    def rebuild(self, reviews: Iterable[dict], field: str = "tasting_notes") -> None:
+        """Reindex `field` of every review from scratch."""
+        self.clear()
+        for review in reviews:
+            self.add(review["id"], review[field])
+
+    def _tokens_starting_with(self, term: str) -> list[str]:
+        """Return the indexed tokens that start with `term`."""
+        tokens = []
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            tokens.append(self._vocabulary[position])
+            position += 1
+        return tokens
+
+    def _expand(self, term: str) -> set[str]:
+        """Return the ids of all documents holding a token that starts with `term`."""
+        return set().union(*(self._postings[token] for token in self._tokens_starting_with(term)))
+
+    @staticmethod
+    def _query_terms(query: str, match: str) -> set[str]:
+        if match not in ("all", "any"):
+            raise ValueError("match must be 'all' or 'any'")
+        return set(tokenize(query))
+
+    @staticmethod
+    def _combine(candidates: list[set[str]], match: str) -> set[str]:
+        if match == "any":
+            return set().union(*candidates)
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def search(self, query: str, match: str = "all") -> set[str]:
+        """
+        Return the ids of the documents matching `query`.
+
+        Args:
+            query: One or more keywords
+            match: "all" to require every keyword, "any" to accept at least one
+
+        Returns:
+            Set of matching review ids (a fresh set the caller may mutate)
+        """
+        terms = self._query_terms(query, match)
+        if not terms:
+            return set()
+        return self._combine([self._expand(term) for term in terms], match)
+
+    def rank(self, query: str, k: int, match: str = "all") -> list[tuple[str, float]]:
+        """
+        Return the `k` documents matching `query` with the best BM25 scores, best first.
+
+        A query term counts every token it is a prefix of, both for its
+        document frequency and for its frequency in a document. Scores follow
+        SQLite FTS5's bm25(), so both review stores rank alike; ties go to
+        the smaller id.
+
+        Returns:
+            (review id, score) pairs
+        """
+        terms = self._query_terms(query, match)
+        if not terms:
+            return []
+        tokens = {term: self._tokens_starting_with(term) for term in terms}
+        matches = {term: set().union(*(self._postings[token] for token in tokens[term])) for term in terms}
+        ids = self._combine(list(matches.values()), match)
+        if not ids:
+            return []
+
+        count = len(self._doc_terms)
+        average_length = self._total_length / count
+        idf = {
+            term: max(math.log((count - len(docs) + 0.5) / (len(docs) + 0.5)), 1e-6)
+            for term, docs in matches.items()
+        }
+        k1, b = self.K1, self.B
+
+        def score(review_id: str) -> float:
+            doc = self._doc_terms[review_id]
+            norm = k1 * (1 - b + b * len(doc) / average_length)
+            total = 0.0
+            for term, expanded in tokens.items():
+                if len(expanded) <= 4:
+                    frequency = sum(map(doc.count, expanded))
+                else:
+                    frequency = sum(1 for token in doc if token.startswith(term))
+                if frequency:
+                    total += idf[term] * frequency * (k1 + 1) / (frequency + norm)
+            return total
+
+        best = heapq.nsmallest(k, ((score(review_id), review_id) for review_id in ids),
+                               key=lambda entry: (-entry[0], entry[1]))
+        return [(review_id, value) for value, review_id in best]
+
+
+class TrigramIndex:
+    """
+    Trigram postings over distinct normalized strings.
+
+    A substring of three or more characters only occurs in strings holding
+    all of its trigrams, so a substring lookup checks the strings under its
+    rarest trigram. A fuzzy lookup ranks strings by the share of the query's
+    trigrams they hold, which tolerates a typo or two: "nebiolo" still shares
+    7 of its 8 trigrams with "nebbiolo". Strings sharing none of the query's
+    rarer trigrams are never looked at.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, set[str]] = {}
+        # Name -> number of distinct trigrams
+        self._sizes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._sizes
+
+    def add(self, name: str) -> None:
+        if name in self._sizes:
+            return
+        grams = trigrams(name)
+        self._sizes[name] = len(grams)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[sys.intern(gram)] = set()
+            posting.add(name)
+
+    def remove(self, name: str) -> None:
+        """Drop `name`; unknown names are ignored."""
+        if self._sizes.pop(name, None) is None:
+            return
+        for gram in trigrams(name):
+            posting = self._postings[gram]
+            posting.discard(name)
+            if not posting:
+                del self._postings[gram]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._sizes.clear()
+
+    def contains(self, fragment: str) -> set[str]:
+        """Return the strings that contain the normalized `fragment`."""
+        if len(fragment) < 3:
+            return {name for name in self._sizes if fragment in name}
+        grams = {fragment[start:start + 3] for start in range(len(fragment) - 2)}
+        rarest = min((self._postings.get(gram, ()) for gram in grams), key=len)
+        return {name for name in rarest if fragment in name}
+
+    def similar(self, query: str, limit: int = 5, threshold: float = 0.5) -> list[tuple[str, float]]:
+        """
+        Return up to `limit` strings most similar to the normalized `query`, best first.
+
+        Args:
+            query: Normalized string, possibly misspelt or partial
+            limit: Maximum number of strings to return
+            threshold: Smallest share of the query's trigrams a string must hold
+
+        Returns:
+            (string, similarity) pairs, where similarity is the share of the query's
+            trigrams found in the string; ties go to the string closest in length
+        """
+        grams = trigrams(query)
+        needed = max(1, math.ceil(threshold * len(grams)))
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        # A name holding `needed` of the query's trigrams holds one of its rarest len - needed + 1
+        candidates = set().union(*postings[:len(postings) - needed + 1])
+        scored = []
+        for name in candidates:
+            shared = sum(1 for posting in postings if name in posting)
+            if shared >= needed:
+                union = len(grams) + self._sizes[name] - shared
+                scored.append((shared / len(grams), shared / union, name))
+        best = heapq.nsmallest(limit, scored, key=lambda score: (-score[0], -score[1], score[2]))
+        return [(name, round(share, 3)) for share, _, name in best]
+
+
+class NameMatcher:
+    """
+    Substring and typo-tolerant lookups over distinct normalized names.
+
+    Substrings are found through a TrigramIndex over the names. Fuzzy lookups
+    go a word at a time: every query word is matched against the much smaller
+    vocabulary of name words through a second TrigramIndex, then the names
+    holding the closest word of each query word are intersected, best
+    matched and rarest first. A misspelt "tenuta rosi nebiolo" costs three vocabulary lookups
+    and a pass over the names holding "rossi", however many names share the
+    common trigrams of "tenuta".
+    """
+
+    def __init__(self):
+        self._names = TrigramIndex()
+        self._vocabulary = TrigramIndex()
+        self._word_names: dict[str, set[str]] = {}
+        # Length -> names, to rank a large set of candidates by length without sorting it
+        self._lengths: dict[int, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    def add(self, name: str) -> None:
+        if name in self._names:
+            return
+        self._names.add(name)
+        self._lengths.setdefault(len(name), set()).add(name)
+        for word in set(_TOKEN_RE.findall(name)):
+            names = self._word_names.get(word)
+            if names is None:
+                names = self._word_names[sys.intern(word)] = set()
+                self._vocabulary.add(word)
+            names.add(name)
+
+    def remove(self, name: str) -> None:
+        """Drop `name`; unknown names are ignored."""
+        if name not in self._names:
+            return
+        self._names.remove(name)
+        same_length = self._lengths[len(name)]
+        same_length.discard(name)
+        if not same_length:
+            del self._lengths[len(name)]
+        for word in set(_TOKEN_RE.findall(name)):
+            names = self._word_names[word]
+            names.discard(name)
+            if not names:
+                del self._word_names[word]
+                self._vocabulary.remove(word)
+
+    def clear(self) -> None:
+        self._names.clear()
+        self._vocabulary.clear()
+        self._word_names.clear()
+        self._lengths.clear()
+
+    def contains(self, fragment: str) -> set[str]:
+        """Return the names that contain the normalized `fragment`."""
+        return self._names.contains(fragment)
+
+    def similar(self, query: str, limit: int = 5, threshold: float = 0.5) -> list[tuple[str, float]]:
+        """
+        Return up to `limit` names most similar to the normalized `query`, best first.
+
+        Args:
+            query: Normalized name, possibly misspelt or partial
+            limit: Maximum number of names to return
+            threshold: Smallest similarity for a word, and for a name, to match
+
+        Returns:
+            (name, similarity) pairs, where similarity is the average over the
+            query's words of how closely the name holds them (0 for a word it
+            lacks); ties go to the name closest in length
+        """
+        words = list(dict.fromkeys(_TOKEN_RE.findall(query)))
+        if not words:
+            return []
+        matched = [close for close in (self._vocabulary.similar(word, 8, threshold) for word in words) if close]
+        # Words matched best (usually spelt right) narrow first, the rarest of them first
+        matched.sort(key=lambda close: (-close[0][1], len(self._word_names[close[0][0]])))
+
+        candidates: Optional[set[str]] = None
+        total = 0.0
+        for close in matched:
+            # A misspelt word takes its closest correction that some remaining name holds;
+            # a word none of them holds counts as unmatched instead of emptying the result
+            for word, score in close:
+                posting = self._word_names[word]
+                # The postings are only read, never changed, so the first one needs no copy
+                narrowed = posting if candidates is None else candidates & posting
+                if narrowed:
+                    candidates = narrowed
+                    total += score
+                    break
+        similarity = total / len(words)
+        if not candidates or similarity < threshold:
+            return []
+        return [(name, round(similarity, 3)) for name in self._closest_in_length(candidates, len(query), limit)]
+
+    def _closest_in_length(self, candidates: set[str], length: int, limit: int) -> list[str]:
+        """Return up to `limit` candidates closest to `length`, walking the length buckets outward."""
+        found: list[tuple[int, str]] = []
+        longest = max(self._lengths)
+        distance = 0
+        while len(found) < limit and (length - distance > 0 or length + distance <= longest):
+            for bucket in {length - distance, length + distance}:
+                found.extend((distance, name) for name in candidates & self._lengths.get(bucket, set()))
+            distance += 1
+        return [name for _, name in sorted(found)[:limit]]
+
+
+class NameIndex:
+    """
+    Index from normalized wine names to review ids.
+
+    Distinct names are kept sorted for prefix lookups and in a NameMatcher
+    for substring and fuzzy lookups. Lookups cost a binary search or the
+    names under the query's rarest trigrams, plus the number of matching
+    names, independent of the number of reviews.
+    """
+
+    MODES = ("exact", "prefix", "contains")
+
+    def __init__(self):
+        self._ids: dict[str, set[str]] = {}
+        self._names: list[str] = []
+        self._matcher = NameMatcher()
+        self._review_names: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._review_names)
+
+    @property
+    def name_count(self) -> int:
+        """Number of distinct normalized names."""
+        return len(self._ids)
+
+    def add(self, review_id: str, name: str) -> None:
+        """Index `review_id` under `name`, replacing any previous entry."""
+        if review_id in self._review_names:
+            self.remove(review_id)
+        key = sys.intern(normalize_text(name))
+        self._review_names[review_id] = key
+        ids = self._ids.get(key)
+        if ids is None:
+            ids = self._ids[key] = set()
+            insort(self._names, key)
+            self._matcher.add(key)
+        ids.add(review_id)
+
+    def add_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        """Index several (review_id, name) pairs, sorting the new names in once."""
+        new_keys: list[str] = []
+        for review_id, name in entries:
+            if review_id in self._review_names:
+                # remove() expects every indexed name to be in the sorted lists
+                self._insert_names(new_keys)
+                new_keys = []
+                self.remove(review_id)
+            key = sys.intern(normalize_text(name))
+            self._review_names[review_id] = key
+            ids = self._ids.get(key)
+            if ids is None:
+                ids = self._ids[key] = set()
+                new_keys.append(key)
+            ids.add(review_id)
+        self._insert_names(new_keys)
+
+    def _insert_names(self, keys: list[str]) -> None:
+        _insert_sorted(self._names, keys)
+        for key in keys:
+            self._matcher.add(key)
+
+    def remove(self, review_id: str) -> None:
+        """Drop `review_id` from the index; unknown ids are ignored."""
+        key = self._review_names.pop(review_id, None)
+        if key is None:
+            return
+        ids = self._ids[key]
+        ids.discard(review_id)
+        if not ids:
+            del self._ids[key]
+            del self._names[bisect_left(self._names, key)]
+            self._matcher.remove(key)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._names.clear()
+        self._matcher.clear()
+        self._review_names.clear()
+
+    def rebuild(self, reviews: Iterable[dict], field: str = "wine_name") -> None:
+        """Reindex `field` of every review from scratch."""
+        self.clear()
+        for review in reviews:
+            self.add(review["id"], review[field])
+
+    def names(self, query: str, mode: str = "contains") -> set[str]:
+        """
+        Return the distinct normalized names matching `query`.
+
+        Args:
+            query: Wine name or fragment of it
+            mode: "exact", "prefix" or "contains"
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {', '.join(self.MODES)}")
+        key = normalize_text(query)
+        if mode == "exact":
+            return {key} if key in self._ids else set()
+        if mode == "prefix":
+            matches = set()
+            position = bisect_left(self._names, key)
+            while position < len(self._names) and self._names[position].startswith(key):
+                matches.add(self._names[position])
+                position += 1
+            return matches
+        if not key:
+            return set(self._ids)
+        return self._matcher.contains(key)
+
+    def similar(self, query: str, limit: int = 5, threshold: float = 0.5) -> list[tuple[str, float]]:
+        """Return up to `limit` (normalized name, similarity) pairs for a possibly misspelt `query`, best first."""
+        return self._matcher.similar(normalize_text(query), limit, threshold)
+
+    def ids_for(self, names: Iterable[str]) -> set[str]:
+        """Return the review ids indexed under any of the given normalized names."""
+        return set().union(*(self._ids[name] for name in names if name in self._ids))
+
+    def search(self, query: str, mode: str = "contains") -> set[str]:
+        """Return the ids of the reviews whose wine name matches `query`."""
+        return self.ids_for(self.names(query, mode))
+
+
+@dataclass(frozen=True)
+class KeyRange:
+    """Bounds on a field value; a None bound leaves that side open."""
+
+    low: Any = None
+    high: Any = None
+    high_inclusive: bool = True
+
+    def __bool__(self) -> bool:
+        return self.low is not None or self.high is not None
+
+    def __contains__(self, value: Any) -> bool:
+        if value is None:
+            return False
+        if self.low is not None and value < self.low:
+            return False
+        if self.high is not None and (value > self.high or (value == self.high and not self.high_inclusive)):
+            return False
+        return True
+
+
+class SortedIndex:
+    """
+    Review ids ordered by one field, for range queries in O(log n + k).
+
+    Entries are (value, review id) pairs, which is the same total order the
+    listings use. They are kept in sorted blocks of at most 2 * LOAD entries,
+    so an insert or delete shifts one block instead of the whole index.
+    Reviews whose value is None are not indexed, so they never match a range.
+    Positions inside the index are (block, offset) pairs.
+
+    Subclasses may store something smaller than the pairs in the blocks by
+    overriding _entry, _review_id and _new_block and setting _entry_key and
+    _value_key to the functions giving an entry's (value, id) and value.
+    """
+
+    LOAD = 1000
+
+    # Blocks hold the (value, id) pairs themselves, which compare as they are
+    _entry_key: Optional[Callable[[Any], tuple[Any, str]]] = None
+    _value_key: Callable[[Any], Any] = itemgetter(0)
+
+    def __init__(self):
+        self._blocks: list[list[tuple[Any, str]]] = []
+        # (value, id) of the last entry of each block, to find the block an entry belongs to
+        self._maxes: list[tuple[Any, str]] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _entry(self, review_id: str, value: Any) -> Any:
+        return value, review_id
+
+    def _review_id(self, entry: Any) -> str:
+        return entry[1]
+
+    def _new_block(self, entries: list) -> Any:
+        return entries
+
+    def _key(self, entry: Any) -> tuple[Any, str]:
+        return entry if self._entry_key is None else self._entry_key(entry)
+
+    def add(self, review_id: str, value: Any) -> None:
+        if value is None:
+            return
+        key = (value, review_id)
+        entry = self._entry(review_id, value)
+        self._len += 1
+        if not self._blocks:
+            self._blocks.append(self._new_block([entry]))
+            self._maxes.append(key)
+            return
+        position = min(bisect_left(self._maxes, key), len(self._blocks) - 1)
+        block = self._blocks[position]
+        insort(block, entry, key=self._entry_key)
+        self._maxes[position] = max(self._maxes[position], key)
+        if len(block) > 2 * self.LOAD:
+            self._blocks.insert(position + 1, block[self.LOAD:])
+            del block[self.LOAD:]
+            self._maxes.insert(position, self._key(block[-1]))
+
+    def add_many(self, entries: Iterable[tuple[str, Any]]) -> None:
+        """Add several (review_id, value) pairs; a batch that is large next to the index is sorted in once."""
+        new = [(review_id, value) for review_id, value in entries if value is not None]
+        if len(new) < max(_BULK_THRESHOLD, self._len // 8):
+            for review_id, value in new:
+                self.add(review_id, value)
+            return
+        merged = [entry for block in self._blocks for entry in block]
+        merged.extend(self._entry(review_id, value) for review_id, value in new)
+        merged.sort(key=self._entry_key)
+        self._blocks = [self._new_block(merged[start:start + self.LOAD]) for start in range(0, len(merged), self.LOAD)]
+        self._maxes = [self._key(block[-1]) for block in self._blocks]
+        self._len = len(merged)
+
+    def remove(self, review_id: str, value: Any) -> None:
+        """Drop the entry added for `review_id` with `value`; missing entries are ignored."""
+        if value is None:
+            return
+        key = (value, review_id)
+        position = bisect_left(self._maxes, key)
+        if position == len(self._blocks):
+            return
+        block = self._blocks[position]
+        offset = bisect_left(block, key, key=self._entry_key)
+        if self._key(block[offset]) != key:
+            return
+        del block[offset]
+        self._len -= 1
+        if block:
+            self._maxes[position] = self._key(block[-1])
+        else:
+            del self._blocks[position]
+            del self._maxes[position]
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._maxes.clear()
+        self._len = 0
+
+    def _position(self, value: Any, right: bool, key: Optional[Callable] = None) -> tuple[int, int]:
+        """
+        Return the (block, offset) where bisect_left (or bisect_right) would place `value`.
+
+        `value` is a (value, id) position, or a bare value when `key` is given.
+        """
+        search = bisect_right if right else bisect_left
+        block = search(self._maxes, value, key=key)
+        if block == len(self._blocks):
+            return block, 0
+        return block, search(self._blocks[block], value, key=self._entry_key if key is None else self._value_key)
+
+    def _bounds(self, key_range: KeyRange) -> tuple[tuple[int, int], tuple[int, int]]:
+        key = itemgetter(0)
+        start = (0, 0) if key_range.low is None else self._position(key_range.low, False, key)
+        if key_range.high is None:
+            end = (len(self._blocks), 0)
+        else:
+            end = self._position(key_range.high, key_range.high_inclusive, key)
+        return start, max(start, end)
+
+    def count(self, key_range: KeyRange) -> int:
+        """Return how many reviews fall in `key_range`, in O(log n + n / LOAD)."""
+        (start_block, start_offset), (end_block, end_offset) = self._bounds(key_range)
+        return sum(map(len, self._blocks[start_block:end_block])) - start_offset + end_offset
+
+    def ids(
+        self,
+        key_range: KeyRange = KeyRange(),
+        descending: bool = False,
+        after: Optional[tuple[Any, str]] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the ids in `key_range` in (value, id) order.
+
+        Args:
+            key_range: Bounds on the indexed value
+            descending: Walk from the largest value down
+            after: Only yield entries strictly past this (value, id) position
+        """
+        start, end = self._bounds(key_range)
+        if after is not None:
+            if descending:
+                end = min(end, self._position(after, False))
+            else:
+                start = max(start, self._position(after, True))
+        if start >= end:
+            return
+        (start_block, start_offset), (end_block, end_offset) = start, end
+        blocks, review_id = self._blocks, self._review_id
+        if descending:
+            for number in range(min(end_block, len(blocks) - 1), start_block - 1, -1):
+                block = blocks[number]
+                stop = end_offset if number == end_block else len(block)
+                first = start_offset if number == start_block else 0
+                for position in range(stop - 1, first - 1, -1):
+                    yield review_id(block[position])
+        else:
+            for number in range(start_block, min(end_block, len(blocks) - 1) + 1):
+                block = blocks[number]
+                first = start_offset if number == start_block else 0
+                stop = end_offset if number == end_block else len(block)
+                for position in range(first, stop):
+                    yield review_id(block[position])
+
+
+@dataclass(slots=True)
+class WineStats:
+    """Running rating and price totals for one wine (or a union of wines)."""
+
+    wine_name: str
+    count: int = 0
+    rating_sum: float = 0.0
+    price_count: int = 0
+    price_sum: float = 0.0
+    ratings: Counter = field(default_factory=Counter)
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.count if self.count else 0.0
+
+    @property
+    def average_price(self) -> Optional[float]:
+        return self.price_sum / self.price_count if self.price_count else None
+
+    @property
+    def min_rating(self) -> Optional[float]:
+        return min(self.ratings) if self.ratings else None
+
+    @property
+    def max_rating(self) -> Optional[float]:
+        return max(self.ratings) if self.ratings else None
+
+    def to_dict(self) -> dict:
+        average_price = self.average_price
+        return {
+            "wine_name": self.wine_name,
+            "average_rating": round(self.average_rating, 2),
+            "review_count": self.count,
+            "min_rating": self.min_rating,
+            "max_rating": self.max_rating,
+            "average_price": round(average_price, 2) if average_price is not None else None,
+        }
+
+
+class RatingAggregates:
+    """
+    Per-wine rating aggregates keyed by normalized wine name.
+
+    Count, sums and a histogram of ratings are updated in O(1) per review,
+    so averages and min/max never require revisiting individual reviews.
+    Ratings take few distinct values, so min/max over the histogram is cheap.
+    """
+
+    def __init__(self):
+        self._stats: dict[str, WineStats] = {}
+        self._review_entries: dict[str, tuple[str, float, Optional[float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def add(self, review: dict) -> None:
+        """Fold `review` into the aggregates of its wine."""
+        review_id = review["id"]
+        if review_id in self._review_entries:
+            self.remove(review_id)
+        key = sys.intern(normalize_text(review["wine_name"]))
+        rating, price = review["rating"], review.get("price")
+        self._fold(key, review["wine_name"], rating, price)
+        self._review_entries[review_id] = (key, rating, price)
+
+    def remove(self, review_id: str) -> None:
+        """Subtract a review from its wine's aggregates; unknown ids are ignored."""
+        entry = self._review_entries.pop(review_id, None)
+        if entry is not None:
+            self._unfold(*entry)
+
+    def _fold(self, key: str, wine_name: str, rating: float, price: Optional[float]) -> None:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = WineStats(wine_name=wine_name)
+        stats.count += 1
+        stats.rating_sum += rating
+        stats.ratings[rating] += 1
+        if price is not None:
+            stats.price_count += 1
+            stats.price_sum += price
+
+    def _unfold(self, key: str, rating: float, price: Optional[float]) -> None:
+        stats = self._stats[key]
+        stats.count -= 1
+        if not stats.count:
+            del self._stats[key]
+            return
+        stats.rating_sum -= rating
+        stats.ratings[rating] -= 1
+        if not stats.ratings[rating]:
+            del stats.ratings[rating]
+        if price is not None:
+            stats.price_count -= 1
+            stats.price_sum -= price
+
+    def clear(self) -> None:
+        self._stats.clear()
+        self._review_entries.clear()
+
+    def rebuild(self, reviews: Iterable[dict]) -> None:
+        """Recompute every aggregate from scratch."""
+        self.clear()
+        for review in reviews:
+            self.add(review)
+
+    def get(self, key: str) -> Optional[WineStats]:
+        """Return the aggregates of one normalized wine name."""
+        return self._stats.get(key)
+
+    def combine(self, keys: Iterable[str], wine_name: str) -> WineStats:
+        """Merge the aggregates of several normalized wine names into one."""
+        total = WineStats(wine_name=wine_name)
+        for key in keys:
+            stats = self._stats.get(key)
+            if stats is None:
+                continue
+            total.count += stats.count
+            total.rating_sum += stats.rating_sum
+            total.price_count += stats.price_count
+            total.price_sum += stats.price_sum
+            total.ratings.update(stats.ratings)
+        return total
+
+    def top_rated(self, k: int, min_reviews: int = 1) -> list[WineStats]:
+        """Return the `k` wines with the best average rating and at least `min_reviews` reviews."""
+        eligible = (stats for stats in self._stats.values() if stats.count >= min_reviews)
+        return heapq.nlargest(k, eligible, key=lambda stats: (stats.average_rating, stats.count))
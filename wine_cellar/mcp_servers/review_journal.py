@@ -0,0 +1,310 @@
+"""
+Write-ahead journal and snapshots for the in-memory review store.
+
+Every mutation is appended to `journal.log` as one compact JSON line before it
+is acknowledged. A background thread periodically writes the whole store to
+`snapshot.jsonl` and starts a fresh journal, so on restart the server loads
+the latest snapshot (memory-mapped) and replays only the journal tail.
+
+Files in the journal directory:
+    snapshot.jsonl   header line {"seq": N, "version": V} followed by one review per line
+    journal.log      records {"s": seq, "op": "c", "r": review} / {"s": seq, "op": "d", "id": id}
+    journal.old      previous journals, present only until a compaction writes its snapshot
+"""
+
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from wine_cellar.mcp_servers.review_store import InMemoryReviewStore
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+JOURNAL_FILE = "journal.log"
+OLD_JOURNAL_FILE = "journal.old"
+
+
+def _dumps(record: dict) -> bytes:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+
+
+def _fsync_directory(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_lines(path: Path) -> Iterator[tuple[int, bytes]]:
+    """Yield (end offset, line) pairs of a file through a read-only memory map."""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in iter(mm.readline, b""):
+            yield mm.tell(), line
+
+
+class ReviewJournal:
+    """
+    Append-only journal with batched fsync.
+
+    Args:
+        directory: Where the snapshot and journal files live
+        fsync_every: fsync after this many records (0 leaves flushing to the OS)
+        fsync_interval: Also fsync pending records at least this often, in seconds
+    """
+
+    def __init__(self, directory: str | Path, fsync_every: int = 1, fsync_interval: Optional[float] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.seq = 0
+        self._pending = 0
+        self._since_snapshot = 0
+        self._last_fsync = time.monotonic()
+        self._file = None
+
+    @property
+    def is_new(self) -> bool:
+        """True when no snapshot and no journal exist yet."""
+        return not any((self.directory / name).exists() for name in (SNAPSHOT_FILE, JOURNAL_FILE, OLD_JOURNAL_FILE))
+
+    @property
+    def records_since_snapshot(self) -> int:
+        return self._since_snapshot
+
+    def snapshot_version(self) -> int:
+        """Return the store version saved with the snapshot (0 if there is none)."""
+        for _, line in _read_lines(self.directory / SNAPSHOT_FILE):
+            return json.loads(line).get("version", 0)
+        return 0
+
+    def load(self) -> Iterator[tuple[str, dict]]:
+        """
+        Yield the recovered operations in order: ("create", review) or ("delete", {"id": ...}).
+
+        The snapshot is replayed as creates, then every journal record newer
+        than the snapshot. A torn record at the end of the journal (from a
+        crash mid-write) is discarded and the file truncated before it.
+        """
+        snapshot_seq = 0
+        lines = _read_lines(self.directory / SNAPSHOT_FILE)
+        for _, line in lines:
+            snapshot_seq = json.loads(line)["seq"]
+            break
+        for _, line in lines:
+            yield "create", json.loads(line)
+        self.seq = snapshot_seq
+
+        for name in (OLD_JOURNAL_FILE, JOURNAL_FILE):
+            path = self.directory / name
+            good_offset = 0
+            for offset, line in _read_lines(path):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_offset = offset
+                if record["s"] <= self.seq:
+                    continue
+                self.seq = record["s"]
+                self._since_snapshot += 1
+                if record["op"] == "c":
+                    yield "create", record["r"]
+                else:
+                    yield "delete", {"id": record["id"]}
+            if path.exists() and path.stat().st_size > good_offset:
+                os.truncate(path, good_offset)
+
+    def open(self) -> None:
+        """Open the journal for appending."""
+        self._file = open(self.directory / JOURNAL_FILE, "ab")
+
+    def append_create(self, review: dict) -> None:
+        self._append({"op": "c", "r": review})
+
+    def append_delete(self, review_id: str) -> None:
+        self._append({"op": "d", "id": review_id})
+
+    def append_many(self, records: Iterable[dict]) -> None:
+        """Append several records with a single flush and at most one fsync."""
+        for record in records:
+            self.seq += 1
+            self._file.write(_dumps({"s": self.seq, **record}))
+            self._pending += 1
+            self._since_snapshot += 1
+        self._file.flush()
+        if self.fsync_every and self._pending >= self.fsync_every:
+            self.sync()
+
+    def _append(self, record: dict) -> None:
+        self.append_many((record,))
+
+    def sync(self) -> None:
+        """fsync every record written so far."""
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+        self._last_fsync = time.monotonic()
+
+    def sync_if_due(self) -> None:
+        """fsync pending records when fsync_interval has elapsed."""
+        if self.fsync_interval is not None and time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self.sync()
+
+    def rotate(self) -> int:
+        """
+        Start a new journal and return the sequence number the next snapshot must cover.
+
+        Must be called while mutations are blocked, together with capturing
+        the store contents that will go into the snapshot.
+        """
+        self.sync()
+        self._file.close()
+        journal, old_journal = self.directory / JOURNAL_FILE, self.directory / OLD_JOURNAL_FILE
+        if old_journal.exists():
+            # The last snapshot was never written, so the old journal is still needed: append to it
+            with open(journal, "rb") as source, open(old_journal, "ab") as target:
+                shutil.copyfileobj(source, target)
+                target.flush()
+                os.fsync(target.fileno())
+            os.truncate(journal, 0)
+        else:
+            os.replace(journal, old_journal)
+        self.open()
+        self._since_snapshot = 0
+        return self.seq
+
+    def write_snapshot(self, reviews: Iterable[dict], seq: int, version: int) -> None:
+        """Atomically replace the snapshot, then drop the journal it supersedes."""
+        temporary = self.directory / (SNAPSHOT_FILE + ".tmp")
+        with open(temporary, "wb") as f:
+            f.write(_dumps({"seq": seq, "version": version}))
+            for review in reviews:
+                f.write(_dumps(review))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.directory / SNAPSHOT_FILE)
+        _fsync_directory(self.directory)
+        (self.directory / OLD_JOURNAL_FILE).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+class JournaledReviewStore(InMemoryReviewStore):
+    """
+    In-memory review store made durable by a write-ahead journal and snapshots.
+
+    Reads are served from memory exactly like InMemoryReviewStore. Each
+    mutation is journaled before it is applied, and a background thread
+    compacts the journal into a snapshot every `snapshot_interval` seconds
+    once at least `snapshot_min_records` records have accumulated.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        seed: Iterable[dict] = (),
+        fsync_every: int = 1,
+        fsync_interval: Optional[float] = None,
+        snapshot_interval: Optional[float] = 300.0,
+        snapshot_min_records: int = 1,
+    ):
+        super().__init__()
+        self._write_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._journal = ReviewJournal(directory, fsync_every, fsync_interval)
+        self.snapshot_min_records = snapshot_min_records
+
+        if self._journal.is_new:
+            self._add_many(dict(review) for review in seed)
+            self._journal.write_snapshot(self._reviews.values(), 0, self._version)
+        else:
+            # Replaying the journal reissues versions, so it starts from the last version saved
+            self._resume_from(self._journal.snapshot_version())
+            # Replay runs of creates as batches so a large snapshot is indexed in one pass
+            creates: list[dict] = []
+            for op, payload in self._journal.load():
+                if op == "create":
+                    creates.append(payload)
+                else:
+                    self._add_many(creates)
+                    creates = []
+                    self._remove(payload["id"])
+            self._add_many(creates)
+            if (self._journal.directory / OLD_JOURNAL_FILE).exists():
+                # A compaction was interrupted: persist the recovered state before
+                # the next rotation overwrites the old journal
+                self._journal.write_snapshot(self._reviews.values(), self._journal.seq, self._version)
+        self._journal.open()
+
+        self._stop = threading.Event()
+        self._worker = None
+        intervals = [i for i in (fsync_interval, snapshot_interval) if i]
+        if intervals:
+            self._snapshot_interval = snapshot_interval
+            self._worker = threading.Thread(
+                target=self._maintain, args=(min(intervals),), name="review-journal", daemon=True
+            )
+            self._worker.start()
+
+    def add(self, review: dict) -> None:
+        with self._write_lock:
+            self._journal.append_create(review)
+            super().add(review)
+
+    def remove(self, review_id: str) -> Optional[dict]:
+        with self._write_lock:
+            if review_id not in self._reviews:
+                return None
+            self._journal.append_delete(review_id)
+            return super().remove(review_id)
+
+    def add_many(self, reviews: list[dict]) -> None:
+        with self._write_lock:
+            self._journal.append_many({"op": "c", "r": review} for review in reviews)
+            super().add_many(reviews)
+
+    def remove_many(self, review_ids: list[str]) -> list[Optional[dict]]:
+        with self._write_lock:
+            existing = [i for i in dict.fromkeys(review_ids) if i in self._reviews]
+            self._journal.append_many({"op": "d", "id": review_id} for review_id in existing)
+            return super().remove_many(review_ids)
+
+    def compact(self) -> None:
+        """Write a snapshot of the current contents and discard the journal it covers."""
+        with self._compact_lock:
+            with self._write_lock:
+                seq = self._journal.rotate()
+                reviews = list(self._reviews.values())
+                version = self._version
+            self._journal.write_snapshot(reviews, seq, version)
+
+    def _maintain(self, tick: float) -> None:
+        last_snapshot = time.monotonic()
+        while not self._stop.wait(tick):
+            with self._write_lock:
+                self._journal.sync_if_due()
+            due = self._snapshot_interval and time.monotonic() - last_snapshot >= self._snapshot_interval
+            if due and self._journal.records_since_snapshot >= self.snapshot_min_records:
+                self.compact()
+                last_snapshot = time.monotonic()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        with self._write_lock:
+            self._journal.close()
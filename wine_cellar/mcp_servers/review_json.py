@@ -0,0 +1,89 @@
+"""
+JSON encoding for review server responses.
+
+Uses orjson when it is installed (`pip install -e .[fast]`) and the standard
+library otherwise; both produce compact UTF-8 JSON. Reviews never change once
+created, so their serialized form is cached and responses are assembled by
+splicing the cached fragments into the response envelope.
+"""
+
+import json
+import threading
+from typing import Iterable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps(obj) -> str:
+    """Serialize `obj` to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return _encoder.encode(obj)
+
+
+def raw_array(fragments: Iterable[str]) -> str:
+    """Join already serialized values into a JSON array."""
+    return "[" + ",".join(fragments) + "]"
+
+
+def _with_placeholder(node: dict, keys: tuple[str, ...]) -> dict:
+    head, rest = keys[0], keys[1:]
+    copy = {k: v for k, v in node.items() if k != head}
+    copy[head] = _with_placeholder(node[head], rest) if rest else None
+    return copy
+
+
+def dumps_with_raw(obj: dict, path: tuple[str, ...], raw: str) -> str:
+    """
+    Serialize `obj` with the value at `path` replaced by the pre-serialized `raw` JSON.
+
+    The key at every level of `path` is moved last and encoded as null, so the
+    encoded text ends with "null" followed by one closing brace per level and
+    the placeholder can be swapped for `raw` without re-encoding it.
+    """
+    encoded = dumps(_with_placeholder(obj, path))
+    suffix = "null" + "}" * len(path)
+    assert encoded.endswith(suffix)
+    return encoded[:-len(suffix)] + raw + "}" * len(path)
+
+
+class FragmentCache:
+    """
+    Serialized reviews keyed by review id.
+
+    Stores must call discard() whenever a review id is added or removed. The
+    cache holds at most `max_entries` fragments and evicts the oldest first.
+    It is safe to use from several threads.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._fragments: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def get(self, review: dict) -> str:
+        """Return the serialized form of `review`, encoding it on first use."""
+        fragment = self._fragments.get(review["id"])
+        if fragment is None:
+            fragment = dumps(review)
+            with self._lock:
+                if len(self._fragments) >= self.max_entries:
+                    self._fragments.pop(next(iter(self._fragments)), None)
+                self._fragments[review["id"]] = fragment
+        return fragment
+
+    def discard(self, review_id: str) -> None:
+        with self._lock:
+            self._fragments.pop(review_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
@@ -1,19 +1,192 @@
 from fastmcp import FastMCP
 from datetime import datetime
 from typing import Optional
-import uuid
-import json
+import atexit
+import os
 import sys
 from pathlib import Path
 
 # Add the parent directory to the path to import shared_library
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from wine_cellar.shared_library.wine_data import FAKE_REVIEWS
+from wine_cellar.mcp_servers.review_ids import ReviewIdGenerator
+from wine_cellar.mcp_servers.review_index import KeyRange, NameIndex
+from wine_cellar.mcp_servers.review_store import REVIEW_FIELDS, store_from_env
+from wine_cellar.mcp_servers.pagination import finish_page, page_request, query_fingerprint
+from wine_cellar.mcp_servers.review_json import dumps, dumps_with_raw, raw_array
+from wine_cellar.mcp_servers.review_analytics import DEFAULT_PERCENTILES, GROUP_FIELDS, filter_frame, summarize
 
 mcp = FastMCP("Wine Review MCP Server")
 
-# In-memory storage initialized with fake data
-REVIEWS = FAKE_REVIEWS.copy()
+# Review storage, selected with REVIEW_STORE=memory|journal|sqlite (see store_from_env).
+# A new store is seeded with the fake reviews.
+REVIEWS = store_from_env(FAKE_REVIEWS.values())
+atexit.register(lambda: REVIEWS.close())
+
+# Largest number of items accepted by the bulk tools in one call
+MAX_BATCH_SIZE = 500
+
+# Mints time-sortable review ids
+REVIEW_IDS = ReviewIdGenerator()
+
+
+def _new_review(
+    wine_name: str,
+    vintage: int,
+    rating: float,
+    tasting_notes: str,
+    reviewer_name: str = "Anonymous",
+    price: Optional[float] = None
+) -> dict:
+    """Build a review record with a fresh id and creation timestamp."""
+    return {
+        "id": REVIEW_IDS.new_id(REVIEWS.__contains__),
+        "wine_name": wine_name,
+        "vintage": vintage,
+        "rating": rating,
+        "tasting_notes": tasting_notes,
+        "reviewer_name": reviewer_name,
+        "price": price,
+        "created_at": datetime.now().isoformat()
+    }
+
+
+def _review_input_error(item: dict) -> Optional[str]:
+    """Return why a bulk create item is invalid, or None if it is valid."""
+    if not isinstance(item, dict):
+        return "Review must be an object"
+    for field, kind in (("wine_name", str), ("vintage", int), ("rating", (int, float)), ("tasting_notes", str)):
+        if field not in item:
+            return f"Missing field '{field}'"
+        if not isinstance(item[field], kind) or isinstance(item[field], bool):
+            return f"Invalid value for '{field}'"
+    if not 1 <= item["rating"] <= 5:
+        return "Rating must be between 1 and 5"
+    if not isinstance(item.get("reviewer_name", "Anonymous"), str):
+        return "Invalid value for 'reviewer_name'"
+    price = item.get("price")
+    if price is not None and (not isinstance(price, (int, float)) or isinstance(price, bool)):
+        return "Invalid value for 'price'"
+    return None
+
+
+def _batch_too_large(items: list) -> Optional[str]:
+    """Return an error response if a bulk request exceeds MAX_BATCH_SIZE."""
+    if len(items) <= MAX_BATCH_SIZE:
+        return None
+    return dumps({
+        "status": "error",
+        "data": f"At most {MAX_BATCH_SIZE} items can be processed per call"
+    })
+
+
+def _timestamp_bound(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize an ISO date or date-time to the stored created_at format.
+
+    Raises:
+        ValueError: If `value` is not an ISO date or date-time
+    """
+    if value is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date or date-time '{value}', expected ISO 8601 such as 2025-01-31")
+    if moment.tzinfo is not None:
+        # created_at is stored in server local time without an offset
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def _projection(fields: Optional[list[str]]) -> Optional[tuple[str, ...]]:
+    """Validate a `fields` argument; None means whole reviews. Raises ValueError."""
+    if fields is None:
+        return None
+    unknown = [field for field in fields if field not in REVIEW_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"fields must be a non-empty list of {', '.join(REVIEW_FIELDS)}")
+    return tuple(dict.fromkeys(fields))
+
+
+def _reviews_response(data: dict, fields: Optional[tuple[str, ...]]) -> str:
+    """
+    Encode a success response whose data["reviews"] holds stored reviews.
+    
+    Whole reviews are spliced in from the serialized-review cache; a projection
+    encodes just the requested fields of each review.
+    """
+    page = data["reviews"]
+    if fields is None:
+        reviews = raw_array(map(REVIEWS.serialize, page))
+    else:
+        reviews = dumps([{field: review.get(field) for field in fields} for review in page])
+    return dumps_with_raw({"status": "success", "data": data}, ("data", "reviews"), reviews)
+
+
+def _not_modified(version: int, if_version: Optional[int]) -> Optional[str]:
+    """Return the short not_modified response if the caller already has `version`."""
+    if if_version is None or if_version != version:
+        return None
+    return dumps({
+        "status": "not_modified",
+        "data": {"version": version}
+    })
+
+
+def _similar_wine(wine_name: Optional[str], wine_match: str) -> Optional[tuple[str, float]]:
+    """
+    Return the (wine name, similarity) most similar to `wine_name` when it matches no stored wine.
+    
+    Exact lookups are taken at their word and never fall back.
+    """
+    if not wine_name or wine_match == "exact" or REVIEWS.wine_keys(wine_name, wine_match):
+        return None
+    similar = REVIEWS.similar_wines(wine_name, limit=1)
+    return similar[0] if similar else None
+
+
+def _invalid_wine_match(wine_match: str) -> Optional[str]:
+    """Return an error response if `wine_match` is not a supported lookup mode."""
+    if wine_match in NameIndex.MODES:
+        return None
+    return dumps({
+        "status": "error",
+        "data": f"wine_match must be one of {', '.join(NameIndex.MODES)}"
+    })
+
+
+def _ranked_search(keyword: str, match: str, top_k: int, fields: Optional[list[str]], version: int) -> str:
+    """Return the search_reviews response for the top_k reviews by BM25 score."""
+    try:
+        projection = _projection(fields)
+    except ValueError as e:
+        return dumps({
+            "status": "error",
+            "data": str(e)
+        })
+    
+    ranked = REVIEWS.search_ranked(keyword, top_k, match)
+    if not ranked:
+        return dumps({
+            "status": "success",
+            "data": {
+                "message": f"No reviews found containing '{keyword}'",
+                "reviews": [],
+                "scores": [],
+                "count": 0,
+                "version": version
+            }
+        })
+    
+    return _reviews_response({
+        "keyword": keyword,
+        "reviews": [review for review, _ in ranked],
+        "scores": [round(score, 4) for _, score in ranked],
+        "count": len(ranked),
+        "version": version
+    }, projection)
+
 
 @mcp.tool()
 def create_review(
@@ -39,24 +212,16 @@ def create_review(
         JSON string with status and data fields
     """
     if not 1 <= rating <= 5:
-        return json.dumps({
+        return dumps({
             "status": "error",
             "data": "Rating must be between 1 and 5"
         })
     
-    review_id = str(uuid.uuid4())[:8]
-    REVIEWS[review_id] = {
-        "id": review_id,
-        "wine_name": wine_name,
-        "vintage": vintage,
-        "rating": rating,
-        "tasting_notes": tasting_notes,
-        "reviewer_name": reviewer_name,
-        "price": price,
-        "created_at": datetime.now().isoformat()
-    }
+    review = _new_review(wine_name, vintage, rating, tasting_notes, reviewer_name, price)
+    review_id = review["id"]
+    REVIEWS.add(review)
     
-    return json.dumps({
+    return dumps({
         "status": "success",
         "data": {
             "message": f"Review created successfully! ID: {review_id}",
@@ -66,69 +231,158 @@ def create_review(
 
 
 @mcp.tool()
-def get_review(review_id: str) -> str:
+def get_review(review_id: str, if_version: Optional[int] = None) -> str:
     """
     Get a specific review by ID.
     
+    The response carries the version of the review's wine, which changes
+    when any review of that wine is created or deleted, including this one.
+    
     Args:
         review_id: The unique review identifier
+        if_version: version from a previous identical call; returns "not_modified" if unchanged
     
     Returns:
-        JSON string with status and data fields
+        JSON string with status, data (the review) and version fields
     """
-    if review_id not in REVIEWS:
-        return json.dumps({
+    review = REVIEWS.get(review_id)
+    if review is not None:
+        version = REVIEWS.wine_version(review["wine_name"], "exact")
+        unchanged = _not_modified(version, if_version)
+        if unchanged:
+            return unchanged
+        # Read the review again after the version, so a deletion is never hidden behind it
+        review = REVIEWS.get(review_id)
+    if review is None:
+        return dumps({
             "status": "error",
             "data": f"Review {review_id} not found"
         })
     
-    review = REVIEWS[review_id]
-    return json.dumps({
+    return dumps_with_raw({
         "status": "success",
+        "version": version,
         "data": review
-    })
+    }, ("data",), REVIEWS.serialize(review))
 
 
 @mcp.tool()
 def list_reviews(
     wine_name: Optional[str] = None,
-    min_rating: Optional[float] = None
+    min_rating: Optional[float] = None,
+    wine_match: str = "contains",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    order_by: str = "created_at",
+    descending: bool = False,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_vintage: Optional[int] = None,
+    max_vintage: Optional[int] = None,
+    fields: Optional[list[str]] = None,
+    if_version: Optional[int] = None
 ) -> str:
     """
     List all reviews, optionally filtered.
     
+    Wine names are compared ignoring case and accents, so "Rose" matches "Rosé".
+    Results are sorted by order_by (ties broken by review id). When limit is set,
+    the response includes a next_cursor to pass back as cursor for the next page;
+    it is null on the last page. Range filters are answered from sorted indexes;
+    reviews without a price never match min_price/max_price.
+    
+    When a "contains" or "prefix" wine_name matches no wine, for example
+    because it is misspelt, the reviews of the most similar wine name are
+    listed instead and the response names it in matched_wine_name.
+    
+    Every response carries a version, which only changes when reviews of the
+    listed wines (of any wine without wine_name) are created or deleted. Pass
+    it back as if_version when repeating the same call: if nothing changed,
+    the response is just {"status": "not_modified"} with the version.
+    
     Args:
-        wine_name: Filter by wine name (partial match)
+        wine_name: Filter by wine name
         min_rating: Filter by minimum rating
+        wine_match: How wine_name is matched: "contains" (default), "prefix" or "exact"
+        limit: Maximum number of reviews to return (default: all)
+        cursor: next_cursor from a previous call with the same filters
+        order_by: Sort field, "created_at" (default) or "rating"
+        descending: Sort from newest/highest first
+        since: Only reviews created at or after this ISO date or date-time
+        until: Only reviews created before this ISO date or date-time
+        min_price: Only reviews with a price of at least this much
+        max_price: Only reviews with a price of at most this much
+        min_vintage: Only vintages from this year on
+        max_vintage: Only vintages up to this year
+        fields: Only return these review fields, e.g. ["id", "wine_name", "rating"] (default: all)
+        if_version: version from a previous identical call
     
     Returns:
         JSON string with status and data fields
     """
-    if not REVIEWS:
-        return json.dumps({
+    error = _invalid_wine_match(wine_match)
+    if error:
+        return error
+    
+    # Read the version before the reviews, so a concurrent change is never hidden behind it
+    version = REVIEWS.wine_version(wine_name, wine_match) if wine_name else REVIEWS.version
+    similar = _similar_wine(wine_name, wine_match)
+    if similar:
+        version = max(version, REVIEWS.wine_version(similar[0], "exact"))
+    unchanged = _not_modified(version, if_version)
+    if unchanged:
+        return unchanged
+    
+    fingerprint = query_fingerprint(
+        wine_name=wine_name, min_rating=min_rating, wine_match=wine_match,
+        since=since, until=until, min_price=min_price, max_price=max_price,
+        min_vintage=min_vintage, max_vintage=max_vintage
+    )
+    try:
+        ranges = {
+            "created_at": KeyRange(_timestamp_bound(since), _timestamp_bound(until), high_inclusive=False),
+            "price": KeyRange(min_price, max_price),
+            "vintage": KeyRange(min_vintage, max_vintage),
+        }
+        request = page_request(order_by, descending, limit, cursor, fingerprint)
+        projection = _projection(fields)
+    except ValueError as e:
+        # CursorError is a ValueError, as are unparseable since/until values and unknown fields
+        return dumps({
+            "status": "error",
+            "data": str(e)
+        })
+    
+    # Cursors stay tied to the wine_name asked for; each page resolves it to the same similar wine
+    lookup_name, lookup_match = (similar[0], "exact") if similar else (wine_name, wine_match)
+    rows = REVIEWS.find(request, wine_name=lookup_name, wine_match=lookup_match, min_rating=min_rating, ranges=ranges)
+    
+    # Counting can be costly on large stores, so only do it to explain an empty result
+    if not rows and not REVIEWS:
+        return dumps({
             "status": "success",
             "data": {
                 "message": "No reviews found in the database.",
                 "reviews": [],
-                "count": 0
+                "count": 0,
+                "next_cursor": None,
+                "version": version
             }
         })
     
-    filtered = list(REVIEWS.values())
-    
-    if wine_name:
-        filtered = [r for r in filtered if wine_name.lower() in r['wine_name'].lower()]
+    page, next_cursor = finish_page(rows, request, fingerprint)
     
-    if min_rating is not None:
-        filtered = [r for r in filtered if r['rating'] >= min_rating]
-    
-    return json.dumps({
-        "status": "success",
-        "data": {
-            "reviews": filtered,
-            "count": len(filtered)
-        }
-    })
+    data = {
+        "reviews": page,
+        "count": len(page),
+        "next_cursor": next_cursor,
+        "version": version
+    }
+    if similar:
+        data["matched_wine_name"], data["similarity"] = similar
+    return _reviews_response(data, projection)
 
 
 @mcp.tool()
@@ -142,89 +396,517 @@ def delete_review(review_id: str) -> str:
     Returns:
         JSON string with status and data fields
     """
-    if review_id not in REVIEWS:
-        return json.dumps({
+    review = REVIEWS.remove(review_id)
+    if review is None:
+        return dumps({
             "status": "error",
             "data": f"Review {review_id} not found"
         })
     
-    wine_name = REVIEWS[review_id]['wine_name']
-    del REVIEWS[review_id]
-    return json.dumps({
+    return dumps({
         "status": "success",
         "data": {
-            "message": f"Review {review_id} for '{wine_name}' deleted successfully",
+            "message": f"Review {review_id} for '{review['wine_name']}' deleted successfully",
             "review_id": review_id
         }
     })
 
 
 @mcp.tool()
-def get_average_rating(wine_name: str) -> str:
+def get_average_rating(wine_name: str, wine_match: str = "contains", if_version: Optional[int] = None) -> str:
     """
     Get the average rating for a specific wine.
     
+    When a "contains" or "prefix" wine_name matches no wine, for example
+    because it is misspelt, the most similar wine name is rated instead and
+    the response names it in matched_wine_name.
+    
     Args:
-        wine_name: Name of the wine
+        wine_name: Name of the wine (case and accent insensitive)
+        wine_match: How wine_name is matched: "contains" (default), "prefix" or "exact"
+        if_version: version from a previous identical call; returns "not_modified" if unchanged
     
     Returns:
         JSON string with status and data fields
     """
-    matching = [r for r in REVIEWS.values() if wine_name.lower() in r['wine_name'].lower()]
+    error = _invalid_wine_match(wine_match)
+    if error:
+        return error
+    
+    version = REVIEWS.wine_version(wine_name, wine_match)
+    similar = _similar_wine(wine_name, wine_match)
+    if similar:
+        version = max(version, REVIEWS.wine_version(similar[0], "exact"))
+    unchanged = _not_modified(version, if_version)
+    if unchanged:
+        return unchanged
     
-    if not matching:
-        return json.dumps({
+    stats = REVIEWS.wine_stats(similar[0], "exact") if similar else REVIEWS.wine_stats(wine_name, wine_match)
+    
+    if not stats.count:
+        return dumps({
             "status": "error",
             "data": f"No reviews found for '{wine_name}'"
         })
     
-    avg_rating = sum(r['rating'] for r in matching) / len(matching)
-    return json.dumps({
+    data = {
+        "wine_name": wine_name,
+        "average_rating": round(stats.average_rating, 2),
+        "review_count": stats.count,
+        "version": version
+    }
+    if similar:
+        data["matched_wine_name"], data["similarity"] = similar
+    return dumps({
+        "status": "success",
+        "data": data
+    })
+
+
+@mcp.tool()
+def top_rated_wines(k: int = 5, min_reviews: int = 1, if_version: Optional[int] = None) -> str:
+    """
+    Get the best-rated wines by average rating.
+    
+    Args:
+        k: Number of wines to return (default: 5)
+        min_reviews: Only consider wines with at least this many reviews (default: 1)
+        if_version: version from a previous identical call; returns "not_modified" if unchanged
+    
+    Returns:
+        JSON string with status and data fields
+    """
+    if k < 1:
+        return dumps({
+            "status": "error",
+            "data": "k must be at least 1"
+        })
+    
+    version = REVIEWS.version
+    unchanged = _not_modified(version, if_version)
+    if unchanged:
+        return unchanged
+    
+    wines = [stats.to_dict() for stats in REVIEWS.top_rated(k, min_reviews)]
+    return dumps({
         "status": "success",
         "data": {
-            "wine_name": wine_name,
-            "average_rating": round(avg_rating, 2),
-            "review_count": len(matching)
+            "wines": wines,
+            "count": len(wines),
+            "version": version
         }
     })
 
 
 @mcp.tool()
-def search_reviews(keyword: str) -> str:
+def review_analytics(
+    wine_name: Optional[str] = None,
+    wine_match: str = "contains",
+    reviewer_name: Optional[str] = None,
+    min_vintage: Optional[int] = None,
+    max_vintage: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    group_by: str = "vintage",
+    bin_width: float = 0.5,
+    percentiles: Optional[list[float]] = None,
+    if_version: Optional[int] = None
+) -> str:
+    """
+    Compute aggregate statistics over all reviews or a filtered subset.
+    
+    Use this instead of listing reviews to answer questions such as "how are
+    our Barolos rated by vintage" or "what is the median price we paid".
+    
+    Args:
+        wine_name: Only include wines matching this name (optional)
+        wine_match: How wine_name is matched: "contains" (default), "prefix" or "exact"
+        reviewer_name: Only include reviews by this reviewer (optional)
+        min_vintage: Only include vintages from this year on (optional)
+        max_vintage: Only include vintages up to this year (optional)
+        min_rating: Only include reviews rated at least this much (optional)
+        group_by: Break averages down by "vintage" (default), "reviewer" or "wine"
+        bin_width: Width of the rating histogram bins in stars (default: 0.5)
+        percentiles: Price percentiles to report (default: 10, 25, 50, 75, 90)
+        if_version: version from a previous identical call; returns "not_modified" if unchanged
+    
+    Returns:
+        JSON string with status and data fields: review count, rating
+        average/min/max and histogram, price percentiles, the per-group
+        review count, average rating and average price, and the version
+    """
+    error = _invalid_wine_match(wine_match)
+    if error:
+        return error
+    if group_by not in GROUP_FIELDS:
+        error = f"group_by must be one of {', '.join(GROUP_FIELDS)}"
+    elif not 0 < bin_width <= 4:
+        error = "bin_width must be greater than 0 and at most 4"
+    elif percentiles is not None and not all(0 <= p <= 100 for p in percentiles):
+        error = "percentiles must be between 0 and 100"
+    if error:
+        return dumps({
+            "status": "error",
+            "data": error
+        })
+    
+    version = REVIEWS.wine_version(wine_name, wine_match) if wine_name else REVIEWS.version
+    unchanged = _not_modified(version, if_version)
+    if unchanged:
+        return unchanged
+    
+    frame = filter_frame(
+        REVIEWS.frame(wine_name, wine_match),
+        reviewer_name=reviewer_name,
+        min_vintage=min_vintage,
+        max_vintage=max_vintage,
+        min_rating=min_rating,
+    )
+    return dumps({
+        "status": "success",
+        "data": {**summarize(frame, group_by, bin_width, percentiles or DEFAULT_PERCENTILES), "version": version}
+    })
+
+
+@mcp.tool()
+def search_reviews(
+    keyword: str,
+    match: str = "all",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    order_by: str = "created_at",
+    descending: bool = False,
+    fields: Optional[list[str]] = None,
+    if_version: Optional[int] = None,
+    top_k: Optional[int] = None
+) -> str:
     """
     Search reviews by keywords in tasting notes.
     
+    Each keyword matches whole words in the tasting notes and words starting
+    with it, so "fruit" also finds "fruity". Matching ignores case and accents.
+    Results are paginated like list_reviews.
+    
+    With top_k, only the top_k most relevant reviews are returned, ranked by
+    BM25 (rare keywords and short notes mentioning them often rank first),
+    with their scores in data.scores. Ranked results are not paginated.
+    
     Args:
-        keyword: Keyword to search for in tasting notes
+        keyword: One or more keywords to search for in tasting notes
+        match: "all" to require every keyword (default), "any" to require at least one
+        limit: Maximum number of reviews to return (default: all)
+        cursor: next_cursor from a previous call with the same keywords
+        order_by: Sort field, "created_at" (default) or "rating"
+        descending: Sort from newest/highest first
+        fields: Only return these review fields, e.g. ["id", "wine_name", "rating"] (default: all)
+        if_version: version from a previous identical call; returns "not_modified" if unchanged
+        top_k: Return only this many reviews, most relevant first (at most MAX_BATCH_SIZE)
     
     Returns:
         JSON string with status and data fields
     """
-    matching = [
-        r for r in REVIEWS.values() 
-        if keyword.lower() in r['tasting_notes'].lower()
-    ]
+    if match not in ("all", "any"):
+        return dumps({
+            "status": "error",
+            "data": "match must be 'all' or 'any'"
+        })
+    if top_k is not None and not 1 <= top_k <= MAX_BATCH_SIZE:
+        return dumps({
+            "status": "error",
+            "data": f"top_k must be between 1 and {MAX_BATCH_SIZE}"
+        })
+    if top_k is not None and (limit is not None or cursor is not None):
+        return dumps({
+            "status": "error",
+            "data": "top_k cannot be combined with limit or cursor"
+        })
+    
+    version = REVIEWS.version
+    unchanged = _not_modified(version, if_version)
+    if unchanged:
+        return unchanged
+    
+    if top_k is not None:
+        return _ranked_search(keyword, match, top_k, fields, version)
     
-    if not matching:
-        return json.dumps({
+    fingerprint = query_fingerprint(keyword=keyword, match=match)
+    try:
+        request = page_request(order_by, descending, limit, cursor, fingerprint)
+        projection = _projection(fields)
+    except ValueError as e:
+        # CursorError is a ValueError, as are unknown fields
+        return dumps({
+            "status": "error",
+            "data": str(e)
+        })
+    
+    page, next_cursor = finish_page(REVIEWS.search(request, keyword, match), request, fingerprint)
+    
+    if not page:
+        return dumps({
             "status": "success",
             "data": {
                 "message": f"No reviews found containing '{keyword}'",
                 "reviews": [],
-                "count": 0
+                "count": 0,
+                "next_cursor": None,
+                "version": version
+            }
+        })
+    
+    return _reviews_response({
+        "keyword": keyword,
+        "reviews": page,
+        "count": len(page),
+        "next_cursor": next_cursor,
+        "version": version
+    }, projection)
+
+
+@mcp.tool()
+def similar_reviews(
+    review_id: Optional[str] = None,
+    text: Optional[str] = None,
+    k: int = 5,
+    fields: Optional[list[str]] = None,
+    if_version: Optional[int] = None
+) -> str:
+    """
+    Find the reviews whose tasting notes are most similar to a review or a description.
+    
+    Notes are compared by the words they share, with rare words counting
+    more than common ones (TF-IDF cosine similarity, from 0 to 1). Given a
+    review id, that review itself is left out of the results.
+    
+    Args:
+        review_id: Find reviews similar to this review's tasting notes
+        text: Or find reviews similar to this free-text description
+        k: Number of reviews to return, most similar first (default: 5, at most MAX_BATCH_SIZE)
+        fields: Only return these review fields, e.g. ["id", "wine_name", "rating"] (default: all)
+        if_version: version from a previous identical call; returns "not_modified" if unchanged
+    
+    Returns:
+        JSON string with status and data fields
+    """
+    if (review_id is None) == (text is None):
+        return dumps({
+            "status": "error",
+            "data": "Pass either review_id or text"
+        })
+    if not 1 <= k <= MAX_BATCH_SIZE:
+        return dumps({
+            "status": "error",
+            "data": f"k must be between 1 and {MAX_BATCH_SIZE}"
+        })
+    try:
+        projection = _projection(fields)
+    except ValueError as e:
+        return dumps({
+            "status": "error",
+            "data": str(e)
+        })
+    
+    # Every review changes how rare each word is, so any change can reorder the results
+    version = REVIEWS.version
+    unchanged = _not_modified(version, if_version)
+    if unchanged:
+        return unchanged
+    
+    if review_id is not None:
+        review = REVIEWS.get(review_id)
+        if review is None:
+            return dumps({
+                "status": "error",
+                "data": f"Review {review_id} not found"
+            })
+        text = review["tasting_notes"]
+    
+    similar = REVIEWS.similar_reviews(text, k, exclude=review_id)
+    if not similar:
+        return dumps({
+            "status": "success",
+            "data": {
+                "message": "No reviews with similar tasting notes found",
+                "reviews": [],
+                "similarities": [],
+                "count": 0,
+                "version": version
             }
         })
     
-    return json.dumps({
+    return _reviews_response({
+        "reviews": [review for review, _ in similar],
+        "similarities": [round(similarity, 4) for _, similarity in similar],
+        "count": len(similar),
+        "version": version
+    }, projection)
+
+
+
+@mcp.tool()
+def create_reviews(reviews: list[dict]) -> str:
+    """
+    Create several wine reviews in one call.
+    
+    Each item takes the same fields as create_review: wine_name, vintage,
+    rating (1-5), tasting_notes, and optionally reviewer_name and price.
+    Invalid items are reported individually and do not prevent the others
+    from being created.
+    
+    Args:
+        reviews: List of reviews to create
+    
+    Returns:
+        JSON string with status and data fields; data.results holds one entry per item
+    """
+    error = _batch_too_large(reviews)
+    if error:
+        return error
+    
+    results, valid = [], []
+    for index, item in enumerate(reviews):
+        problem = _review_input_error(item)
+        if problem:
+            results.append({"index": index, "status": "error", "data": problem})
+            continue
+        review = _new_review(
+            item["wine_name"], item["vintage"], item["rating"], item["tasting_notes"],
+            item.get("reviewer_name", "Anonymous"), item.get("price")
+        )
+        valid.append(review)
+        results.append({"index": index, "status": "success", "review_id": review["id"]})
+    
+    REVIEWS.add_many(valid)
+    return dumps({
+        "status": "success",
+        "data": {
+            "results": results,
+            "created": len(valid),
+            "failed": len(results) - len(valid)
+        }
+    })
+
+
+@mcp.tool()
+def get_reviews(review_ids: list[str], if_version: Optional[int] = None) -> str:
+    """
+    Get several reviews by ID in one call.
+    
+    The version is the latest among the wines of the reviews found, or the
+    store version when any id is missing.
+    
+    Args:
+        review_ids: The unique review identifiers
+        if_version: version from a previous identical call; returns "not_modified" if unchanged
+    
+    Returns:
+        JSON string with status and data fields; data.results holds one entry per id
+    """
+    error = _batch_too_large(review_ids)
+    if error:
+        return error
+    
+    reviews = REVIEWS.get_many(review_ids)
+    if any(review is None for review in reviews):
+        version = REVIEWS.version
+    else:
+        version = max((REVIEWS.wine_version(review["wine_name"], "exact") for review in reviews), default=REVIEWS.version)
+    unchanged = _not_modified(version, if_version)
+    if unchanged:
+        return unchanged
+    # Read the reviews again after the version, so a deletion is never hidden behind it
+    reviews = REVIEWS.get_many(review_ids)
+    results = [
+        dumps_with_raw({"review_id": review_id, "status": "success", "data": None}, ("data",), REVIEWS.serialize(review))
+        if review is not None else
+        dumps({"review_id": review_id, "status": "error", "data": f"Review {review_id} not found"})
+        for review_id, review in zip(review_ids, reviews)
+    ]
+    found = sum(1 for review in reviews if review is not None)
+    return dumps_with_raw({
+        "status": "success",
+        "data": {
+            "found": found,
+            "missing": len(results) - found,
+            "version": version,
+            "results": None
+        }
+    }, ("data", "results"), raw_array(results))
+
+
+@mcp.tool()
+def delete_reviews(review_ids: list[str]) -> str:
+    """
+    Delete several reviews by ID in one call.
+    
+    Args:
+        review_ids: The unique review identifiers
+    
+    Returns:
+        JSON string with status and data fields; data.results holds one entry per id
+    """
+    error = _batch_too_large(review_ids)
+    if error:
+        return error
+    
+    results = [
+        {"review_id": review_id, "status": "success", "data": f"Review {review_id} for '{review['wine_name']}' deleted successfully"}
+        if review is not None else
+        {"review_id": review_id, "status": "error", "data": f"Review {review_id} not found"}
+        for review_id, review in zip(review_ids, REVIEWS.remove_many(review_ids))
+    ]
+    deleted = sum(1 for r in results if r["status"] == "success")
+    return dumps({
         "status": "success",
         "data": {
-            "keyword": keyword,
-            "reviews": matching,
-            "count": len(matching)
+            "results": results,
+            "deleted": deleted,
+            "failed": len(results) - deleted
         }
     })
 
 
+@mcp.tool()
+def changes_since(version: int, limit: int = 100) -> str:
+    """
+    Get the reviews created or deleted after a store version, oldest first.
+    
+    Pass the version returned by a read tool, then keep passing next_version
+    to follow the store. Only recent changes are kept: when the ones after
+    `version` are gone the call fails, and the reviews have to be read again.
+    
+    Args:
+        version: Store version the caller is up to date with
+        limit: Maximum number of changes to return (default: 100, at most MAX_BATCH_SIZE)
+    
+    Returns:
+        JSON string with status and data fields
+    """
+    if not 1 <= limit <= MAX_BATCH_SIZE:
+        return dumps({
+            "status": "error",
+            "data": f"limit must be between 1 and {MAX_BATCH_SIZE}"
+        })
+    
+    current = REVIEWS.version
+    changes, complete = REVIEWS.changes_since(version, limit)
+    if not complete:
+        return dumps({
+            "status": "error",
+            "data": f"Changes after version {version} are no longer available; read the reviews again and continue from the version returned"
+        })
+    
+    next_version = changes[-1].version if changes else max(version, current)
+    return dumps({
+        "status": "success",
+        "data": {
+            "changes": [change.to_dict() for change in changes],
+            "count": len(changes),
+            "next_version": next_version,
+            "has_more": next_version < REVIEWS.version,
+            "version": current
+        }
+    })
+
 
 if __name__ == "__main__":
-    mcp.run(transport="http", port=8002)
\ No newline at end of file
+    mcp.run(transport="http", port=int(os.environ.get("REVIEW_SERVER_PORT", "8002")))
\ No newline at end of file
@@ -0,0 +1,963 @@
+"""
+Storage backends for the review MCP server.
+
+Every backend implements ReviewStore, so the MCP tools in review_server.py
+work unchanged whether reviews live in process memory or in SQLite. Stores
+also behave as a read-only mapping from review id to review dict.
+"""
+
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from wine_cellar.mcp_servers.pagination import PageRequest, select_page
+from wine_cellar.mcp_servers.review_analytics import ReviewFrame
+from wine_cellar.mcp_servers.review_changes import Change, ChangeLog
+from wine_cellar.mcp_servers.review_json import FragmentCache
+from wine_cellar.mcp_servers.review_vectors import NoteVectors
+from wine_cellar.mcp_servers.review_index import (
+    KeyRange,
+    NameIndex,
+    RatingAggregates,
+    SortedIndex,
+    TokenIndex,
+    NameMatcher,
+    WineStats,
+    normalize_text,
+    tokenize,
+)
+
+REVIEW_FIELDS = (
+    "id",
+    "wine_name",
+    "vintage",
+    "rating",
+    "tasting_notes",
+    "reviewer_name",
+    "price",
+    "created_at",
+)
+
+# Fields that support range filters through sorted indexes
+RANGE_FIELDS = ("created_at", "price", "vintage")
+
+
+class ReviewStore(ABC):
+    """
+    Interface shared by the review storage backends.
+
+    Every created or deleted review advances the store's version by one and
+    stamps the wine it belongs to with the new version, so readers can tell
+    whether anything they looked at has changed. Versions start at the clock
+    in microseconds. Durable backends save the last version with the reviews
+    and resume from it when it is ahead of the clock, since a batch, a seed
+    or a replay applies many changes per microsecond; a restarted store thus
+    never reissues a version for different reviews. The memory store loses
+    its reviews on restart and starts from the clock alone. The most recent
+    changes are kept in a ChangeLog of `change_log_size` entries.
+    """
+
+    change_log_size = 10_000
+
+    def __init__(self):
+        # Backends discard a review's fragment whenever its id is added or removed
+        self._fragments = FragmentCache()
+        self._base_version = time.time_ns() // 1000
+        self._version = self._base_version
+        # Normalized wine name -> version of the last change to its reviews
+        self._wine_versions: dict[str, int] = {}
+        # Version of the last change that added or dropped a wine name
+        self._names_version = self._base_version
+        self._change_log = ChangeLog(self._base_version, self.change_log_size)
+
+    @property
+    def version(self) -> int:
+        """Version of the last change to any review."""
+        return self._version
+
+    def _resume_from(self, version: int) -> None:
+        """Carry on after `version`, saved by a previous run, if it is ahead of the clock; call before any change."""
+        if version > self._base_version:
+            self._base_version = self._version = self._names_version = version
+            self._change_log = ChangeLog(version, self.change_log_size)
+
+    def wine_version(self, wine_name: str, wine_match: str = "contains") -> int:
+        """
+        Return the version of the last change to the reviews of the wines matching `wine_name`.
+
+        A non-exact match may start or stop matching a wine as wines come and
+        go, so it also covers the last change to the set of wine names.
+        """
+        if wine_match == "exact":
+            return self._wine_versions.get(normalize_text(wine_name), self._base_version)
+        keys = self.wine_keys(wine_name, wine_match)
+        return max([self._names_version, *(self._wine_versions.get(key, self._base_version) for key in keys)])
+
+    def changes_since(self, version: int, limit: int) -> tuple[list[Change], bool]:
+        """Return up to `limit` changes made after `version` and whether the log still covers `version`."""
+        return self._change_log.since(version, limit)
+
+    def _changed(self, kind: str, review_id: str, wine_name: str, names_changed: bool = False) -> None:
+        """Record one created or deleted review; backends call this under their write lock."""
+        self._version += 1
+        self._wine_versions[normalize_text(wine_name)] = self._version
+        self._change_log.record(self._version, kind, review_id, wine_name)
+        if names_changed:
+            self._names_version = self._version
+
+    def serialize(self, review: dict) -> str:
+        """Return the cached JSON encoding of a stored review."""
+        return self._fragments.get(review)
+
+    @abstractmethod
+    def get(self, review_id: str) -> Optional[dict]:
+        """Return the review with the given id, or None."""
+
+    @abstractmethod
+    def values(self) -> Iterator[dict]:
+        """Iterate over every stored review."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def add(self, review: dict) -> None:
+        """Store a new review."""
+
+    @abstractmethod
+    def remove(self, review_id: str) -> Optional[dict]:
+        """Delete a review and return it, or return None if it does not exist."""
+
+    @abstractmethod
+    def find(
+        self,
+        page: PageRequest,
+        wine_name: Optional[str] = None,
+        wine_match: str = "contains",
+        min_rating: Optional[float] = None,
+        ranges: Optional[dict[str, KeyRange]] = None,
+    ) -> list[dict]:
+        """
+        Return one page of reviews matching the filters (see select_page).
+
+        `ranges` maps fields from RANGE_FIELDS to the bounds their value must
+        fall in; reviews without a value (e.g. no price) never match a range.
+        """
+
+    @abstractmethod
+    def search(self, page: PageRequest, keyword: str, match: str = "all") -> list[dict]:
+        """Return one page of reviews whose tasting notes match `keyword`."""
+
+    @abstractmethod
+    def search_ranked(self, keyword: str, top_k: int, match: str = "all") -> list[tuple[dict, float]]:
+        """Return the `top_k` (review, BM25 score) pairs whose tasting notes match `keyword`, most relevant first."""
+
+    @abstractmethod
+    def similar_reviews(self, text: str, k: int, exclude: Optional[str] = None) -> list[tuple[dict, float]]:
+        """Return the `k` (review, similarity) pairs whose tasting notes are most like `text`, best first, without `exclude`."""
+
+    @abstractmethod
+    def wine_keys(self, wine_name: str, wine_match: str = "contains") -> set[str]:
+        """Return the normalized names of the stored wines matching `wine_name`."""
+
+    @abstractmethod
+    def similar_wines(self, wine_name: str, limit: int = 5) -> list[tuple[str, float]]:
+        """Return up to `limit` (wine name, similarity) pairs for a possibly misspelt `wine_name`, best first."""
+
+    @abstractmethod
+    def wine_stats(self, wine_name: str, wine_match: str = "contains") -> WineStats:
+        """Return the merged aggregates of every wine matching `wine_name`."""
+
+    @abstractmethod
+    def top_rated(self, k: int, min_reviews: int = 1) -> list[WineStats]:
+        """Return the `k` best-rated wines with at least `min_reviews` reviews."""
+
+    def frame(self, wine_name: Optional[str] = None, wine_match: str = "contains") -> ReviewFrame:
+        """
+        Return the reviews of the matching wines (or every review) as arrays for analytics.
+
+        The frame may be shared with other callers, so its arrays must not be modified.
+        """
+        reviews = self.find(PageRequest(), wine_name, wine_match) if wine_name else self.values()
+        return ReviewFrame.from_reviews(reviews)
+
+    def add_many(self, reviews: list[dict]) -> None:
+        """Store several new reviews in one pass."""
+        for review in reviews:
+            self.add(review)
+
+    def get_many(self, review_ids: list[str]) -> list[Optional[dict]]:
+        """Return the review (or None) for each id, in the same order."""
+        return [self.get(review_id) for review_id in review_ids]
+
+    def remove_many(self, review_ids: list[str]) -> list[Optional[dict]]:
+        """Delete several reviews in one pass; see remove for the per-id result."""
+        return [self.remove(review_id) for review_id in review_ids]
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+    def __contains__(self, review_id: object) -> bool:
+        return isinstance(review_id, str) and self.get(review_id) is not None
+
+    def __getitem__(self, review_id: str) -> dict:
+        review = self.get(review_id)
+        if review is None:
+            raise KeyError(review_id)
+        return review
+
+    def __iter__(self) -> Iterator[str]:
+        return (review["id"] for review in self.values())
+
+
+class ReviewTable(dict):
+    """Reviews kept as plain dicts keyed by id."""
+
+    def value(self, review_id: str, field: str):
+        """Return one field of a stored review."""
+        return self[review_id][field]
+
+    def frame(self, review_ids: Optional[Iterable[str]] = None) -> ReviewFrame:
+        """Return the given reviews (default: all) as a ReviewFrame."""
+        return ReviewFrame.from_reviews(self.values() if review_ids is None else map(self.__getitem__, review_ids))
+
+
+class ReadWriteLock:
+    """
+    Lets any number of readers or a single writer in at a time.
+
+    Writers take precedence: once a writer is waiting, new readers queue
+    behind it, so a steady stream of reads cannot starve writes. Neither
+    side is reentrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+def _reading(method):
+    """Run a store method under the store's read lock."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _writing(method):
+    """Run a store method under the store's write lock."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class InMemoryReviewStore(ReviewStore):
+    """
+    Reviews held in a table, with incrementally maintained indexes and aggregates.
+
+    The table and its indexes are guarded by a ReadWriteLock: queries run
+    concurrently, each mutation (including a whole batch) is applied while
+    no query is running, and every query sees the store either before or
+    after a mutation, never half way through. The NoteVectors behind
+    similar_reviews are only built on first use, then maintained.
+    """
+
+    # Any mapping from id to review dict that also provides value() and frame()
+    table_factory = ReviewTable
+
+    def __init__(self, reviews: Iterable[dict] = ()):
+        super().__init__()
+        self._lock = ReadWriteLock()
+        self._reviews = self.table_factory()
+        self._create_indexes()
+        self._vectors: Optional[NoteVectors] = None
+        # Readers may race to build the vectors; writers are excluded by the read lock
+        self._vectors_lock = threading.Lock()
+        # Frame of every review, built on first use and dropped by the next change
+        self._frame: Optional[ReviewFrame] = None
+        self._add_many(dict(review) for review in reviews)
+
+    @_reading
+    def get(self, review_id: str) -> Optional[dict]:
+        return self._reviews.get(review_id)
+
+    @_reading
+    def get_many(self, review_ids: list[str]) -> list[Optional[dict]]:
+        return [self._reviews.get(review_id) for review_id in review_ids]
+
+    @_reading
+    def values(self) -> Iterator[dict]:
+        return iter(list(self._reviews.values()))
+
+    def __len__(self) -> int:
+        return len(self._reviews)
+
+    def _create_indexes(self) -> None:
+        """Create the empty indexes over the table; a store with its own table may index it differently."""
+        self._notes = TokenIndex()
+        self._names = NameIndex()
+        self._stats = RatingAggregates()
+        self._sorted = {field: SortedIndex() for field in RANGE_FIELDS}
+
+    def _unindex(self, review_id: str) -> None:
+        """Drop a review from every index; the table must still hold it."""
+        for field, index in self._sorted.items():
+            index.remove(review_id, self._reviews.value(review_id, field))
+        self._notes.remove(review_id)
+        if self._vectors is not None:
+            self._vectors.remove(review_id)
+        self._names.remove(review_id)
+        self._stats.remove(review_id)
+
+    def _add(self, review: dict) -> None:
+        review_id = review["id"]
+        self._fragments.discard(review_id)
+        self._frame = None
+        names = self._names.name_count
+        if review_id in self._reviews:
+            self._unindex(review_id)
+            self._changed("delete", review_id, self._reviews.value(review_id, "wine_name"))
+        self._reviews[review_id] = review
+        self._notes.add(review_id, review["tasting_notes"])
+        if self._vectors is not None:
+            self._vectors.add(review_id, review["tasting_notes"])
+        self._names.add(review_id, review["wine_name"])
+        self._stats.add(review)
+        # Index the values as the table returns them, so removal finds the same keys
+        for field, index in self._sorted.items():
+            index.add(review_id, self._reviews.value(review_id, field))
+        self._changed("create", review_id, review["wine_name"], self._names.name_count != names)
+
+    def _add_many(self, reviews: Iterable[dict]) -> None:
+        # New reviews go into the sorted name and range indexes in one batch;
+        # a review replacing a stored one flushes the batch and takes the slow path
+        pending: list[dict] = []
+        for review in reviews:
+            review_id = review["id"]
+            if review_id in self._reviews:
+                self._index_sorted(pending)
+                pending = []
+                self._add(review)
+                continue
+            self._fragments.discard(review_id)
+            self._frame = None
+            self._reviews[review_id] = review
+            self._notes.add(review_id, review["tasting_notes"])
+            self._stats.add(review)
+            pending.append(review)
+        self._index_sorted(pending)
+
+    def _index_sorted(self, reviews: list[dict]) -> None:
+        if self._vectors is not None:
+            self._vectors.add_many((review["id"], review["tasting_notes"]) for review in reviews)
+        names = self._names.name_count
+        self._names.add_many((review["id"], review["wine_name"]) for review in reviews)
+        for field, index in self._sorted.items():
+            index.add_many((review["id"], self._reviews.value(review["id"], field)) for review in reviews)
+        for review in reviews:
+            self._changed("create", review["id"], review["wine_name"])
+        if reviews and self._names.name_count != names:
+            self._names_version = self._version
+
+    def _remove(self, review_id: str) -> Optional[dict]:
+        if review_id not in self._reviews:
+            return None
+        names = self._names.name_count
+        self._unindex(review_id)
+        review = self._reviews.pop(review_id)
+        self._fragments.discard(review_id)
+        self._frame = None
+        self._changed("delete", review_id, review["wine_name"], self._names.name_count != names)
+        return review
+
+    @_writing
+    def add(self, review: dict) -> None:
+        self._add(review)
+
+    @_writing
+    def add_many(self, reviews: list[dict]) -> None:
+        self._add_many(reviews)
+
+    @_writing
+    def remove(self, review_id: str) -> Optional[dict]:
+        return self._remove(review_id)
+
+    @_writing
+    def remove_many(self, review_ids: list[str]) -> list[Optional[dict]]:
+        return [self._remove(review_id) for review_id in review_ids]
+
+    def _page(self, review_ids: Iterable[str], page: PageRequest) -> list[dict]:
+        # Sort on the stored field values and only build dicts for the page itself
+        value, order_by = self._reviews.value, page.order_by
+        selected = select_page(review_ids, page, key=lambda i: (value(i, order_by), i))
+        return [self._reviews[i] for i in selected]
+
+    @_reading
+    def find(self, page, wine_name=None, wine_match="contains", min_rating=None, ranges=None):
+        value = self._reviews.value
+        ranges = {field: key_range for field, key_range in (ranges or {}).items() if key_range}
+        names = self._names.search(wine_name, wine_match) if wine_name else None
+
+        # Walk the most selective filter and check the others review by review.
+        # Without filters, walk the created_at index so pages stream in order.
+        sizes = {field: self._sorted[field].count(key_range) for field, key_range in ranges.items()}
+        driver = min(sizes, key=sizes.get, default=None)
+        if names is not None and (driver is None or len(names) <= sizes[driver]):
+            driver = None
+        elif names is None and driver is None and page.order_by in self._sorted:
+            driver = page.order_by
+
+        checks = []
+        if names is not None and driver is not None:
+            checks.append(names.__contains__)
+        for field, key_range in ranges.items():
+            if field != driver:
+                checks.append(lambda i, field=field, key_range=key_range: value(i, field) in key_range)
+        if min_rating is not None:
+            checks.append(lambda i: value(i, "rating") >= min_rating)
+
+        if driver is None:
+            review_ids = self._reviews.keys() if names is None else names
+        elif driver == page.order_by:
+            # The index already yields reviews in page order: stop after limit + 1 matches
+            ordered = self._sorted[driver].ids(ranges.get(driver, KeyRange()), page.descending, page.after)
+            matches = (i for i in ordered if all(check(i) for check in checks))
+            selected = list(matches if page.limit is None else islice(matches, page.limit + 1))
+            return [self._reviews[i] for i in selected]
+        else:
+            review_ids = self._sorted[driver].ids(ranges[driver])
+        if checks:
+            review_ids = (i for i in review_ids if all(check(i) for check in checks))
+        return self._page(review_ids, page)
+
+    @_reading
+    def search(self, page, keyword, match="all"):
+        return self._page(self._notes.search(keyword, match), page)
+
+    @_reading
+    def search_ranked(self, keyword, top_k, match="all"):
+        return [(self._reviews[review_id], score) for review_id, score in self._notes.rank(keyword, top_k, match)]
+
+    def _note_vectors(self) -> NoteVectors:
+        with self._vectors_lock:
+            if self._vectors is None:
+                vectors = NoteVectors()
+                vectors.add_many((i, self._reviews.value(i, "tasting_notes")) for i in self._reviews)
+                self._vectors = vectors
+            return self._vectors
+
+    @_reading
+    def similar_reviews(self, text, k, exclude=None):
+        return [(self._reviews[review_id], score) for review_id, score in self._note_vectors().similar(text, k, exclude)]
+
+    @_reading
+    def wine_keys(self, wine_name, wine_match="contains"):
+        return self._names.names(wine_name, wine_match)
+
+    @_reading
+    def similar_wines(self, wine_name, limit=5):
+        return [(self._stats.get(key).wine_name, score) for key, score in self._names.similar(wine_name, limit)]
+
+    @_reading
+    def wine_stats(self, wine_name, wine_match="contains"):
+        return self._stats.combine(self._names.names(wine_name, wine_match), wine_name)
+
+    @_reading
+    def top_rated(self, k, min_reviews=1):
+        return self._stats.top_rated(k, min_reviews)
+
+    @_reading
+    def frame(self, wine_name=None, wine_match="contains"):
+        if wine_name:
+            return self._reviews.frame(self._names.search(wine_name, wine_match))
+        # Racing readers may both build it; either frame is current, since writers are locked out
+        if self._frame is None:
+            self._frame = self._reviews.frame()
+        return self._frame
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    wine_name TEXT NOT NULL,
+    wine_key TEXT NOT NULL,
+    vintage INTEGER,
+    rating REAL NOT NULL,
+    tasting_notes TEXT NOT NULL,
+    reviewer_name TEXT,
+    price REAL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_wine_name ON reviews (wine_key, rating);
+CREATE INDEX IF NOT EXISTS idx_reviews_rating ON reviews (rating, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_created_at ON reviews (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_price ON reviews (price, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_vintage ON reviews (vintage, id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS review_notes USING fts5(
+    tasting_notes, content='reviews', content_rowid='seq',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS wine_stats (
+    wine_key TEXT PRIMARY KEY,
+    wine_name TEXT NOT NULL,
+    review_count INTEGER NOT NULL,
+    rating_sum REAL NOT NULL,
+    price_count INTEGER NOT NULL,
+    price_sum REAL NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS reviews_after_insert AFTER INSERT ON reviews BEGIN
+    INSERT INTO review_notes (rowid, tasting_notes) VALUES (new.seq, new.tasting_notes);
+    INSERT INTO wine_stats VALUES (
+        new.wine_key, new.wine_name, 1, new.rating, new.price IS NOT NULL, coalesce(new.price, 0)
+    )
+    ON CONFLICT (wine_key) DO UPDATE SET
+        review_count = review_count + 1,
+        rating_sum = rating_sum + new.rating,
+        price_count = price_count + (new.price IS NOT NULL),
+        price_sum = price_sum + coalesce(new.price, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS reviews_after_delete AFTER DELETE ON reviews BEGIN
+    INSERT INTO review_notes (review_notes, rowid, tasting_notes) VALUES ('delete', old.seq, old.tasting_notes);
+    UPDATE wine_stats SET
+        review_count = review_count - 1,
+        rating_sum = rating_sum - old.rating,
+        price_count = price_count - (old.price IS NOT NULL),
+        price_sum = price_sum - coalesce(old.price, 0)
+    WHERE wine_key = old.wine_key;
+    DELETE FROM wine_stats WHERE wine_key = old.wine_key AND review_count = 0;
+END;
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Version 2 added store_meta, which keeps the store version across restarts
+_SCHEMA_VERSION = 2
+
+_SAVE_VERSION = (
+    "INSERT INTO store_meta (key, value) VALUES ('version', ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+)
+
+_COLUMNS = ", ".join(REVIEW_FIELDS)
+_SELECT = f"SELECT {_COLUMNS} FROM reviews"
+_INSERT = f"INSERT INTO reviews ({_COLUMNS}, wine_key) VALUES ({', '.join('?' * (len(REVIEW_FIELDS) + 1))})"
+
+# Stay well below SQLite's limit on bound parameters per statement
+_MAX_PARAMS = 500
+
+# The largest code point, used as an upper bound for prefix range scans
+_MAX_CHAR = "\U0010ffff"
+
+
+class SqliteReviewStore(ReviewStore):
+    """
+    Reviews persisted in an SQLite database.
+
+    All queries and writes share one connection behind one lock, so they
+    run one at a time; WAL mode only lets other processes read the file
+    while a write is in progress. Filters, ordering and page limits are
+    evaluated by SQL on indexed columns. A contains name match first finds
+    the matching names in the trigram index of a NameMatcher, then looks
+    them up through the name index. Tasting notes are searched through an
+    FTS5 table, per-wine totals live in the wine_stats table, maintained by
+    triggers, and every write saves the store version in store_meta.
+
+    Opening an existing database only checks the schema, so startup does
+    not depend on the number of stored reviews. The NameMatcher and the
+    NoteVectors behind similar_reviews are built on first use and
+    maintained from then on.
+
+    Queries are issued as constant parameterized statements, which the
+    sqlite3 module keeps prepared in its statement cache.
+    """
+
+    def __init__(self, path: str | Path, seed: Iterable[dict] = ()):
+        super().__init__()
+        self._lock = threading.RLock()
+        self._matcher: Optional[NameMatcher] = None
+        self._vectors: Optional[NoteVectors] = None
+        self._conn = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        schema_version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version < _SCHEMA_VERSION:
+            # Create the schema, or the tables an older database lacks; only a new database is seeded
+            self._conn.executescript(_SCHEMA)
+            with self._transaction():
+                if not schema_version:
+                    self._conn.executemany(_INSERT, (self._row(r) for r in seed))
+                self._conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        self._resume_from(self._query("SELECT coalesce(max(value), 0) FROM store_meta WHERE key = 'version'")[0][0])
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    @staticmethod
+    def _row(review: dict) -> tuple:
+        return tuple(review.get(f) for f in REVIEW_FIELDS) + (normalize_text(review["wine_name"]),)
+
+    @staticmethod
+    def _review(row: tuple) -> dict:
+        return dict(zip(REVIEW_FIELDS, row))
+
+    def _query(self, sql: str, params: Iterable = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def get(self, review_id: str) -> Optional[dict]:
+        rows = self._query(f"{_SELECT} WHERE id = ?", (review_id,))
+        return self._review(rows[0]) if rows else None
+
+    def values(self) -> Iterator[dict]:
+        return (self._review(row) for row in self._query(f"{_SELECT} ORDER BY seq"))
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM reviews")[0][0]
+
+    def add(self, review: dict) -> None:
+        self.add_many([review])
+
+    def remove(self, review_id: str) -> Optional[dict]:
+        return self.remove_many([review_id])[0]
+
+    def add_many(self, reviews: list[dict]) -> None:
+        with self._transaction():
+            self._conn.executemany(_INSERT, (self._row(r) for r in reviews))
+            for review in reviews:
+                self._fragments.discard(review["id"])
+            if self._vectors is not None:
+                self._vectors.add_many((review["id"], review["tasting_notes"]) for review in reviews)
+            self._record_changes(reviews, added=True)
+
+    def _record_changes(self, reviews: Iterable[dict], added: bool) -> None:
+        """Advance the versions for reviews just inserted or deleted in the current transaction."""
+        per_wine = Counter(normalize_text(review["wine_name"]) for review in reviews)
+        names_changed = False
+        for key, count in per_wine.items():
+            rows = self._conn.execute("SELECT review_count FROM wine_stats WHERE wine_key = ?", (key,)).fetchall()
+            # A wine appeared if all its reviews are from this batch, and went away if none are left
+            if (rows[0][0] == count) if added else not rows:
+                names_changed = True
+                if self._matcher is None:
+                    continue
+                if added:
+                    self._matcher.add(key)
+                else:
+                    self._matcher.remove(key)
+        kind = "create" if added else "delete"
+        for review in reviews:
+            self._changed(kind, review["id"], review["wine_name"])
+        if names_changed:
+            self._names_version = self._version
+        self._conn.execute(_SAVE_VERSION, (self._version,))
+
+    def _select_ids(self, review_ids: list[str]) -> dict[str, dict]:
+        found = {}
+        unique = list(dict.fromkeys(review_ids))
+        for start in range(0, len(unique), _MAX_PARAMS):
+            chunk = unique[start:start + _MAX_PARAMS]
+            sql = f"{_SELECT} WHERE id IN ({', '.join('?' * len(chunk))})"
+            for row in self._conn.execute(sql, chunk):
+                found[row[0]] = self._review(row)
+        return found
+
+    def get_many(self, review_ids: list[str]) -> list[Optional[dict]]:
+        with self._lock:
+            found = self._select_ids(review_ids)
+        return [found.get(review_id) for review_id in review_ids]
+
+    def remove_many(self, review_ids: list[str]) -> list[Optional[dict]]:
+        with self._transaction():
+            found = self._select_ids(review_ids)
+            self._conn.executemany("DELETE FROM reviews WHERE id = ?", ((i,) for i in found))
+            for review_id in found:
+                self._fragments.discard(review_id)
+                if self._vectors is not None:
+                    self._vectors.remove(review_id)
+            self._record_changes(found.values(), added=False)
+        # An id listed twice is only reported as removed the first time
+        return [found.pop(review_id, None) for review_id in review_ids]
+
+    def _name_matcher(self) -> NameMatcher:
+        """Return the NameMatcher over the stored wine names, building it on first use; call under the lock."""
+        if self._matcher is None:
+            self._matcher = NameMatcher()
+            for key, in self._conn.execute("SELECT wine_key FROM wine_stats"):
+                self._matcher.add(key)
+        return self._matcher
+
+    def _name_condition(self, wine_name: str, wine_match: str) -> tuple[str, list]:
+        """
+        Return the SQL condition and parameters matching wine_key against a wine name.
+
+        A contains match cannot use an index, so the matching names are found
+        in the NameMatcher's trigram index first, then looked up through the
+        wine_key index.
+        """
+        if wine_match not in NameIndex.MODES:
+            raise ValueError(f"mode must be one of {', '.join(NameIndex.MODES)}")
+        key = normalize_text(wine_name)
+        if wine_match == "exact":
+            return "wine_key = ?", [key]
+        if wine_match == "prefix":
+            return "wine_key >= ? AND wine_key < ?", [key, key + _MAX_CHAR]
+        with self._lock:
+            keys = self._name_matcher().contains(key)
+        return "wine_key IN (SELECT value FROM json_each(?))", [json.dumps(sorted(keys))]
+
+    def _page(self, conditions: list[str], params: list, page: PageRequest) -> list[dict]:
+        conditions, params = list(conditions), list(params)
+        direction = "DESC" if page.descending else "ASC"
+        if page.after is not None:
+            conditions.append(f"({page.order_by}, id) {'<' if page.descending else '>'} (?, ?)")
+            params.extend(page.after)
+        sql = _SELECT
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {page.order_by} {direction}, id {direction}"
+        if page.limit is not None:
+            sql += " LIMIT ?"
+            params.append(page.limit + 1)
+        return [self._review(row) for row in self._query(sql, params)]
+
+    def find(self, page, wine_name=None, wine_match="contains", min_rating=None, ranges=None):
+        conditions, params = [], []
+        if wine_name:
+            condition, values = self._name_condition(wine_name, wine_match)
+            conditions.append(condition)
+            params.extend(values)
+        if min_rating is not None:
+            conditions.append("rating >= ?")
+            params.append(min_rating)
+        for field, key_range in (ranges or {}).items():
+            if field not in RANGE_FIELDS:
+                raise ValueError(f"Cannot filter on a range of '{field}'")
+            if key_range.low is not None:
+                conditions.append(f"{field} >= ?")
+                params.append(key_range.low)
+            if key_range.high is not None:
+                conditions.append(f"{field} {'<=' if key_range.high_inclusive else '<'} ?")
+                params.append(key_range.high)
+        return self._page(conditions, params, page)
+
+    @staticmethod
+    def _match_expression(keyword: str, match: str) -> Optional[str]:
+        """Return the FTS5 query for `keyword`, with every term matching as a prefix."""
+        if match not in ("all", "any"):
+            raise ValueError("match must be 'all' or 'any'")
+        terms = sorted(set(tokenize(keyword)))
+        if not terms:
+            return None
+        return f" {'AND' if match == 'all' else 'OR'} ".join(f'"{term}"*' for term in terms)
+
+    def search(self, page, keyword, match="all"):
+        expression = self._match_expression(keyword, match)
+        if expression is None:
+            return []
+        condition = "seq IN (SELECT rowid FROM review_notes WHERE review_notes MATCH ?)"
+        return self._page([condition], [expression], page)
+
+    def search_ranked(self, keyword, top_k, match="all"):
+        expression = self._match_expression(keyword, match)
+        if expression is None:
+            return []
+        # FTS5's bm25() is negative, lower is better
+        rows = self._query(
+            f"SELECT {', '.join(f'reviews.{field}' for field in REVIEW_FIELDS)}, -bm25(review_notes) AS score "
+            "FROM review_notes JOIN reviews ON reviews.seq = review_notes.rowid "
+            "WHERE review_notes MATCH ? ORDER BY score DESC, reviews.id LIMIT ?",
+            (expression, top_k),
+        )
+        return [(self._review(row[:-1]), row[-1]) for row in rows]
+
+    def similar_reviews(self, text, k, exclude=None):
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = NoteVectors()
+                self._vectors.add_many(self._conn.execute("SELECT id, tasting_notes FROM reviews ORDER BY seq"))
+            similar = self._vectors.similar(text, k, exclude)
+            found = self._select_ids([review_id for review_id, _ in similar])
+        return [(found[review_id], score) for review_id, score in similar]
+
+    def _stats_for(self, condition: str, params: list, wine_name: str) -> WineStats:
+        stats = WineStats(wine_name=wine_name)
+        rows = self._query(
+            f"SELECT rating, COUNT(*), COUNT(price), TOTAL(price) FROM reviews WHERE {condition} GROUP BY rating",
+            params,
+        )
+        for rating, count, price_count, price_sum in rows:
+            stats.count += count
+            stats.rating_sum += rating * count
+            stats.price_count += price_count
+            stats.price_sum += price_sum
+            stats.ratings[rating] = count
+        return stats
+
+    def wine_keys(self, wine_name, wine_match="contains"):
+        if wine_match == "contains":
+            with self._lock:
+                return self._name_matcher().contains(normalize_text(wine_name))
+        condition, params = self._name_condition(wine_name, wine_match)
+        return {key for key, in self._query(f"SELECT wine_key FROM wine_stats WHERE {condition}", params)}
+
+    def similar_wines(self, wine_name, limit=5):
+        with self._lock:
+            similar = self._name_matcher().similar(normalize_text(wine_name), limit)
+            names = dict(self._query(
+                f"SELECT wine_key, wine_name FROM wine_stats WHERE wine_key IN ({', '.join('?' * len(similar))})",
+                [key for key, _ in similar],
+            ))
+        return [(names[key], score) for key, score in similar]
+
+    def wine_stats(self, wine_name, wine_match="contains"):
+        condition, params = self._name_condition(wine_name, wine_match)
+        return self._stats_for(condition, params, wine_name)
+
+    def top_rated(self, k, min_reviews=1):
+        rows = self._query(
+            "SELECT wine_key, wine_name FROM wine_stats WHERE review_count >= ? "
+            "ORDER BY rating_sum / review_count DESC, review_count DESC LIMIT ?",
+            (min_reviews, k),
+        )
+        return [self._stats_for("wine_key = ?", [key], name) for key, name in rows]
+
+    def frame(self, wine_name=None, wine_match="contains"):
+        condition, params = self._name_condition(wine_name, wine_match) if wine_name else ("1", [])
+        return ReviewFrame.from_records(
+            self._query(f"SELECT wine_name, vintage, rating, reviewer_name, price FROM reviews WHERE {condition}", params)
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    """Hold the store lock and wrap the block in BEGIN IMMEDIATE / COMMIT."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()
+        return False
+
+
+def create_store(
+    backend: str = "memory",
+    path: Optional[str | Path] = None,
+    seed: Iterable[dict] = (),
+    **options,
+) -> ReviewStore:
+    """
+    Build the review store selected by configuration.
+
+    Args:
+        backend: "memory", "columnar", "journal" or "sqlite"
+        path: Database file (sqlite) or journal directory (journal)
+        seed: Reviews loaded into a new store (existing data is left as is)
+        options: Backend specific settings, e.g. fsync_every for the journal
+    """
+    if backend == "memory":
+        return InMemoryReviewStore(seed)
+    if backend == "columnar":
+        from wine_cellar.mcp_servers.review_columns import ColumnarReviewStore
+        return ColumnarReviewStore(seed)
+    if backend == "journal":
+        from wine_cellar.mcp_servers.review_journal import JournaledReviewStore
+        return JournaledReviewStore(path or "review_journal", seed, **options)
+    if backend == "sqlite":
+        return SqliteReviewStore(path or "reviews.db", seed)
+    raise ValueError(f"Unknown review store backend '{backend}'")
+
+
+def store_from_env(seed: Iterable[dict] = ()) -> ReviewStore:
+    """
+    Build the review store described by environment variables.
+
+    REVIEW_STORE            memory (default), columnar, journal or sqlite
+    REVIEW_DB_PATH          SQLite database file (default: reviews.db)
+    REVIEW_JOURNAL_DIR      journal and snapshot directory (default: review_journal)
+    REVIEW_FSYNC_EVERY      journal records per fsync, 0 to leave it to the OS (default: 1)
+    REVIEW_FSYNC_INTERVAL   also fsync pending journal records every N seconds
+    REVIEW_SNAPSHOT_INTERVAL  seconds between journal compactions (default: 300)
+    """
+    backend = os.environ.get("REVIEW_STORE", "memory")
+    if backend == "journal":
+        fsync_interval = os.environ.get("REVIEW_FSYNC_INTERVAL")
+        return create_store(
+            backend,
+            os.environ.get("REVIEW_JOURNAL_DIR"),
+            seed,
+            fsync_every=int(os.environ.get("REVIEW_FSYNC_EVERY", "1")),
+            fsync_interval=float(fsync_interval) if fsync_interval else None,
+            snapshot_interval=float(os.environ.get("REVIEW_SNAPSHOT_INTERVAL", "300")),
+        )
+    return create_store(backend, os.environ.get("REVIEW_DB_PATH"), seed)
@@ -0,0 +1,147 @@
+"""
+Hashed TF-IDF vectors of tasting notes for similarity search.
+
+Every token of a note is hashed into one of a fixed number of buckets, so
+there is no vocabulary to keep or grow, and each review gets one row of
+log-scaled bucket frequencies in a NumPy matrix. Inverse document
+frequencies are kept per bucket and applied when a query runs, so adding or
+deleting a review only touches its own row and the bucket counts. The cosine
+similarity of a query to every review is computed in one matrix-vector
+product.
+"""
+
+import functools
+import math
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+from wine_cellar.mcp_servers.review_index import tokenize
+
+# Rows the matrix starts with; it doubles whenever it fills up
+_INITIAL_ROWS = 64
+
+
+@functools.lru_cache(maxsize=65536)
+def _bucket(token: str, dimensions: int) -> int:
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(token.encode()) % dimensions
+
+
+class NoteVectors:
+    """
+    One hashed term-frequency row per review, with per-bucket document frequencies.
+
+    Deleting a review moves the last row into its place, so the live rows
+    always fill the top of the matrix and queries never skip holes.
+
+    Args:
+        dimensions: Number of hash buckets; more buckets mean fewer words
+            sharing one, at dimensions * 4 bytes per review
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self._matrix = np.zeros((_INITIAL_ROWS, dimensions), dtype=np.float32)
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        # Number of reviews with each bucket
+        self._document_frequency = np.zeros(dimensions, dtype=np.int64)
+        # Row norms under the current idf weights, dropped on every change
+        self._norms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, review_id: object) -> bool:
+        return review_id in self._rows
+
+    def vector(self, text: str) -> np.ndarray:
+        """Return the log-scaled hashed term frequencies of `text`."""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in tokenize(text):
+            vector[_bucket(token, self.dimensions)] += 1
+        present = vector > 0
+        vector[present] = 1 + np.log(vector[present])
+        return vector
+
+    def add(self, review_id: str, text: str) -> None:
+        self.add_many([(review_id, text)])
+
+    def add_many(self, documents: Iterable[tuple[str, str]]) -> None:
+        """Add or replace the rows of several (review id, text) pairs; the last text of a repeated id wins."""
+        pending = dict(documents)
+        for review_id in pending:
+            self.remove(review_id)
+        start, end = len(self._ids), len(self._ids) + len(pending)
+        if end > len(self._matrix):
+            grown = np.zeros((max(end, 2 * len(self._matrix)), self.dimensions), dtype=np.float32)
+            grown[:start] = self._matrix[:start]
+            self._matrix = grown
+        # Count every (row, bucket) pair of the batch in one bincount
+        cells = [
+            offset * self.dimensions + _bucket(token, self.dimensions)
+            for offset, text in enumerate(pending.values())
+            for token in tokenize(text)
+        ]
+        block = self._matrix[start:end]
+        block[:] = np.bincount(cells, minlength=block.size).reshape(block.shape)
+        present = block > 0
+        block[present] = 1 + np.log(block[present])
+        self._document_frequency += present.sum(axis=0)
+        self._rows.update(zip(pending, range(start, end)))
+        self._ids.extend(pending)
+        self._norms = None
+
+    def remove(self, review_id: str) -> None:
+        row = self._rows.pop(review_id, None)
+        if row is None:
+            return
+        self._document_frequency -= self._matrix[row] > 0
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._matrix[last] = 0
+        self._ids.pop()
+        self._norms = None
+
+    def _idf(self) -> np.ndarray:
+        # Smoothed so that a bucket present in every review still counts a little
+        count = len(self._ids)
+        return (np.log((count + 1) / (self._document_frequency + 1)) + 1).astype(np.float32)
+
+    def similar(self, text: str, k: int, exclude: Optional[str] = None) -> list[tuple[str, float]]:
+        """
+        Return the `k` reviews whose notes are most similar to `text`, best first.
+
+        Similarity is the cosine of the idf-weighted vectors; reviews sharing
+        no bucket with `text` are left out, as is `exclude`, and ties go to
+        the smaller id.
+
+        Returns:
+            (review id, similarity) pairs
+        """
+        count = len(self._ids)
+        query = self.vector(text)
+        if not count or not query.any():
+            return []
+        weights = self._idf() ** 2
+        query_norm = math.sqrt(float(query ** 2 @ weights))
+        rows = self._matrix[:count]
+        norms = self._norms
+        if norms is None:
+            norms = self._norms = np.sqrt(np.einsum("ij,ij,j->i", rows, rows, weights))
+        scores = rows @ (query * weights) / (np.maximum(norms, 1e-12) * query_norm)
+        if exclude in self._rows:
+            scores[self._rows[exclude]] = 0
+        candidates = np.flatnonzero(scores > 1e-6)
+        if len(candidates) > k:
+            # Everything tied with the k-th best stays in, so ties are broken by id below
+            threshold = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= threshold]
+        ranked = sorted(((-float(scores[row]), self._ids[row]) for row in candidates))[:k]
+        return [(review_id, -score) for score, review_id in ranked]
@@ -0,0 +1,316 @@
+"""
+Indexed in-memory store for the cellar's wines.
+
+A Cellar keeps its wines in insertion order behind a primary index on
+(name, producer, vintage), so one wine is found without a scan, and
+maintains secondary indexes and facet counts as wines are added:
+
+- colour, country and vintage map their values to the positions of the
+  wines holding them; vintages are also kept sorted for ranges
+- grape varieties and meal pairings are word-indexed, so "pinot noir"
+  finds a Champagne blend and "cheese" finds "aged cheeses"
+- meal pairings are also indexed by stemmed term ("grilled" and "grill"
+  agree), which ranks wines for a meal in recommend_for_meal
+- per-colour, per-country and per-vintage counts back cellar_summary, so
+  inventory questions are answered without touching the wines
+
+A cellar holds far fewer distinct values than wines, so the word indexes
+cover the distinct values and every filter works on sets of positions.
+"""
+
+import functools
+import heapq
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from wine_cellar.mcp_servers.review_index import TokenIndex, normalize_text, tokenize
+
+# Fields with facet counts in summary()
+FACETS = ("colour", "country_origin", "year")
+
+# Colours, countries and producers repeat across many wines
+_normalize_repeated = functools.lru_cache(maxsize=4096)(normalize_text)
+
+# Words that never decide a pairing
+_STOP_WORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+# (suffix, replacement) pairs, tried in order; the first that leaves a stem of 3+ letters wins
+_SUFFIXES = (
+    ("ies", "y"), ("ied", "y"), ("sses", "ss"), ("shes", "sh"), ("ches", "ch"), ("xes", "x"), ("oes", "o"),
+    ("ing", ""), ("ed", ""), ("ss", "ss"), ("us", "us"), ("s", ""),
+)
+
+
+@functools.lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Reduce a normalized word to a crude stem, so inflections of a word agree.
+
+    Only common English plural and verb endings are stripped, then a final
+    "e": "cheeses" and "cheese" become "chees", "grilled" becomes "grill"
+    and "berries" becomes "berry".
+    """
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= 3:
+            word = word[:len(word) - len(suffix)] + replacement
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def meal_terms(text: str) -> set[str]:
+    """Return the distinct stemmed terms of a meal description, without stop words."""
+    return {stem(word) for word in tokenize(text) if word not in _STOP_WORDS}
+
+
+def _facet_key(field: str, value):
+    """Return the key a facet counts `value` under: vintages as they are, colours and countries normalized."""
+    return value if field == "year" else _normalize_repeated(value)
+
+
+def wine_key(name: str, producer: str, year: int) -> tuple[str, str, int]:
+    """Return the primary key of a wine; names compare ignoring case and accents."""
+    return normalize_text(name), _normalize_repeated(producer), year
+
+
+class _WordValues:
+    """Distinct field values, word-indexed, with the positions holding each."""
+
+    def __init__(self):
+        self.positions: dict[str, set[int]] = {}
+        self._words = TokenIndex()
+
+    def add(self, value: str, position: int) -> None:
+        positions = self.positions.get(value)
+        if positions is None:
+            positions = self.positions[value] = set()
+            self._words.add(value, value)
+        positions.add(position)
+
+    def remove(self, value: str, position: int) -> None:
+        positions = self.positions[value]
+        positions.discard(position)
+        if not positions:
+            del self.positions[value]
+            self._words.remove(value)
+
+    def search(self, query: str) -> set[int]:
+        """Return the positions of the values containing a word starting with each word of `query`."""
+        return set().union(*(self.positions[value] for value in self._words.search(query)))
+
+
+class _MealValues(_WordValues):
+    """Meal pairings, also indexed by stemmed term."""
+
+    def __init__(self):
+        super().__init__()
+        self._terms: dict[str, set[str]] = {}
+
+    def add(self, value: str, position: int) -> None:
+        if value not in self.positions:
+            for term in meal_terms(value):
+                self._terms.setdefault(term, set()).add(value)
+        super().add(value, position)
+
+    def remove(self, value: str, position: int) -> None:
+        super().remove(value, position)
+        if value not in self.positions:
+            for term in meal_terms(value):
+                self._terms[term].discard(value)
+                if not self._terms[term]:
+                    del self._terms[term]
+
+    def with_term(self, term: str) -> set[int]:
+        """Return the positions of the wines with a meal pairing containing the stemmed `term`."""
+        return set().union(*(self.positions[value] for value in self._terms.get(term, ())))
+
+
+class Cellar:
+    """
+    Wines keyed by (name, producer, vintage), with secondary indexes and facet counts.
+
+    Adding a wine whose key is already stored replaces it in place, so a
+    wine keeps its position and positions never move.
+    """
+
+    def __init__(self, wines: Iterable[dict] = ()):
+        self._wines: list[dict] = []
+        self._primary: dict[tuple[str, str, int], int] = {}
+        self._colours: dict[str, set[int]] = {}
+        self._countries: dict[str, set[int]] = {}
+        self._years: dict[int, set[int]] = {}
+        self._sorted_years: list[int] = []
+        self._grapes = _WordValues()
+        self._meals = _MealValues()
+        # Facets count wines under the normalized value and are labelled with its first spelling
+        self._facets = {field: Counter() for field in FACETS}
+        self._spellings: dict[str, dict] = {field: {} for field in FACETS}
+        for wine in wines:
+            self.add(wine)
+
+    def __len__(self) -> int:
+        return len(self._wines)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._wines)
+
+    def get(self, name: str, producer: str, year: int) -> Optional[dict]:
+        """Return the wine with this name, producer and vintage, or None."""
+        position = self._primary.get(wine_key(name, producer, year))
+        return None if position is None else self._wines[position]
+
+    def wines(self, limit: Optional[int] = None) -> list[dict]:
+        """Return the first `limit` wines (default: all) in cellar order; the full list is shared, not copied."""
+        return self._wines if limit is None else self._wines[:limit]
+
+    def add(self, wine: dict) -> bool:
+        """Store `wine`, replacing the stored wine with the same key; return True if it is new."""
+        key = wine_key(wine["name"], wine["producer"], wine["year"])
+        position = self._primary.get(key)
+        new = position is None
+        if new:
+            position = self._primary[key] = len(self._wines)
+            self._wines.append(wine)
+        else:
+            self._unindex(position, self._wines[position])
+            self._wines[position] = wine
+        self._index(position, wine)
+        return new
+
+    def add_many(self, wines: Iterable[dict]) -> list[bool]:
+        """Store several wines; return, for each, True if it is new."""
+        return [self.add(wine) for wine in wines]
+
+    def _index(self, position: int, wine: dict) -> None:
+        self._colours.setdefault(_normalize_repeated(wine["colour"]), set()).add(position)
+        self._countries.setdefault(_normalize_repeated(wine["country_origin"]), set()).add(position)
+        year = wine["year"]
+        if year not in self._years:
+            self._years[year] = set()
+            insort(self._sorted_years, year)
+        self._years[year].add(position)
+        self._grapes.add(wine["grape_variety"], position)
+        for meal in set(wine["best_meals"]):
+            self._meals.add(meal, position)
+        for field in FACETS:
+            key = _facet_key(field, wine[field])
+            self._facets[field][key] += 1
+            self._spellings[field].setdefault(key, wine[field])
+
+    def _unindex(self, position: int, wine: dict) -> None:
+        for values, value in (
+            (self._colours, _normalize_repeated(wine["colour"])),
+            (self._countries, _normalize_repeated(wine["country_origin"])),
+            (self._years, wine["year"]),
+        ):
+            values[value].discard(position)
+            if not values[value]:
+                del values[value]
+        if wine["year"] not in self._years:
+            del self._sorted_years[bisect_left(self._sorted_years, wine["year"])]
+        self._grapes.remove(wine["grape_variety"], position)
+        for meal in set(wine["best_meals"]):
+            self._meals.remove(meal, position)
+        for field in FACETS:
+            key = _facet_key(field, wine[field])
+            self._facets[field][key] -= 1
+            if not self._facets[field][key]:
+                del self._facets[field][key]
+                del self._spellings[field][key]
+
+    def _year_range(self, min_year: Optional[int], max_year: Optional[int]) -> Iterator[set[int]]:
+        start = 0 if min_year is None else bisect_left(self._sorted_years, min_year)
+        end = len(self._sorted_years) if max_year is None else bisect_right(self._sorted_years, max_year)
+        return (self._years[year] for year in self._sorted_years[start:end])
+
+    def filter(
+        self,
+        colour: Optional[str] = None,
+        country_origin: Optional[str] = None,
+        grape_variety: Optional[str] = None,
+        min_year: Optional[int] = None,
+        max_year: Optional[int] = None,
+        meal: Optional[str] = None,
+    ) -> set[int]:
+        """
+        Return the positions of the wines matching every given filter.
+
+        Colour and country must match whole (ignoring case and accents).
+        Every word of grape_variety must start a word of the wine's grape
+        variety, and every word of meal a word of one of its meal pairings.
+        The set may be shared with the cellar, so callers must not modify it.
+        """
+        candidates = []
+        if colour is not None:
+            candidates.append(self._colours.get(normalize_text(colour), set()))
+        if country_origin is not None:
+            candidates.append(self._countries.get(normalize_text(country_origin), set()))
+        if grape_variety is not None:
+            candidates.append(self._grapes.search(grape_variety))
+        if meal is not None:
+            candidates.append(self._meals.search(meal))
+        if min_year is not None or max_year is not None:
+            candidates.append(set().union(*self._year_range(min_year, max_year)))
+        if not candidates:
+            return set(range(len(self._wines)))
+
+        # Start from the smallest candidate set, then keep what the others agree on
+        candidates.sort(key=len)
+        positions = candidates[0]
+        for other in candidates[1:]:
+            if not positions:
+                break
+            positions = positions & other
+        return positions
+
+    def select(self, positions: set[int], limit: Optional[int] = None) -> list[dict]:
+        """Return the wines at `positions` in cellar order, at most `limit` of them."""
+        ordered = sorted(positions) if limit is None else heapq.nsmallest(limit, positions)
+        return [self._wines[position] for position in ordered]
+
+    def pairings(self, meal: str, k: int) -> list[tuple[int, float]]:
+        """
+        Return the `k` best (position, score) pairs for `meal`, best first.
+
+        A wine scores the idf of every term of `meal` found among its meal
+        pairings, so wines sharing more terms, and rarer ones, rank first;
+        ties go to the wine added first. Wines sharing no term are left out.
+        """
+        scores = np.zeros(len(self._wines))
+        for term in meal_terms(meal):
+            positions = self._meals.with_term(term)
+            if positions:
+                weight = math.log(1 + len(self._wines) / len(positions))
+                scores[np.fromiter(positions, dtype=np.int64, count=len(positions))] += weight
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            threshold = np.partition(scores[matched], len(matched) - k)[len(matched) - k]
+            above = matched[scores[matched] > threshold]
+            # Positions come out ascending, so the first wines tied at the threshold are the ones to keep
+            tied = matched[scores[matched] == threshold][:k - len(above)]
+            matched = np.concatenate([above, tied])
+        best = sorted(zip((-scores[matched]).tolist(), matched.tolist()))
+        return [(position, -score) for score, position in best]
+
+    def summary(self) -> dict:
+        """
+        Return the number of wines and the facet counts.
+
+        Colours and countries that differ only in case or accents are counted
+        together under the first spelling added. They are listed from the most
+        to the least common, vintages from the oldest.
+        """
+        summary = {"total": len(self._wines)}
+        for field in FACETS:
+            counts = self._facets[field]
+            if field == "year":
+                summary[field] = {str(year): counts[year] for year in sorted(counts)}
+            else:
+                labelled = ((self._spellings[field][key], count) for key, count in counts.items())
+                summary[field] = dict(sorted(labelled, key=lambda item: (-item[1], item[0])))
+        return summary
@@ -0,0 +1,198 @@
+"""
+Durable cellar: wines stored by StoreWineAgent survive a restart.
+
+A PersistentCellar is a Cellar whose added wines are also upserted into an
+SQLite table keyed like the cellar's primary index (normalized name and
+producer, vintage), so storing a wine twice updates it instead of adding a
+copy. Reads never touch the database: the wines are loaded into the
+in-memory indexes once at startup, after the seed wines, and every write
+updates the indexes as soon as it is committed.
+
+The database file is only created by the first write, so a cellar nobody
+stores wines into leaves no file behind.
+"""
+
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from wine_cellar.mcp_servers.review_index import normalize_text
+from wine_cellar.shared_library.cellar import Cellar, wine_key
+
+# Field order of a stored wine, as in WINES
+WINE_FIELDS = ("name", "producer", "year", "colour", "country_origin", "grape_variety", "best_meals")
+
+# Normalized colour -> the spelling used in the cellar
+COLOURS = {"red": "red", "white": "white", "rose": "rosé", "sparkling": "sparkling"}
+
+# A JSON document wrapped in a Markdown code fence, as models often reply
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wines (
+    name_key TEXT NOT NULL,
+    producer_key TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    wine TEXT NOT NULL,
+    PRIMARY KEY (name_key, producer_key, year)
+);
+"""
+
+# The conflict update keeps the row, so a wine keeps its rowid and loads back in the same order
+_UPSERT = """
+INSERT INTO wines (name_key, producer_key, year, wine) VALUES (?, ?, ?, ?)
+ON CONFLICT (name_key, producer_key, year) DO UPDATE SET wine = excluded.wine
+"""
+
+
+def _text(data: dict, field: str) -> str:
+    value = data.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"'{field}' must be a non-empty string")
+    return value.strip()
+
+
+def validate_wine(data: object) -> dict:
+    """
+    Return the wine described by `data`, checked and normalized for the cellar.
+
+    Text fields are stripped, a vintage given as a string of digits becomes an
+    int, the colour is spelt as in the cellar ("Rose" becomes "rosé") and
+    repeated meal pairings are dropped. Unknown fields are left out.
+
+    Raises:
+        ValueError: A field is missing or has the wrong type or value
+    """
+    if not isinstance(data, dict):
+        raise ValueError("A wine must be a JSON object")
+    wine = {field: _text(data, field) for field in ("name", "producer", "country_origin", "grape_variety")}
+
+    year = data.get("year")
+    if isinstance(year, str) and year.strip().isdigit():
+        year = int(year)
+    if not isinstance(year, int) or isinstance(year, bool):
+        raise ValueError("'year' must be an integer vintage")
+    if not 1800 <= year <= datetime.date.today().year + 1:
+        raise ValueError(f"'year' {year} is not a plausible vintage")
+    wine["year"] = year
+
+    colour = COLOURS.get(normalize_text(_text(data, "colour")))
+    if colour is None:
+        raise ValueError(f"'colour' must be one of {', '.join(COLOURS.values())}")
+    wine["colour"] = colour
+
+    meals = data.get("best_meals")
+    if not isinstance(meals, list) or not all(isinstance(meal, str) for meal in meals):
+        raise ValueError("'best_meals' must be a list of strings")
+    wine["best_meals"] = list(dict.fromkeys(meal.strip() for meal in meals if meal.strip()))
+
+    return {field: wine[field] for field in WINE_FIELDS}
+
+
+def parse_wines(text: str) -> list[dict]:
+    """
+    Parse and validate the wines of a JSON reply: one object or a list of them.
+
+    The JSON may be wrapped in a Markdown code fence or surrounded by prose.
+
+    Raises:
+        ValueError: The reply holds no JSON, no wine, or an invalid wine
+    """
+    if not isinstance(text, str):
+        raise ValueError("The summary must be a JSON string")
+    fenced = _FENCE.search(text)
+    document = fenced.group(1) if fenced else text.strip()
+    try:
+        data = json.loads(document)
+    except ValueError:
+        # Prose around the JSON: keep from the first opening to the last closing bracket
+        start = min((i for i in (document.find("{"), document.find("[")) if i >= 0), default=-1)
+        end = max(document.rfind("}"), document.rfind("]"))
+        if start < 0 or end < start:
+            raise ValueError("The summary holds no JSON object") from None
+        try:
+            data = json.loads(document[start:end + 1])
+        except ValueError as e:
+            raise ValueError(f"The summary is not valid JSON: {e}") from None
+    wines = data if isinstance(data, list) else [data]
+    if not wines:
+        raise ValueError("The summary holds no wine")
+    return [validate_wine(wine) for wine in wines]
+
+
+class PersistentCellar(Cellar):
+    """
+    Cellar whose added wines are upserted into an SQLite database.
+
+    add_many writes its wines in one transaction, then indexes them, so a
+    batch is stored completely or not at all and is visible to the next
+    query once the call returns. Seed wines stay in memory only, so edits
+    to WINES take effect on restart; a stored wine with the key of a seed
+    wine replaces it.
+
+    Args:
+        path: Database file; read at startup if it exists, created on the first write
+        seed: Wines loaded before the stored ones
+    """
+
+    def __init__(self, path: str | Path, seed: Iterable[dict] = ()):
+        super().__init__()
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        for wine in seed:
+            Cellar.add(self, wine)
+        if self.path.exists():
+            for (wine,) in self._connect().execute("SELECT wine FROM wines ORDER BY rowid"):
+                Cellar.add(self, json.loads(wine))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def add(self, wine: dict) -> bool:
+        return self.add_many([wine])[0]
+
+    def add_many(self, wines: Iterable[dict]) -> list[bool]:
+        """Store `wines` in one transaction; return, for each, True if it is new to the cellar."""
+        wines = list(wines)
+        rows = [
+            (*wine_key(wine["name"], wine["producer"], wine["year"]), json.dumps(wine, ensure_ascii=False))
+            for wine in wines
+        ]
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(_UPSERT, rows)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return [Cellar.add(self, wine) for wine in wines]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def cellar_from_env(seed: Iterable[dict] = ()) -> Cellar:
+    """
+    Build the cellar described by environment variables.
+
+    CELLAR_DB_PATH    SQLite file of the stored wines (default: cellar.db);
+                      set it to an empty string to keep stored wines in memory only
+    """
+    path = os.environ.get("CELLAR_DB_PATH", "cellar.db")
+    return PersistentCellar(path, seed) if path else Cellar(seed)
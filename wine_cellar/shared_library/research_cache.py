@@ -0,0 +1,186 @@
+"""
+Disk-backed cache of StoreWineAgent's research, so a wine is researched once.
+
+Entries are keyed by the normalized wine name and vintage of the request
+(see research_key) and hold the research findings of the search step and,
+once a summary of them has been stored in the cellar, that summary. An
+entry expires `ttl` seconds after its research was done, and the least
+recently used entries are evicted beyond `max_entries`.
+
+The cache lives in an SQLite table; the file is only created by the first
+write, like the cellar's.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from wine_cellar.mcp_servers.review_index import normalize_text, tokenize
+
+# Words a request may wrap the wine name in, which must not change its key
+_FILLER_WORDS = frozenset({
+    "a", "add", "an", "bottle", "cellar", "in", "into", "my", "of", "please", "save", "store", "the", "to",
+    "vintage", "wine",
+})
+
+_VINTAGE = re.compile(r"^(1[89]|20)\d\d$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS research (
+    key TEXT PRIMARY KEY,
+    research_findings TEXT,
+    final_summary TEXT,
+    stored_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS research_used_at ON research (used_at);
+"""
+
+
+def research_key(request: str) -> str:
+    """
+    Return the cache key of a request for a wine: its normalized name and vintage.
+
+    Case, accents, punctuation and filler words ("store", "wine", "vintage",
+    ...) are ignored, and the vintage is the last year of the request, so
+    "Store the Tignanello, vintage 2019" and "tignanello 2019" share a key.
+    """
+    words = [word for word in tokenize(normalize_text(request)) if word not in _FILLER_WORDS]
+    vintages = [word for word in words if _VINTAGE.match(word)]
+    vintage = vintages[-1] if vintages else ""
+    return " ".join(word for word in words if word != vintage) + "|" + vintage
+
+
+class ResearchCache:
+    """
+    Research findings and summaries per wine, with a TTL and LRU eviction.
+
+    Args:
+        path: Database file; read if it exists, created on the first write
+        ttl: Seconds an entry stays valid after its research was done
+        max_entries: Entries kept; the least recently used are evicted beyond it
+        clock: Returns the current time in seconds (default: time.time)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._conn is None and not self.path.exists():
+                return 0
+            return self._connect().execute("SELECT COUNT(*) FROM research").fetchone()[0]
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Return the entry of `key` as {"research_findings", "final_summary"}, or None.
+
+        Either value may be None. A hit makes the entry the most recently
+        used; an expired entry is dropped and reported as a miss.
+        """
+        with self._lock:
+            if self._conn is None and not self.path.exists():
+                return None
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT research_findings, final_summary, stored_at FROM research WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = self._clock()
+            if now - row[2] >= self.ttl:
+                conn.execute("DELETE FROM research WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE research SET used_at = ? WHERE key = ?", (now, key))
+            return {"research_findings": row[0], "final_summary": row[1]}
+
+    def put_research(self, key: str, research_findings: str) -> None:
+        """Cache fresh research findings for `key`, dropping the summary written from older research."""
+        self._write(
+            """
+            INSERT INTO research (key, research_findings, final_summary, stored_at, used_at)
+            VALUES (:key, :research_findings, NULL, :now, :now)
+            ON CONFLICT (key) DO UPDATE SET
+                research_findings = excluded.research_findings, final_summary = NULL,
+                stored_at = excluded.stored_at, used_at = excluded.used_at
+            """,
+            {"key": key, "research_findings": research_findings},
+        )
+
+    def put_summary(self, key: str, final_summary: str) -> None:
+        """
+        Cache the summary written for `key`; it expires with the research it was written from.
+
+        If that research has expired or been evicted in the meantime, the summary is dropped too.
+        """
+        self._write(
+            "UPDATE research SET final_summary = :final_summary, used_at = :now WHERE key = :key",
+            {"key": key, "final_summary": final_summary},
+        )
+
+    def _write(self, sql: str, params: dict) -> None:
+        with self._lock:
+            conn = self._connect()
+            now = self._clock()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(sql, {**params, "now": now})
+                conn.execute("DELETE FROM research WHERE stored_at <= ?", (now - self.ttl,))
+                excess = conn.execute("SELECT COUNT(*) FROM research").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM research WHERE key IN (SELECT key FROM research ORDER BY used_at LIMIT ?)",
+                        (excess,),
+                    )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def research_cache_from_env() -> Optional[ResearchCache]:
+    """
+    Build the research cache described by environment variables, or None when it is disabled.
+
+    RESEARCH_CACHE_PATH   SQLite file of the cache (default: research_cache.db);
+                          set it to an empty string to disable the cache
+    RESEARCH_CACHE_TTL    seconds a wine's research stays valid (default: 604800, a week)
+    RESEARCH_CACHE_SIZE   wines kept before the least recently used are evicted (default: 1000)
+    """
+    path = os.environ.get("RESEARCH_CACHE_PATH", "research_cache.db")
+    if not path:
+        return None
+    return ResearchCache(
+        path,
+        ttl=float(os.environ.get("RESEARCH_CACHE_TTL", "604800")),
+        max_entries=int(os.environ.get("RESEARCH_CACHE_SIZE", "1000")),
+    )
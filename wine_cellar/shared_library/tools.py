@@ -1,7 +1,23 @@
+from typing import Optional
+
+from .cellar import meal_terms
+from .cellar_store import cellar_from_env, parse_wines
 from .wine_data import WINES
 
-def retrieve_wines():
-	"""Return the list of wines in the wine cellar.
+# The wines behind the tools: WINES, then the stored wines (see cellar_from_env), indexed as they are added
+CELLAR = cellar_from_env(WINES)
+
+
+def retrieve_wines(
+	colour: Optional[str] = None,
+	country_origin: Optional[str] = None,
+	grape_variety: Optional[str] = None,
+	min_year: Optional[int] = None,
+	max_year: Optional[int] = None,
+	meal: Optional[str] = None,
+	limit: Optional[int] = None
+):
+	"""Return the wines in the wine cellar, optionally filtered.
 
 	Each wine is represented as a dictionary with the following keys:
 	- name: wine name
@@ -12,12 +28,126 @@ def retrieve_wines():
 	- grape_variety: primary grape or blend description
 	- best_meals: list of meal pairing suggestions
 
-	Returns a dict with "status" and "data" keys
+	Filters are combined, and ignore case and accents. Pass them whenever
+	the question is about some of the wines only, instead of retrieving the
+	whole cellar.
+
+	Args:
+		colour: Only wines of this colour ('red', 'white', 'rosé' or 'sparkling')
+		country_origin: Only wines from this country
+		grape_variety: Only wines whose grape variety mentions these words, e.g. "pinot noir"
+		min_year: Only vintages from this year on
+		max_year: Only vintages up to this year
+		meal: Only wines whose meal pairings mention these words, e.g. "beef" or "cheese"
+		limit: Return at most this many wines (default: all)
+
+	Returns a dict with "status" and "data" keys; "total" is the number of
+	matching wines, which exceeds the number returned when limit cuts the list
+	"""
+	if limit is not None and limit < 1:
+		return {
+			"status" : "error",
+			"data" : "limit must be at least 1"
+		}
+	filters = (colour, country_origin, grape_variety, min_year, max_year, meal)
+	if all(value is None for value in filters):
+		wines = CELLAR.wines(limit)
+		total = len(CELLAR)
+	else:
+		positions = CELLAR.filter(*filters)
+		wines = CELLAR.select(positions, limit)
+		total = len(positions)
+	result = {
+		"status" : "success",
+		"data" : wines,
+		"total" : total
+	}
+	return result
+
+
+def recommend_for_meal(meal: str, k: int = 5):
+	"""Return the k wines of the cellar that pair best with a meal, best first.
+
+	The meal is compared with each wine's best_meals word by word, ignoring
+	case, accents and word endings ("grilled" matches "grill", "cheese"
+	matches "aged cheeses"). Wines sharing more words, and rarer ones,
+	score higher. Each wine comes with its pairing_score and the
+	matched_meals that share a word with the meal.
+
+	Args:
+		meal: The meal or dish, e.g. "grilled steak" or "goat cheese salad"
+		k: Number of wines to return (default: 5)
+
+	Returns a dict with "status" and "data" keys; data is empty when no wine
+	pairing shares a word with the meal
+	"""
+	if k < 1:
+		return {
+			"status" : "error",
+			"data" : "k must be at least 1"
+		}
+	terms = meal_terms(meal)
+	if not terms:
+		return {
+			"status" : "error",
+			"data" : "meal must contain at least one word"
+		}
+	wines = []
+	for position, score in CELLAR.pairings(meal, k):
+		wine = CELLAR.wines()[position]
+		wines.append({
+			**wine,
+			"pairing_score" : round(score, 3),
+			"matched_meals" : [pairing for pairing in wine["best_meals"] if meal_terms(pairing) & terms]
+		})
+	result = {
+		"status" : "success",
+		"data" : wines
+	}
+	return result
+
+
+def cellar_summary():
+	"""Return how many wines the cellar holds, in total and per colour, country and vintage.
+
+	Use it for inventory questions such as "how many wines do we have?" or
+	"how many Italian wines are there?" instead of retrieving the wines.
+
+	Returns a dict with "status" and "data" keys; data holds "total" and the
+	counts by "colour", "country_origin" and "year" (vintages as strings)
 	"""
 	result = {
 		"status" : "success",
-		"data" : WINES
+		"data" : CELLAR.summary()
 	}
 	return result
 
 
+def store_wines(summary: str):
+	"""Store the wines of a JSON summary in the cellar.
+
+	The summary is one wine object, or a list of them, with the fields
+	returned by retrieve_wines, possibly wrapped in a ```json code fence.
+	A wine with the name, producer and vintage of a wine already in the
+	cellar replaces it. The wines are written together, and are returned
+	by retrieve_wines as soon as this returns.
+
+	Args:
+		summary: The JSON summary, as written by the writer agent
+
+	Returns a dict with "status" and "data" keys; data holds the stored wines,
+	each with "created" set to False when it updated a wine of the cellar
+	"""
+	try:
+		wines = parse_wines(summary)
+	except ValueError as e:
+		return {
+			"status" : "error",
+			"data" : f"Invalid wine summary: {e}"
+		}
+	created = CELLAR.add_many(wines)
+	result = {
+		"status" : "success",
+		"data" : [{**wine, "created" : new} for wine, new in zip(wines, created)]
+	}
+	return result
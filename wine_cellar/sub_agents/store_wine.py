@@ -1,7 +1,64 @@
-from google.adk.agents import Agent, SequentialAgent
+import json
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import Agent, BaseAgent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 from google.adk.models.google_llm import Gemini
 from google.adk.tools import google_search
+from google.genai import types
+from ..shared_library import tools
 from ..shared_library.helper import LLM_MODEL, retry_config
+from ..shared_library.research_cache import research_cache_from_env, research_key
+
+# Research and summaries of the wines already looked up (None when disabled, see research_cache_from_env)
+RESEARCH_CACHE = research_cache_from_env()
+
+
+def _request_key(user_content: Optional[types.Content]) -> Optional[str]:
+    """Return the research cache key of the wine requested, or None when the cache is off or there is no request."""
+    text = " ".join(part.text for part in user_content.parts if part.text) if user_content and user_content.parts else ""
+    if RESEARCH_CACHE is None or not text.strip():
+        return None
+    return research_key(text)
+
+
+def _cached_entry(callback_context: CallbackContext) -> Optional[dict]:
+    key = _request_key(callback_context.user_content)
+    return None if key is None else RESEARCH_CACHE.get(key)
+
+
+def use_cached_research(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Skip the search when the wine was researched recently: its cached findings become research_findings."""
+    entry = _cached_entry(callback_context)
+    if entry is None:
+        return None
+    findings = entry["research_findings"] or ""
+    callback_context.state["research_findings"] = findings
+    return types.Content(role="model", parts=[types.Part(text=findings)])
+
+
+def cache_research(callback_context: CallbackContext) -> None:
+    """Cache the findings of a search, so the next request for the wine skips it."""
+    key = _request_key(callback_context.user_content)
+    findings = callback_context.state.get("research_findings")
+    if key is None or not findings:
+        return None
+    entry = RESEARCH_CACHE.get(key)
+    # Findings replayed from the cache keep their original age
+    if entry is None or entry["research_findings"] != findings:
+        RESEARCH_CACHE.put_research(key, findings)
+    return None
+
+
+def use_cached_summary(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Skip the writer when a summary of the wine's research is cached: it becomes final_summary."""
+    entry = _cached_entry(callback_context)
+    if entry is None or not entry["final_summary"]:
+        return None
+    callback_context.state["final_summary"] = entry["final_summary"]
+    return types.Content(role="model", parts=[types.Part(text=entry["final_summary"])])
 
 # Retrieve Information Agent: Its job is to use the google_search tool and present findings.
 RetrieveWineInformationAgent = Agent(
@@ -11,6 +68,8 @@ RetrieveWineInformationAgent = Agent(
     google_search tool to find 2-3 pieces of relevant information on the given wine.""",
     tools=[google_search],
     output_key="research_findings", # The result of this agent will be stored in the session state with this key.
+    before_agent_callback=use_cached_research,
+    after_agent_callback=cache_research,
 )
 
 
@@ -31,10 +90,43 @@ WriterAgent = Agent(
     Reply only with the JSON object
     """,
     output_key="final_summary",
+    before_agent_callback=use_cached_summary,
+)
+
+
+class CellarStoreAgent(BaseAgent):
+    """Stores the wines of the writer's JSON summary in the cellar, without a model call.
+
+    The result of tools.store_wines is saved in the session state under
+    "stored_wines" and replied as JSON, so the caller sees either the stored
+    wines or why the summary was rejected. A summary that was stored is
+    cached with the wine's research, so the next request skips the writer.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        summary = ctx.session.state.get("final_summary", "")
+        result = tools.store_wines(summary)
+        key = _request_key(ctx.user_content)
+        if key is not None and result["status"] == "success":
+            # Only summaries that made it into the cellar are worth replaying
+            RESEARCH_CACHE.put_summary(key, summary)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=json.dumps(result, ensure_ascii=False))]),
+            actions=EventActions(state_delta={"stored_wines": result}),
+        )
+
+
+# Store Agent: Its job is to write the summarized wine into the cellar.
+CellarStore = CellarStoreAgent(
+    name="cellar_store_agent",
+    description="Validates the JSON summary of the wine and stores it in the cellar.",
 )
 
 StoreWineAgent = SequentialAgent(
     name="store_wine_agent",
     description="Agent to retrieve detailed information about a wine, store it in the cellar, and provide the json object to the user.",
-    sub_agents=[RetrieveWineInformationAgent, WriterAgent],
-)
\ No newline at end of file
+    sub_agents=[RetrieveWineInformationAgent, WriterAgent, CellarStore],
+)